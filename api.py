@@ -0,0 +1,222 @@
+import argparse
+import os
+import re
+import tempfile
+from urllib.parse import quote
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
+
+from utils.ai_helper import validate_insights, format_insights_markdown
+from utils.ai_jobs import start_insight_job
+from utils.estimate import estimate_project, breakdown_dataframe, build_ai_context, build_fallback_insights
+from utils.export_cache import get_excel_export, get_pdf_export
+from utils.portfolio_report import DEFAULT_TITLE, SHARED_POOL_WORKERS, build_portfolio_pdf, shared_render_pool
+
+load_dotenv()
+
+PORTFOLIO_MAX_PROJECTS = int(os.getenv("API_PORTFOLIO_MAX_PROJECTS", "500"))
+
+app = FastAPI(
+    title="Project Cost Estimator API",
+    description="Estimates, cost breakdowns, AI insights and report exports without the Streamlit UI. "
+                "All amounts are in Indian Rupees (₹).",
+)
+
+
+class Role(BaseModel):
+    role_name: str = "Developer"
+    role_type: str = "Full Stack"
+    tech_stack_role: list[str] = []
+    count: int = Field(1, ge=0)
+    rate_ph: float = Field(0.0, ge=0)
+
+
+class ProjectRequest(BaseModel):
+    name: str = "New Project"
+    description: str = ""
+    primary_tech_stack: list[str] = []
+    project_type: str = "Web Application"
+    kloc: float = Field(..., gt=0)
+    cocomo_mode: str = "semi-detached"
+    contingency: int | float = Field(10, ge=0)
+    roles: list[Role] = Field(..., min_length=1)
+    workflow_complexity: str = "Simple (1-5 steps)"
+    types_of_users: list[str] = []
+
+
+class ExportRequest(ProjectRequest):
+    ai_insights: str | None = None
+    ai_insights_structured: dict | None = None
+
+
+class PortfolioExportRequest(BaseModel):
+    title: str = DEFAULT_TITLE
+    projects: list[ExportRequest] = Field(..., min_length=1, max_length=PORTFOLIO_MAX_PROJECTS)
+
+
+def _project_inputs(request):
+    """Project inputs in the same shape the Estimator page stores in project_inputs_ui."""
+    team = [role.model_dump() for role in request.roles]
+    return {
+        "name": request.name,
+        "description": request.description,
+        "primary_tech_stack": request.primary_tech_stack,
+        "project_type": request.project_type,
+        "kloc": request.kloc,
+        "cocomo_mode": request.cocomo_mode,
+        "roles_data": [{"role_name": r["role_name"], "count": r["count"], "rate_ph": r["rate_ph"]}
+                       for r in team if r["count"] > 0],
+        "team_details_full": team,
+        "contingency": request.contingency,
+        "workflow_complexity": request.workflow_complexity,
+        "types_of_users": request.types_of_users,
+    }
+
+
+def _estimate(request):
+    project_inputs = _project_inputs(request)
+    cocomo_results, cost_summary = estimate_project(
+        request.kloc, request.cocomo_mode, project_inputs["roles_data"], request.contingency
+    )
+    if cocomo_results is None:
+        raise HTTPException(status_code=422, detail=f"Invalid COCOMO mode: {request.cocomo_mode}")
+    return project_inputs, cocomo_results, cost_summary
+
+
+def _export_file_name(project_inputs, suffix):
+    return f"{project_inputs.get('name', 'Project').replace(' ','_')}_{suffix}"
+
+
+def _attachment_headers(file_name):
+    """
+    Content-Disposition for a download named file_name: an ASCII filename= fallback (anything else,
+    quotes and backslashes become "_") plus the exact name as RFC 5987 filename*=UTF-8''.
+    """
+    fallback = re.sub(r'[^\x20-\x7e]|["\\]', "_", file_name)
+    return {"Content-Disposition": f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(file_name, safe='')}"}
+
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.post("/estimate")
+async def estimate(request: ProjectRequest):
+    _, cocomo_results, cost_summary = _estimate(request)
+    return {
+        **cocomo_results,
+        "subtotal": cost_summary["subtotal"],
+        "total_with_contingency": cost_summary["total_with_contingency"],
+        "contingency_percentage": cost_summary["contingency_percentage"],
+    }
+
+
+@app.post("/breakdown")
+async def breakdown(request: ProjectRequest):
+    _, cocomo_results, cost_summary = _estimate(request)
+    return {
+        **cocomo_results,
+        "subtotal": cost_summary["subtotal"],
+        "total_with_contingency": cost_summary["total_with_contingency"],
+        "breakdown": breakdown_dataframe(cost_summary["breakdown_details"]).to_dict(orient="records"),
+    }
+
+
+@app.post("/insights")
+async def insights(request: ProjectRequest, http_request: Request):
+    project_inputs, cocomo_results, cost_summary = _estimate(request)
+    # Same process-wide gateway as the Streamlit sessions: identical in-flight requests are shared and
+    # clients are queued fairly; waiting happens off the event loop.
+    ai_job = start_insight_job(
+        request.name, request.kloc, request.cocomo_mode,
+        cocomo_results["effort_pm"], cocomo_results["duration_m"], cost_summary["total_with_contingency"],
+        build_ai_context(project_inputs),
+        user_id=http_request.client.host if http_request.client else None,
+        fallback=lambda reason: build_fallback_insights(project_inputs, cocomo_results, cost_summary, reason)
+    )
+    ai_insights = await run_in_threadpool(ai_job.result)
+    return {**cocomo_results, "total_with_contingency": cost_summary["total_with_contingency"],
+            "ai_insights": ai_insights, "ai_insights_structured": ai_job.structured,
+            "ai_fallback": ai_job.fallback_used}
+
+
+@app.post("/export/excel")
+async def export_excel(request: ExportRequest):
+    project_inputs, cocomo_results, cost_summary = _estimate(request)
+    excel_bytes = await run_in_threadpool(get_excel_export, project_inputs, cocomo_results, cost_summary, request.ai_insights)
+    return Response(
+        content=excel_bytes,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        headers=_attachment_headers(_export_file_name(project_inputs, "Cost_Estimation_INR.xlsx")),
+    )
+
+
+def _export_insights(request):
+    """(ai_insights, ai_insights_structured) of an export request; the text is derived from the structured insights if missing."""
+    ai_insights_structured = None
+    if request.ai_insights_structured:
+        try:
+            ai_insights_structured = validate_insights(request.ai_insights_structured)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"Invalid ai_insights_structured: {e}")
+    ai_insights = request.ai_insights
+    if not ai_insights and ai_insights_structured:
+        ai_insights = format_insights_markdown(ai_insights_structured)
+    return ai_insights, ai_insights_structured
+
+
+@app.post("/export/pdf")
+async def export_pdf(request: ExportRequest):
+    project_inputs, cocomo_results, cost_summary = _estimate(request)
+    ai_insights, ai_insights_structured = _export_insights(request)
+    pdf_bytes = await run_in_threadpool(get_pdf_export, project_inputs, cocomo_results, cost_summary,
+                                        ai_insights, ai_insights_structured)
+    return Response(
+        content=pdf_bytes,
+        media_type="application/pdf",
+        headers=_attachment_headers(_export_file_name(project_inputs, "Cost_Estimation_Report_INR.pdf")),
+    )
+
+
+@app.post("/export/portfolio-pdf")
+async def export_portfolio_pdf(request: PortfolioExportRequest):
+    estimates = []
+    for project in request.projects:
+        project_inputs, cocomo_results, cost_summary = _estimate(project)
+        ai_insights, ai_insights_structured = _export_insights(project)
+        estimates.append({"project_inputs": project_inputs, "cocomo_results": cocomo_results, "cost_summary": cost_summary,
+                          "ai_insights": ai_insights, "ai_insights_structured": ai_insights_structured})
+    # Built on disk and streamed from there; the file is removed once the response is sent.
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    os.close(fd)
+    try:
+        # Sections render in the process-wide pool, so concurrent requests share its workers.
+        await run_in_threadpool(build_portfolio_pdf, estimates, path, request.title, workers=SHARED_POOL_WORKERS,
+                                progress=None, pool=shared_render_pool())
+    except Exception:
+        os.remove(path)
+        raise
+    return FileResponse(path, media_type="application/pdf", filename=f"{request.title.replace(' ', '_')}_INR.pdf",
+                        background=BackgroundTask(os.remove, path))
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the Project Cost Estimator JSON API locally.")
+    parser.add_argument("--host", default=os.getenv("API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("API_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("API_WORKERS", "1")),
+                        help="Worker processes; each runs its own event loop.")
+    args = parser.parse_args(argv)
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,18 @@
 import streamlit as st
 from dotenv import load_dotenv
-from utils.db import connect_db 
+from utils.db import db_status, get_client, start_bcrypt_calibration
 
 load_dotenv()
 
-if connect_db() is None:
+# get_client() is a cached, pooled singleton and does no round trip; reachability comes from the
+# background health check instead of a ping on every rerun.
+db_client = get_client()
+start_bcrypt_calibration() # once per process, off the script thread
+db_state = db_status()
+if db_client is None:
     st.error("CRITICAL: Failed to connect to the database. User authentication and data storage will not work.")
-else:
-    print("Database connection appears successful from app.py.")
+elif db_state["ok"] is False:
+    st.warning(f"Database health check failed: {db_state['error']}")
 
 
 if 'logged_in' not in st.session_state:
@@ -30,11 +35,17 @@ st.sidebar.title("Navigation")
 if st.session_state.get("logged_in", False):
     st.sidebar.success(f"Logged in as: {st.session_state.get('username', 'User')}")
     st.sidebar.page_link("pages/1_📈_Estimator.py", label="Estimator Tool")
+    st.sidebar.page_link("pages/3_🕘_History.py", label="Estimate History")
     st.sidebar.page_link("pages/2_👤_Account.py", label="Manage Account")
 else:
     st.sidebar.info("Please log in or register.")
     st.sidebar.page_link("pages/2_👤_Account.py", label="Login / Register")
 
+pool = db_state["pool"]
+if db_state["ok"]:
+    st.sidebar.caption(f"Database: {db_state['latency_ms']:.0f} ms ping · {pool['in_use']} of "
+                       f"{pool['open_connections']} pooled connections in use (max {pool['max_pool_size']})")
+
 
 # --- Landing Page Content (if not logged in, or general info) ---
 st.header("Welcome to the Project Cost Estimator!")
@@ -50,7 +61,7 @@ else:
     st.markdown(f"""
     Hello **{st.session_state.get('username', 'User')}**! 
     
-    You are logged in. Please use the sidebar navigation to access the **Estimator Tool** or manage your account.
+    You are logged in. Please use the sidebar navigation to access the **Estimator Tool**, reopen past estimates from **Estimate History**, or manage your account.
     
     This tool helps you:
     -   Estimate project effort and duration using the **COCOMO model**.
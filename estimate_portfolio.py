@@ -0,0 +1,117 @@
+import argparse
+import itertools
+import json
+import math
+import sys
+
+import pandas as pd
+from utils.portfolio import DEFAULT_CHUNK_SIZE, DEFAULT_MODE, DEFAULT_MODEL, MODELS, read_chunks, run_portfolio
+
+
+def _text(value):
+    """A non-empty string cell, or None for an empty (NaN) or missing one."""
+    return (value.strip() or None) if isinstance(value, str) else None
+
+
+def _number(value):
+    """A finite number cell, or None for an empty (NaN), missing or non-numeric one."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+def _team_text(row):
+    roles_json = _text(row.get("roles"))
+    if roles_json:
+        try:
+            roles = json.loads(roles_json)
+        except ValueError:
+            roles = None
+        if isinstance(roles, list):
+            return "\n".join(f"- {role.get('role_name', 'Role')}: {role.get('count', 0)} member(s) @ ₹{role.get('rate_ph', 0)}/hr"
+                             for role in roles if isinstance(role, dict)) or "No team members listed."
+    monthly_cost = _number(row.get("monthly_team_cost"))
+    if monthly_cost is not None:
+        return f"Monthly team cost: ₹{monthly_cost:,.2f}"
+    return "Team not specified."
+
+
+def _insight_requests(priced_path, limit=None):
+    """get_ai_insights arguments for the valid rows of a priced portfolio file, read chunk by chunk."""
+    def _requests():
+        for chunk in read_chunks(priced_path):
+            for row in chunk[chunk["valid"]].to_dict("records"):
+                project_id = row.get("project_id")
+                project_id = "" if project_id is None or pd.isna(project_id) else project_id
+                yield {
+                    "project_name": _text(row.get("name")) or f"Portfolio project {project_id}".strip(),
+                    "kloc": row["kloc"], "cocomo_mode": _text(row.get("mode")) or DEFAULT_MODE,
+                    "effort_pm": row["effort_pm"], "duration_m": row["duration_m"],
+                    "total_cost": row["total_with_contingency"], "roles_data_str": _team_text(row),
+                }
+    return itertools.islice(_requests(), limit)
+
+
+def _write_insights(priced_path, insights_path, args, progress):
+    from utils.ai_batch import run_batch_insights
+
+    counts = {"projects": 0, "failed": 0}
+    with open(insights_path, "w", encoding="utf-8") as out:
+        def _on_result(result):
+            counts["projects"] += 1
+            counts["failed"] += bool(result["error"])
+            out.write(json.dumps({"index": result["index"], "project_name": result["request"]["project_name"],
+                                  "insights": result["text"], "structured": result["structured"],
+                                  "attempts": result["attempts"], "error": result["error"]}, ensure_ascii=False) + "\n")
+            out.flush()
+            if progress:
+                progress(f"AI insights for #{result['index']} ({result['request']['project_name']}): "
+                         f"{'error: ' + result['error'] if result['error'] else 'ok'} after {result['attempts']} attempt(s)")
+
+        run_batch_insights(_insight_requests(priced_path, args.ai_limit), on_result=_on_result, collect=False,
+                           rpm=args.ai_rpm, tpm=args.ai_tpm, concurrency=args.ai_concurrency)
+    return counts
+
+
+def main(argv=None):
+    from utils.ai_batch import DEFAULT_BATCH_CONCURRENCY, GROQ_RPM_LIMIT, GROQ_TPM_LIMIT
+
+    parser = argparse.ArgumentParser(
+        description="Re-price a portfolio of projects (COCOMO + team cost) without the Streamlit UI."
+    )
+    parser.add_argument("input", help="Input .csv or .parquet with columns kloc, [mode], [contingency] and roles (JSON) or monthly_team_cost.")
+    parser.add_argument("output", help="Output .csv, .parquet or .xlsx; written chunk by chunk.")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help=f"Rows per chunk (default: {DEFAULT_CHUNK_SIZE}).")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count, 0 = no pool).")
+    parser.add_argument("--model", choices=MODELS, default=DEFAULT_MODEL,
+                        help="Estimation model (default: basic). intermediate and cocomo2 read cost driver ratings "
+                             "from columns named after the drivers, e.g. RELY, CPLX, PREC; missing ones are nominal.")
+    parser.add_argument("--quiet", action="store_true", help="Only print the final summary.")
+    parser.add_argument("--ai-insights", metavar="PATH", help="Also generate AI insights for the valid rows into this JSON Lines file.")
+    parser.add_argument("--ai-limit", type=int, default=None, help="Only the first N valid rows get AI insights.")
+    parser.add_argument("--ai-rpm", type=float, default=GROQ_RPM_LIMIT, help=f"Requests per minute limit (default: {GROQ_RPM_LIMIT:g}).")
+    parser.add_argument("--ai-tpm", type=float, default=GROQ_TPM_LIMIT, help=f"Tokens per minute limit (default: {GROQ_TPM_LIMIT:g}).")
+    parser.add_argument("--ai-concurrency", type=int, default=DEFAULT_BATCH_CONCURRENCY,
+                        help=f"AI requests in flight (default: {DEFAULT_BATCH_CONCURRENCY}).")
+    args = parser.parse_args(argv)
+    if args.ai_insights and args.output.lower().endswith(".xlsx"):
+        parser.error("--ai-insights reads the priced output back; use a .csv or .parquet output with it.")
+
+    progress = None if args.quiet else (lambda line: print(line, file=sys.stderr))
+    stats = run_portfolio(args.input, args.output, chunk_size=args.chunk_size, workers=args.workers, progress=progress,
+                          model=args.model)
+    print(f"Priced {stats['rows']:,} rows in {stats['chunks']} chunks in {stats['seconds']:.2f}s "
+          f"({stats['rows_per_sec']:,.0f} rows/sec); {stats['invalid_rows']:,} invalid rows.")
+
+    if args.ai_insights:
+        counts = _write_insights(args.output, args.ai_insights, args, progress)
+        failed = counts["failed"]
+        print(f"AI insights for {counts['projects'] - failed:,} of {counts['projects']:,} projects written to "
+              f"{args.ai_insights}{f'; {failed:,} failed' if failed else ''}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,19 @@
+import os
+from functools import partial
+
 import streamlit as st
-import pandas as pd
-from utils.cocomo import calculate_cocomo, calculate_cost
-from utils.ai_helper import get_ai_insights
-from utils.export_utils import df_to_excel_bytes, create_pdf_report, generate_cost_pie_chart_bytes
+from utils.estimate import estimate_project, breakdown_dataframe, build_ai_context, build_fallback_insights
+from utils.ai_jobs import start_insight_job, get_gateway, InsightPrefetcher
+from utils.llm_providers import get_provider
+from utils.ai_cache import get_insight_cache
+from utils.simulation import run_monte_carlo, KLOC_DISTRIBUTIONS
+from utils.export_cache import get_excel_export, get_pdf_export
+from utils.export_utils import extract_optimized_scenario, structured_optimized_scenario
+from utils.charts import cost_pie_chart_png, tornado_chart_png, heatmap_chart_png
+from utils.sensitivity import compute_sensitivity_grid, grid_lookup, tornado_rows
+from utils.hashing import stable_hash
+from utils.db import save_estimate, update_estimate_insights
 from io import BytesIO
-import json
 
 CURRENCY_SYMBOL = "₹" 
 TECH_STACK_OPTIONS = ["Python", "JavaScript", "Java", "C#", "Ruby", "PHP", "Swift", "Kotlin", "Go", "Rust", "React", "Angular", "Vue", "Node.js", "Django", "Flask", "Spring Boot", "SQL", "NoSQL"]
@@ -14,6 +23,90 @@ WORKFLOW_COMPLEXITY_OPTIONS = ["Simple (1-5 steps)", "Medium (6-15 steps)", "Com
 USER_TYPES_OPTIONS = ["Public Users", "Registered Users", "Admin Users", "Internal Staff", "Third-party Integrations"]
 
 
+@st.cache_data(show_spinner=False, max_entries=32)
+def cached_tornado_chart(baseline_cost, rows):
+    return tornado_chart_png(baseline_cost, rows)
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def cached_heatmap_chart(grid_key, mode, variant, _values, row_labels, col_labels):
+    # The grid key identifies _values, so the array itself is left out of the cache hash.
+    return heatmap_chart_png(_values, row_labels, col_labels,
+                             f"Total Cost ({CURRENCY_SYMBOL}) - {mode}, {variant}",
+                             "KLOC change", "Contingency")
+
+
+def ai_request_args(project_inputs, cocomo_results, cost_summary):
+    """Positional arguments of the AI insight request for an estimate."""
+    return (
+        project_inputs["name"], project_inputs["kloc"], project_inputs["cocomo_mode"],
+        cocomo_results["effort_pm"], cocomo_results["duration_m"], cost_summary["total_with_contingency"],
+        build_ai_context(project_inputs)
+    )
+
+def start_ai_job(ai_args, project_inputs, cocomo_results, cost_summary, user_id):
+    return start_insight_job(
+        *ai_args, user_id=user_id,
+        fallback=lambda reason: build_fallback_insights(project_inputs, cocomo_results, cost_summary, reason)
+    )
+
+def finish_ai_job(ai_job):
+    """Moves a finished AI job's insights into session state and into the saved estimate."""
+    st.session_state.ai_insights_ui = ai_job.text
+    st.session_state.ai_insights_structured_ui = ai_job.structured
+    st.session_state.pop("ai_job_ui", None)
+    update_estimate_insights(st.session_state.get("username"), st.session_state.get("estimate_id_ui"),
+                             ai_job.text, ai_job.structured)
+
+def render_ai_insights_section(ai_insights_text, ai_insights_structured=None):
+    if ai_insights_text:
+        st.markdown(ai_insights_text)
+        if ai_insights_structured:
+            optimized_scenario = structured_optimized_scenario(ai_insights_structured)
+        else:
+            optimized_scenario = extract_optimized_scenario(ai_insights_text)
+        if optimized_scenario:
+            st.markdown("---")
+            st.markdown(f"**AI Hypothetical Optimized Scenario (in {CURRENCY_SYMBOL})**")
+            col_opt1, col_opt2 = st.columns(2)
+            with col_opt1:
+                st.metric(label="Approx. Optimized Cost", value=f"{CURRENCY_SYMBOL}{optimized_scenario['cost']}" if optimized_scenario['cost'] != "Not specified" else "Not specified")
+            with col_opt2:
+                st.metric(label="Approx. Optimized Duration", value=optimized_scenario['duration'])
+    else:
+        st.info("AI insights will appear here after estimation or if an error occurred.")
+    insight_cache = get_insight_cache()
+    if insight_cache:
+        cache_stats = insight_cache.stats()
+        st.caption(f"AI response cache: {cache_stats['memory_hits'] + cache_stats['disk_hits']} hits, "
+                   f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate)")
+    provider_stats = get_provider().stats() if hasattr(get_provider(), "stats") else None
+    if provider_stats and provider_stats["breaker"] != "closed":
+        st.caption(f"LLM circuit breaker is {provider_stats['breaker']}: AI requests fail fast to the computed summary until the upstream recovers.")
+    gateway_stats = get_gateway().stats()
+    st.caption(f"AI gateway: {gateway_stats['running']} running, {gateway_stats['queued']} queued, "
+               f"{gateway_stats['coalesced']} of {gateway_stats['submitted']} requests shared with an identical one in flight")
+
+def render_export_section(project_inputs_for_export, cocomo_results, cost_summary, ai_insights_for_display, ai_insights_structured=None):
+    if cost_summary.get('breakdown_details'):
+        # The reports are only built when a download button is clicked (on a separate thread) and are
+        # cached by content, so showing this tab costs nothing on reruns.
+        st.download_button(
+            label="📥 Download Excel Report",
+            data=partial(get_excel_export, project_inputs_for_export, cocomo_results, cost_summary, ai_insights_for_display),
+            file_name=f"{project_inputs_for_export.get('name', 'Project').replace(' ','_')}_Cost_Estimation_INR.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
+        st.download_button(
+            label="📄 Download PDF Report",
+            data=partial(get_pdf_export, project_inputs_for_export, cocomo_results, cost_summary,
+                         ai_insights_for_display, ai_insights_structured),
+            file_name=f"{project_inputs_for_export.get('name', 'Project').replace(' ','_')}_Cost_Estimation_Report_INR.pdf",
+            mime="application/pdf"
+        )
+    else:
+        st.info("Generate an estimate to enable report downloads. Ensure a cost breakdown was calculated.")
+
+
 def initialize_session_state_estimator():
     """Initializes session state variables for the estimator page."""
     defaults = {
@@ -28,6 +121,13 @@ def initialize_session_state_estimator():
         "contingency_val_ui": 10,
         "workflow_complexity_val_ui": WORKFLOW_COMPLEXITY_OPTIONS[0],
         "types_of_users_val_ui": [USER_TYPES_OPTIONS[0]],
+        "mc_enabled_val_ui": False,
+        "mc_distribution_val_ui": KLOC_DISTRIBUTIONS[0],
+        "mc_kloc_range_pct_val_ui": (-20, 40),
+        "mc_rate_range_pct_val_ui": (0, 0),
+        "mc_contingency_spread_val_ui": 0,
+        "mc_samples_val_ui": 200_000,
+        "ai_prefetch_val_ui": os.getenv("AI_PREFETCH_ENABLED", "false").lower() in ("1", "true", "yes"),
         "show_results_estimator_ui": False
     }
     for key, value in defaults.items():
@@ -154,9 +254,95 @@ def estimator_tool_page():
                 default=st.session_state.types_of_users_val_ui,
                 key="types_of_users_widget_ui"
             )
+
+    st.subheader("6. Uncertainty Analysis (Optional)")
+    with st.container(border=True):
+        mc_enabled_input = st.checkbox(
+            "Run Monte Carlo simulation for P50/P80/P90 cost and duration",
+            value=st.session_state.mc_enabled_val_ui, key="mc_enabled_widget_ui"
+        )
+        col_mc1, col_mc2 = st.columns(2)
+        with col_mc1:
+            mc_distribution_input = st.selectbox(
+                "KLOC Distribution", options=KLOC_DISTRIBUTIONS,
+                index=KLOC_DISTRIBUTIONS.index(st.session_state.mc_distribution_val_ui),
+                key="mc_distribution_widget_ui", disabled=not mc_enabled_input,
+                help="For lognormal, the KLOC range is read as the P10..P90 span around the estimate."
+            )
+            mc_kloc_range_pct_input = st.slider(
+                "KLOC Range around Estimate (%)", -80, 200,
+                value=st.session_state.mc_kloc_range_pct_val_ui,
+                key="mc_kloc_range_widget_ui", disabled=not mc_enabled_input
+            )
+            mc_samples_input = st.select_slider(
+                "Samples", options=[100_000, 200_000, 500_000, 1_000_000],
+                value=st.session_state.mc_samples_val_ui,
+                key="mc_samples_widget_ui", disabled=not mc_enabled_input
+            )
+        with col_mc2:
+            mc_rate_range_pct_input = st.slider(
+                "Rate Variation (%)", -50, 50,
+                value=st.session_state.mc_rate_range_pct_val_ui,
+                key="mc_rate_range_widget_ui", disabled=not mc_enabled_input
+            )
+            mc_contingency_spread_input = st.slider(
+                "Contingency Spread (± percentage points)", 0, 20,
+                value=st.session_state.mc_contingency_spread_val_ui,
+                key="mc_contingency_spread_widget_ui", disabled=not mc_enabled_input
+            )
     
     st.markdown("---")
 
+    active_roles_data = [
+        {
+            "role_name": role.get("role_name", "N/A"), 
+            "count": role.get("count", 0),
+            "rate_ph": role.get("rate_ph", 0.0)
+        }
+        for role in st.session_state.roles_estimator_ui
+        if role.get("count", 0) > 0 and role.get("rate_ph", 0) >= 0
+    ]
+    project_all_inputs = {
+        "name": project_name_input, 
+        "description": project_description_input,
+        "primary_tech_stack": primary_tech_stack_input, # Keep as list for now, handle in export
+        "project_type": project_type_input,
+        "kloc": kloc_input, 
+        "cocomo_mode": cocomo_mode_input,
+        "roles_data": active_roles_data, 
+        "team_details_full": st.session_state.roles_estimator_ui, 
+        "contingency": contingency_percentage_input,
+        "workflow_complexity": workflow_complexity_input,
+        "types_of_users": types_of_users_input # Keep as list for now
+    }
+
+    # Opt-in: once the form has been left unchanged for a moment, start the AI request in the
+    # background so the button can pick up a finished (or running) result.
+    ai_prefetch_input = st.toggle(
+        "⚡ Prefetch AI insights while I finish the form", value=st.session_state.ai_prefetch_val_ui,
+        key="ai_prefetch_widget_ui",
+        help="Starts the AI request a few seconds after your last change; any later change cancels it."
+    )
+    st.session_state.ai_prefetch_val_ui = ai_prefetch_input
+    ai_prefetcher = st.session_state.setdefault("ai_prefetcher_ui", InsightPrefetcher())
+    prefetch_key = None
+    if ai_prefetch_input and kloc_input > 0 and active_roles_data:
+        prefetch_results, prefetch_summary = estimate_project(
+            kloc_input, cocomo_mode_input, active_roles_data, contingency_percentage_input
+        )
+        if prefetch_results is not None:
+            prefetch_args = ai_request_args(project_all_inputs, prefetch_results, prefetch_summary)
+            prefetch_key = stable_hash(prefetch_args)
+            ai_prefetcher.update(prefetch_key, partial(start_ai_job, prefetch_args, project_all_inputs, prefetch_results,
+                                                       prefetch_summary, st.session_state.get("username")))
+            prefetch_status = ai_prefetcher.status(prefetch_key)
+            if prefetch_status:
+                st.caption({"waiting": "⚡ AI prefetch starts once the form is unchanged for a moment.",
+                            "running": "⚡ AI insights for the current inputs are being prefetched.",
+                            "ready": "⚡ AI insights for the current inputs are ready."}[prefetch_status])
+    if prefetch_key is None:
+        ai_prefetcher.cancel()
+
     if st.button(f"💰 Calculate Estimate & Get AI Insights", type="primary", use_container_width=True, key="main_calc_button_ui"):
         st.session_state.project_name_val_ui = project_name_input
         st.session_state.project_description_val_ui = project_description_input
@@ -167,17 +353,13 @@ def estimator_tool_page():
         st.session_state.contingency_val_ui = contingency_percentage_input
         st.session_state.workflow_complexity_val_ui = workflow_complexity_input
         st.session_state.types_of_users_val_ui = types_of_users_input
+        st.session_state.mc_enabled_val_ui = mc_enabled_input
+        st.session_state.mc_distribution_val_ui = mc_distribution_input
+        st.session_state.mc_kloc_range_pct_val_ui = mc_kloc_range_pct_input
+        st.session_state.mc_rate_range_pct_val_ui = mc_rate_range_pct_input
+        st.session_state.mc_contingency_spread_val_ui = mc_contingency_spread_input
+        st.session_state.mc_samples_val_ui = mc_samples_input
 
-        active_roles_data = [
-            {
-                "role_name": role.get("role_name", "N/A"), 
-                "count": role.get("count", 0),
-                "rate_ph": role.get("rate_ph", 0.0)
-            }
-            for role in st.session_state.roles_estimator_ui
-            if role.get("count", 0) > 0 and role.get("rate_ph", 0) >= 0
-        ]
-        
         valid_input = True
         if not active_roles_data and not any(role.get("count", 0) > 0 for role in st.session_state.roles_estimator_ui):
             st.error("Please define at least one team member with a count greater than zero.")
@@ -191,76 +373,67 @@ def estimator_tool_page():
 
         if valid_input:
             with st.spinner("Calculating COCOMO and initial cost..."):
-                effort_pm, duration_m = calculate_cocomo(kloc_input, cocomo_mode_input)
+                cocomo_results, cost_summary = estimate_project(
+                    kloc_input, cocomo_mode_input, active_roles_data, contingency_percentage_input
+                )
                 
-                if effort_pm is None: 
+                if cocomo_results is None: 
                     st.error("Invalid COCOMO mode selected.")
                     st.stop()
-
-                subtotal_cost, total_cost_with_contingency, cost_breakdown_details = calculate_cost(
-                    active_roles_data, duration_m, contingency_percentage_input
-                )
                 
                 st.session_state.show_results_estimator_ui = True 
-                st.session_state.cocomo_results_ui = {"effort_pm": effort_pm, "duration_m": duration_m}
-                st.session_state.cost_summary_ui = {
-                    "subtotal": subtotal_cost,
-                    "total_with_contingency": total_cost_with_contingency,
-                    "contingency_percentage": contingency_percentage_input,
-                    "breakdown_details": cost_breakdown_details
-                }
-                project_all_inputs = {
-                    "name": project_name_input, 
-                    "description": project_description_input,
-                    "primary_tech_stack": primary_tech_stack_input, # Keep as list for now, handle in export
-                    "project_type": project_type_input,
-                    "kloc": kloc_input, 
-                    "cocomo_mode": cocomo_mode_input,
-                    "roles_data": active_roles_data, 
-                    "team_details_full": st.session_state.roles_estimator_ui, 
-                    "contingency": contingency_percentage_input,
-                    "workflow_complexity": workflow_complexity_input,
-                    "types_of_users": types_of_users_input # Keep as list for now
-                }
+                st.session_state.cocomo_results_ui = cocomo_results
+                st.session_state.cost_summary_ui = cost_summary
                 st.session_state.project_inputs_ui = project_all_inputs
-
-            with st.spinner("🤖 Generating AI-powered insights and optimizations... (This may take a moment)"):
-                roles_details_for_ai = []
-                for r_item in st.session_state.roles_estimator_ui:
-                    if r_item.get("count",0) > 0:
-                        role_str = (f"- Name: {r_item.get('role_name', 'N/A')}, "
-                                    f"Type: {r_item.get('role_type', 'N/A')}, "
-                                    f"Tech: {', '.join(r_item.get('tech_stack_role', ['N/A'])) if r_item.get('tech_stack_role') else 'N/A'}, "
-                                    f"Count: {r_item.get('count',0)}, "
-                                    f"Rate: {CURRENCY_SYMBOL}{r_item.get('rate_ph',0):,}/hr")
-                        roles_details_for_ai.append(role_str)
-                roles_data_str_for_ai = "\n".join(roles_details_for_ai)
-                
-                ai_context_for_prompt = (
-                    f"Project Description: {project_description_input}\n"
-                    f"Primary Tech Stack: {', '.join(primary_tech_stack_input) if primary_tech_stack_input else 'N/A'}\n"
-                    f"Project Type: {project_type_input}\n"
-                    f"Workflow Complexity: {workflow_complexity_input}\n"
-                    f"User Types: {', '.join(types_of_users_input) if types_of_users_input else 'N/A'}\n"
-                    f"Team Details:\n{roles_data_str_for_ai}"
+                st.session_state.estimate_id_ui = save_estimate(
+                    st.session_state.get("username"), project_all_inputs, cocomo_results, cost_summary
                 )
 
-                ai_response = get_ai_insights( 
-                    project_name_input, kloc_input, cocomo_mode_input, 
-                    effort_pm, duration_m, total_cost_with_contingency, 
-                    ai_context_for_prompt 
-                )
-                st.session_state.ai_insights_ui = ai_response
+                st.session_state.simulation_results_ui = None
+                if mc_enabled_input:
+                    kloc_low = max(kloc_input * (1 + mc_kloc_range_pct_input[0] / 100), 0.1)
+                    kloc_high = max(kloc_input * (1 + mc_kloc_range_pct_input[1] / 100), kloc_input)
+                    st.session_state.simulation_results_ui = run_monte_carlo(
+                        (min(kloc_low, kloc_input), kloc_input, kloc_high), cocomo_mode_input, active_roles_data,
+                        contingency_percentage=contingency_percentage_input,
+                        distribution=mc_distribution_input,
+                        rate_range_pct=mc_rate_range_pct_input,
+                        contingency_range=(max(contingency_percentage_input - mc_contingency_spread_input, 0),
+                                           contingency_percentage_input + mc_contingency_spread_input),
+                        n_samples=mc_samples_input
+                    )
+
+            # None of the deterministic results depend on the LLM, so the AI call runs in the background
+            # while they render; the AI tab and the exports are filled in when it finishes.
+            # Identical requests in flight (from any session) are shared by the gateway, so the new job is
+            # requested before the previous one is released.
+            # A prefetched job for exactly these inputs is reused as is.
+            previous_ai_job = st.session_state.pop("ai_job_ui", None)
+            st.session_state.ai_insights_ui = None
+            st.session_state.ai_insights_structured_ui = None
+            ai_args = ai_request_args(project_all_inputs, cocomo_results, cost_summary)
+            st.session_state.ai_job_ui = (
+                ai_prefetcher.take(stable_hash(ai_args))
+                or start_ai_job(ai_args, project_all_inputs, cocomo_results, cost_summary, st.session_state.get("username"))
+            )
+            if previous_ai_job is not None:
+                previous_ai_job.cancel()
             
-            st.success("Estimation and AI insights generated successfully!")
+            st.success("Estimation generated successfully! AI insights are being generated in the background.")
 
     if st.session_state.get("show_results_estimator_ui", False):
+        import pandas as pd # deferred so the form renders without loading pandas
+
         st.markdown("---")
         st.header("📈 Estimation Results")
 
         cocomo_results = st.session_state.cocomo_results_ui
         cost_summary = st.session_state.cost_summary_ui
         project_inputs_for_export = st.session_state.project_inputs_ui
+        ai_job = st.session_state.get("ai_job_ui")
+        if ai_job is not None and ai_job.done:
+            finish_ai_job(ai_job)
+            ai_job = None
         ai_insights_for_display = st.session_state.ai_insights_ui
 
         col_res1, col_res2, col_res3 = st.columns(3)
@@ -275,22 +448,12 @@ def estimator_tool_page():
 
         st.markdown("---")
         
-        tab_bd, tab_ai, tab_ex = st.tabs([f"📊 Cost Breakdown", f"💡 AI Insights & Optimizations", f"📥 Export Report"])
+        tab_bd, tab_mc, tab_sens, tab_ai, tab_ex = st.tabs([f"📊 Cost Breakdown", f"🎲 Uncertainty", f"🌪️ Sensitivity", f"💡 AI Insights & Optimizations", f"📥 Export Report"])
 
         with tab_bd:
             st.subheader(f"Detailed Cost Breakdown (in {CURRENCY_SYMBOL})")
             if cost_summary['breakdown_details']:
-                breakdown_list = []
-                for role, details in cost_summary['breakdown_details'].items():
-                    breakdown_list.append({
-                        "Item/Role": role,
-                        "Count/Multiplier": details.get('count', '-'),
-                        f"Rate/hr or Factor ({CURRENCY_SYMBOL})": details.get('rate_ph', '-'),
-                        f"Monthly Cost ({CURRENCY_SYMBOL})": details.get('monthly_cost_per_person', '-'),
-                        f"Total Cost ({CURRENCY_SYMBOL})": details.get('total_role_cost', 0)
-                    })
-                
-                cost_df_for_export = pd.DataFrame(breakdown_list) 
+                cost_df_for_export = breakdown_dataframe(cost_summary['breakdown_details'])
                 st.session_state.cost_breakdown_df_ui = cost_df_for_export
 
                 cost_df_display = cost_df_for_export.copy()
@@ -308,69 +471,102 @@ def estimator_tool_page():
                              )
                 st.dataframe(cost_df_display, use_container_width=True, hide_index=True)
                 
-                chart_bytes = generate_cost_pie_chart_bytes(cost_summary['breakdown_details'])
+                chart_bytes = cost_pie_chart_png(cost_summary['breakdown_details']) # memoized by content
                 if chart_bytes:
                     st.image(chart_bytes, caption="Cost Distribution by Role/Item")
             else:
                 st.info("No cost breakdown details available.")
 
+        with tab_mc:
+            st.subheader(f"Monte Carlo Simulation (in {CURRENCY_SYMBOL})")
+            simulation_results = st.session_state.get("simulation_results_ui")
+            if simulation_results:
+                st.caption(f"{simulation_results['n_samples']:,} samples")
+                for percentile_key, col_mc in zip(("P50", "P80", "P90"), st.columns(3)):
+                    with col_mc:
+                        st.metric(label=f"{percentile_key} Cost", value=f"{CURRENCY_SYMBOL}{simulation_results['cost'][percentile_key]:,.2f}")
+                        st.metric(label=f"{percentile_key} Duration", value=f"{simulation_results['duration'][percentile_key]:.2f} Months")
+                col_hist1, col_hist2 = st.columns(2)
+                for col_hist, hist_key, axis_label in ((col_hist1, "cost_histogram", f"Total Cost ({CURRENCY_SYMBOL})"),
+                                                       (col_hist2, "duration_histogram", "Duration (Months)")):
+                    counts, edges = simulation_results[hist_key]
+                    with col_hist:
+                        st.bar_chart(pd.DataFrame({axis_label: (edges[:-1] + edges[1:]) / 2, "Samples": counts}),
+                                     x=axis_label, y="Samples")
+            else:
+                st.info("Enable the Monte Carlo simulation in section 6 to see cost and duration confidence levels.")
+
+        with tab_sens:
+            st.subheader(f"Sensitivity Analysis (in {CURRENCY_SYMBOL})")
+            base_contingency = cost_summary['contingency_percentage']
+            sensitivity_grid = compute_sensitivity_grid(
+                project_inputs_for_export['kloc'], project_inputs_for_export['roles_data'], base_contingency
+            )
+            baseline_cost, sensitivity_rows = tornado_rows(sensitivity_grid, project_inputs_for_export['cocomo_mode'], base_contingency)
+            tornado_chart = cached_tornado_chart(baseline_cost, sensitivity_rows)
+            if tornado_chart:
+                st.image(tornado_chart, caption="Cost swing per factor, one factor at a time")
+
+            st.markdown("**What-if Explorer**")
+            st.caption("All combinations are precomputed; moving these controls only reads from the grid.")
+            col_sens1, col_sens2, col_sens3, col_sens4 = st.columns(4)
+            with col_sens1:
+                sens_kloc_delta = st.select_slider("KLOC Change (%)", options=sensitivity_grid['kloc_deltas_pct'], value=0, key="sens_kloc_widget_ui")
+            with col_sens2:
+                sens_mode = st.selectbox("COCOMO Mode", options=sensitivity_grid['modes'],
+                                         index=sensitivity_grid['modes'].index(project_inputs_for_export['cocomo_mode']), key="sens_mode_widget_ui")
+            with col_sens3:
+                sens_contingency = st.select_slider("Contingency (%)", options=sensitivity_grid['contingency_levels'], value=base_contingency, key="sens_contingency_widget_ui")
+            with col_sens4:
+                sens_variant = st.selectbox("Team Change", options=sensitivity_grid['variants'], key="sens_variant_widget_ui")
+
+            sens_cell = grid_lookup(sensitivity_grid, sens_kloc_delta, sens_mode, sens_contingency, sens_variant)
+            col_sm1, col_sm2, col_sm3 = st.columns(3)
+            with col_sm1:
+                st.metric(label="Effort", value=f"{sens_cell['effort_pm']:.2f} PM",
+                          delta=f"{sens_cell['effort_pm'] - cocomo_results['effort_pm']:+.2f}", delta_color="inverse")
+            with col_sm2:
+                st.metric(label="Duration", value=f"{sens_cell['duration_m']:.2f} Months",
+                          delta=f"{sens_cell['duration_m'] - cocomo_results['duration_m']:+.2f}", delta_color="inverse")
+            with col_sm3:
+                st.metric(label="Total Cost", value=f"{CURRENCY_SYMBOL}{sens_cell['total_cost']:,.2f}",
+                          delta=f"{sens_cell['total_cost'] - baseline_cost:+,.2f}", delta_color="inverse")
+
+            sens_mode_idx = sensitivity_grid['modes'].index(sens_mode)
+            sens_variant_idx = sensitivity_grid['variants'].index(sens_variant)
+            st.image(cached_heatmap_chart(
+                sensitivity_grid['key'], sens_mode, sens_variant,
+                sensitivity_grid['total_cost'][:, sens_mode_idx, :, sens_variant_idx],
+                [f"{d:+g}%" for d in sensitivity_grid['kloc_deltas_pct']],
+                [f"{c}%" for c in sensitivity_grid['contingency_levels']]
+            ), caption="Total cost by KLOC change and contingency")
+
         with tab_ai:
             st.subheader("🤖 AI-Powered Insights")
-            if ai_insights_for_display:
-                st.markdown(ai_insights_for_display)
-            else:
-                st.info("AI insights will appear here after estimation or if an error occurred.")
+            ai_tab_placeholder = st.empty()
         
         with tab_ex:
             st.subheader("Download Your Report")
-            if 'cost_breakdown_df_ui' in st.session_state and not st.session_state.cost_breakdown_df_ui.empty:
-                cost_breakdown_df_to_export = st.session_state.cost_breakdown_df_ui
-                
-                # --- CORRECTED EXCEL INPUTS DATA PREPARATION ---
-                excel_inputs_data = {}
-                for k, v in project_inputs_for_export.items():
-                    if k == "team_details_full" or k == "roles_data": # Handle list of dicts specifically
-                        try:
-                            excel_inputs_data[k] = json.dumps(v) # Convert list of dicts to JSON string
-                        except TypeError:
-                            excel_inputs_data[k] = str(v) # Fallback to generic string conversion
-                    elif isinstance(v, list): # For other lists (like tech stack, user types)
-                        excel_inputs_data[k] = ", ".join(str(item) for item in v) # Ensure all items are strings before joining
-                    else:
-                        excel_inputs_data[k] = v
-                # --- END OF CORRECTION ---
-
-                excel_dfs = {
-                    "Inputs": pd.DataFrame([excel_inputs_data]), 
-                    "COCOMO & Cost Summary": pd.DataFrame([{
-                        **cocomo_results, 
-                        f"Subtotal Cost ({CURRENCY_SYMBOL})": cost_summary['subtotal'], 
-                        f"Total Cost with Contingency ({CURRENCY_SYMBOL})": cost_summary['total_with_contingency'],
-                        "Contingency Percentage": cost_summary['contingency_percentage']
-                    }]),
-                    f"Cost Breakdown ({CURRENCY_SYMBOL})": cost_breakdown_df_to_export,
-                    "AI Insights": pd.DataFrame({"Insights": [ai_insights_for_display if ai_insights_for_display else "N/A"]})
-                }
-                excel_bytes = df_to_excel_bytes(excel_dfs)
-                st.download_button(
-                    label="📥 Download Excel Report", data=excel_bytes,
-                    file_name=f"{project_inputs_for_export.get('name', 'Project').replace(' ','_')}_Cost_Estimation_INR.xlsx",
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
+            export_placeholder = st.empty()
 
-                pdf_bytes = create_pdf_report( 
-                    project_data=project_inputs_for_export,
-                    cocomo_results=cocomo_results, cost_summary=cost_summary,
-                    cost_breakdown_df=cost_breakdown_df_to_export, 
-                    ai_insights_raw=ai_insights_for_display if ai_insights_for_display else "No AI insights generated."
-                )
-                st.download_button(
-                    label="📄 Download PDF Report", data=pdf_bytes,
-                    file_name=f"{project_inputs_for_export.get('name', 'Project').replace(' ','_')}_Cost_Estimation_Report_INR.pdf",
-                    mime="application/pdf"
-                )
-            else:
-                st.info("Generate an estimate to enable report downloads. Ensure a cost breakdown was calculated.")
+        if ai_job is not None:
+            export_placeholder.info("Reports will be available as soon as the AI insights are ready.")
+            ai_tab_placeholder.info("🤖 Generating AI-powered insights and optimizations... (This may take a moment)")
+            for partial_ai_text in ai_job.iter_text(poll_interval=0.5):
+                if partial_ai_text:
+                    ai_tab_placeholder.markdown(partial_ai_text + " ▌")
+                elif ai_job.queue_position:
+                    ai_tab_placeholder.info(f"🤖 Waiting for a free AI slot - position {ai_job.queue_position} in the queue...")
+                else:
+                    ai_tab_placeholder.info("🤖 Generating AI-powered insights and optimizations... (This may take a moment)")
+            finish_ai_job(ai_job)
+            ai_insights_for_display = ai_job.text
+        ai_insights_structured = st.session_state.get("ai_insights_structured_ui")
+
+        with ai_tab_placeholder.container():
+            render_ai_insights_section(ai_insights_for_display, ai_insights_structured)
+        with export_placeholder.container():
+            render_export_section(project_inputs_for_export, cocomo_results, cost_summary, ai_insights_for_display, ai_insights_structured)
 
     st.markdown("""
     <style>
@@ -0,0 +1,155 @@
+import copy
+import json
+from datetime import datetime
+from functools import partial
+
+import streamlit as st
+import pandas as pd
+from utils.db import list_estimates, get_estimate, iter_estimates, import_estimates
+from utils.export_utils import estimates_excel_bytes
+
+CURRENCY_SYMBOL = "₹"
+
+
+def history_excel_bytes(username):
+    """Excel workbook of all of a user's estimates, newest first."""
+    return estimates_excel_bytes(iter_estimates(username))
+
+
+def format_saved(created_at):
+    """Save time of a history row; anything but a datetime (e.g. an old import) is shown as is."""
+    return created_at.strftime("%Y-%m-%d %H:%M") if isinstance(created_at, datetime) else str(created_at or "-")
+
+
+def format_cost(total_cost):
+    """Total cost of a history row, or "-" if it is missing or not a number."""
+    if isinstance(total_cost, bool) or not isinstance(total_cost, (int, float)):
+        return "-"
+    return f"{CURRENCY_SYMBOL}{total_cost:,.2f}"
+
+
+def load_estimate_into_session(estimate):
+    """
+    Puts a saved estimate into the session keys the Estimator page renders from, so its results,
+    AI insights and exports show up without recomputing anything or calling the AI again.
+    """
+    project_inputs = estimate["project_inputs"]
+    previous_ai_job = st.session_state.pop("ai_job_ui", None)
+    if previous_ai_job is not None:
+        previous_ai_job.cancel()
+
+    st.session_state.show_results_estimator_ui = True
+    st.session_state.cocomo_results_ui = estimate["cocomo_results"]
+    st.session_state.cost_summary_ui = estimate["cost_summary"]
+    st.session_state.project_inputs_ui = project_inputs
+    st.session_state.simulation_results_ui = None
+    st.session_state.ai_insights_ui = estimate["ai_insights"]
+    st.session_state.ai_insights_structured_ui = estimate["ai_insights_structured"]
+    st.session_state.estimate_id_ui = estimate["id"]
+
+    # Refill the form with the inputs of the estimate.
+    team = copy.deepcopy(project_inputs.get("team_details_full") or [])
+    if team:
+        st.session_state.roles_estimator_ui = team
+        st.session_state.next_role_id_estimator_ui = max(role.get("id", 0) for role in team) + 1
+    form_values = {
+        "project_name_val_ui": "name", "project_description_val_ui": "description",
+        "primary_tech_stack_val_ui": "primary_tech_stack", "project_type_val_ui": "project_type",
+        "kloc_val_ui": "kloc", "cocomo_mode_selected_val_ui": "cocomo_mode", "contingency_val_ui": "contingency",
+        "workflow_complexity_val_ui": "workflow_complexity", "types_of_users_val_ui": "types_of_users",
+    }
+    for session_key, input_key in form_values.items():
+        if input_key in project_inputs:
+            st.session_state[session_key] = project_inputs[input_key]
+
+
+def history_page():
+    st.set_page_config(layout="wide", page_title="Estimate History")
+
+    if not st.session_state.get("logged_in", False):
+        st.warning("Please log in to see your saved estimates.")
+        st.page_link("pages/2_👤_Account.py", label="Go to Login/Register Page", icon="👤")
+        st.stop()
+
+    username = st.session_state.get("username")
+    st.title("🕘 Estimate History")
+    st.caption("Every estimate you calculate is saved here. Open one to see its results, AI insights and reports again.")
+
+    # Cursors of the pages visited so far; the last one is the page shown.
+    page_cursors = st.session_state.setdefault("history_cursors_ui", [None])
+    rows, next_cursor = list_estimates(username, cursor=page_cursors[-1])
+
+    if not rows:
+        st.info("No saved estimates yet. Use the Estimator Tool to create one.")
+    else:
+        history_df = pd.DataFrame([{
+            "Saved": format_saved(row["created_at"]),
+            "Project": row["name"],
+            "Type": row["project_type"],
+            "KLOC": row["kloc"],
+            "Mode": row["cocomo_mode"],
+            "Effort (PM)": row["effort_pm"],
+            "Duration (Months)": row["duration_m"],
+            f"Total Cost ({CURRENCY_SYMBOL})": format_cost(row["total_cost"]),
+        } for row in rows])
+        st.dataframe(history_df, use_container_width=True, hide_index=True)
+
+        col_sel, col_open = st.columns([4, 1])
+        with col_sel:
+            selected_row = st.selectbox(
+                "Estimate", options=rows, key="history_selected_widget_ui", label_visibility="collapsed",
+                format_func=lambda row: f"{format_saved(row['created_at'])} - {row['name'] or 'Unnamed project'} "
+                                        f"({format_cost(row['total_cost'])})"
+            )
+        with col_open:
+            if st.button("📂 Open in Estimator", type="primary", use_container_width=True):
+                estimate = get_estimate(username, selected_row["id"])
+                if estimate is None:
+                    st.error("This estimate could not be loaded.")
+                else:
+                    load_estimate_into_session(estimate)
+                    st.switch_page("pages/1_📈_Estimator.py")
+
+    col_prev, col_page, col_next = st.columns([1, 4, 1])
+    with col_prev:
+        if st.button("⬅️ Newer", disabled=len(page_cursors) == 1, use_container_width=True):
+            page_cursors.pop()
+            st.rerun()
+    with col_page:
+        st.caption(f"Page {len(page_cursors)}")
+    with col_next:
+        if st.button("Older ➡️", disabled=next_cursor is None, use_container_width=True):
+            page_cursors.append(next_cursor)
+            st.rerun()
+
+    st.markdown("---")
+    st.subheader("Export / Import")
+    col_export, col_import = st.columns(2)
+    with col_export:
+        if st.button("Prepare JSON export of all estimates"):
+            st.session_state.history_export_ui = json.dumps(list(iter_estimates(username)), default=str, ensure_ascii=False)
+        if st.session_state.get("history_export_ui"):
+            st.download_button("📥 Download Estimate History (JSON)", data=st.session_state.history_export_ui,
+                               file_name=f"{username}_estimate_history.json", mime="application/json")
+        # Built on click, straight from the database cursor: one sheet row per estimate, team member and cost item.
+        st.download_button("📥 Download Estimate History (Excel)", data=partial(history_excel_bytes, username),
+                           file_name=f"{username}_estimate_history_INR.xlsx",
+                           mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+    with col_import:
+        uploaded_history = st.file_uploader("Import estimates from a JSON export", type=["json"], key="history_import_widget_ui")
+        if uploaded_history is not None and st.button("Import"):
+            try:
+                imported_estimates = json.load(uploaded_history)
+            except ValueError as e:
+                st.error(f"Could not read the file: {e}")
+            else:
+                inserted, error_message = import_estimates(username, imported_estimates)
+                if error_message:
+                    st.error(error_message)
+                if inserted:
+                    st.success(f"Imported {inserted:,} estimates.")
+                    st.session_state.history_cursors_ui = [None]
+
+
+if __name__ == "__main__":
+    history_page()
@@ -0,0 +1,120 @@
+"""
+Offline end-to-end latency benchmark of the estimate -> AI insights -> PDF pipeline.
+
+Starts the local LLM stub (or uses --base-url), routes the Groq provider to it and reports
+p50/p95/p99 latency and throughput, overall and per stage:
+
+    python scripts/bench_ai_pipeline.py --requests 200 --concurrency 16 --latency-ms 300 --tokens-per-sec 400
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_stub_server import StubConfig, start_stub_server  # noqa: E402
+from utils.ai_helper import generate_ai_insights, stream_ai_insights  # noqa: E402
+from utils.estimate import estimate_project, breakdown_dataframe, build_ai_context  # noqa: E402
+from utils.export_utils import create_pdf_report  # noqa: E402
+from utils.llm_providers import GroqProvider, set_provider  # noqa: E402
+from utils.llm_resilience import resilient_provider_from_env  # noqa: E402
+
+SAMPLE_PROJECT = {
+    "name": "Benchmark Project", "description": "Customer portal with reporting", "primary_tech_stack": ["Python", "React"],
+    "project_type": "Web Application", "kloc": 50.0, "cocomo_mode": "semi-detached", "contingency": 10,
+    "workflow_complexity": "Medium (6-15 steps)", "types_of_users": ["Registered Users", "Admin Users"],
+    "team_details_full": [
+        {"role_name": "Developer", "role_type": "Full Stack", "tech_stack_role": ["Python"], "count": 3, "rate_ph": 2000.0},
+        {"role_name": "QA", "role_type": "QA Engineer", "tech_stack_role": ["Python"], "count": 1, "rate_ph": 1200.0},
+    ],
+}
+SAMPLE_PROJECT["roles_data"] = [{k: r[k] for k in ("role_name", "count", "rate_ph")} for r in SAMPLE_PROJECT["team_details_full"]]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def run_pipeline(request_index, stream, output_mode):
+    project = dict(SAMPLE_PROJECT, kloc=SAMPLE_PROJECT["kloc"] + request_index % 7)
+    timings = {}
+    start = time.perf_counter()
+
+    cocomo_results, cost_summary = estimate_project(project["kloc"], project["cocomo_mode"], project["roles_data"], project["contingency"])
+    timings["estimate"] = time.perf_counter() - start
+
+    ai_start = time.perf_counter()
+    ai_args = (project["name"], project["kloc"], project["cocomo_mode"], cocomo_results["effort_pm"],
+               cocomo_results["duration_m"], cost_summary["total_with_contingency"], build_ai_context(project))
+    if stream:
+        chunks = []
+        for chunk in stream_ai_insights(*ai_args, use_cache=False):
+            if not chunks:
+                timings["first_token"] = time.perf_counter() - ai_start
+            chunks.append(chunk)
+        ai_text = "".join(chunks)
+    else:
+        ai_text, ai_structured = generate_ai_insights(*ai_args, use_cache=False, output_mode=output_mode)
+    timings["ai"] = time.perf_counter() - ai_start
+
+    pdf_start = time.perf_counter()
+    create_pdf_report(project, cocomo_results, cost_summary, breakdown_dataframe(cost_summary["breakdown_details"]), ai_text,
+                      ai_insights_structured=None if stream else ai_structured)
+    timings["pdf"] = time.perf_counter() - pdf_start
+
+    timings["total"] = time.perf_counter() - start
+    timings["error"] = "Error generating AI insights" in ai_text
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--stream", action="store_true", help="Use stream_ai_insights (markdown) and report time to first token.")
+    parser.add_argument("--output-mode", choices=["structured", "markdown"], default="structured",
+                        help="Response format of the blocking AI call.")
+    parser.add_argument("--base-url", help="Use an already running stub (or other compatible server) instead of starting one.")
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--tokens-per-sec", type=float, default=1000.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server, base_url = start_stub_server(config=StubConfig(args.latency_ms, args.tokens_per_sec, args.error_rate))
+    # Same deadline/retry/hedging/breaker layer as the app (configured by the AI_* environment variables).
+    provider = resilient_provider_from_env(GroqProvider(api_key="offline-benchmark", base_url=base_url, max_retries=0))
+    set_provider(provider)
+
+    run_pipeline(0, args.stream, args.output_mode) # warm-up: imports, fonts, first connection
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(lambda i: run_pipeline(i, args.stream, args.output_mode), range(args.requests)))
+    wall = time.perf_counter() - wall_start
+    if server:
+        server.shutdown()
+
+    stages = ["total", "estimate", "ai", "pdf"] + (["first_token"] if args.stream else [])
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {'streaming markdown' if args.stream else 'blocking ' + args.output_mode} AI call, "
+          f"LLM at {base_url}")
+    print(f"{'stage':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for stage in stages:
+        values = sorted(r[stage] * 1000 for r in results if stage in r)
+        print(f"{stage:<12}{percentile(values, 50):>10.1f}{percentile(values, 95):>10.1f}"
+              f"{percentile(values, 99):>10.1f}{statistics.fmean(values):>10.1f}")
+    errors = sum(r["error"] for r in results)
+    print(f"throughput: {args.requests / wall:.1f} pipelines/sec over {wall:.2f}s; errors: {errors}")
+    print(f"LLM layer: {provider.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Per-render cost of the cost pie chart: the former pyplot PNG, the object-oriented Agg PNG
+(uncached and memoized) and the reportlab vector drawing used in the PDF report, plus a
+concurrent run to check the renderers under several threads:
+
+    python scripts/bench_charts.py --renders 50 --threads 8
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import charts  # noqa: E402
+
+PNG_SIGNATURE = b"\x89PNG"
+SAMPLE_BREAKDOWN = {
+    "Developer": {"total_role_cost": 5_400_000.0}, "QA Engineer": {"total_role_cost": 1_300_000.0},
+    "UI/UX Designer": {"total_role_cost": 900_000.0}, "Project Manager": {"total_role_cost": 1_100_000.0},
+    "Contingency": {"total_role_cost": 870_000.0},
+}
+
+
+def breakdown_variant(i):
+    """A breakdown with distinct content, so the PNG memo does not hit."""
+    return {role: {"total_role_cost": details["total_role_cost"] + i} for role, details in SAMPLE_BREAKDOWN.items()}
+
+
+def pyplot_pie_png(breakdown):
+    """The previous implementation: pyplot state machine at 150 dpi."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    labels, sizes = charts.cost_slices(breakdown)
+    fig, ax = plt.subplots(figsize=(6, 4))
+    ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, textprops={'fontsize': 8})
+    ax.axis('equal')
+    plt.title("Cost Distribution by Role/Item", fontsize=10)
+    output = BytesIO()
+    plt.savefig(output, format='png', bbox_inches='tight', dpi=150)
+    plt.close(fig)
+    return output.getvalue()
+
+
+def agg_pie_png_uncached(breakdown):
+    charts._png_cache.clear()
+    return charts.cost_pie_chart_png(breakdown)
+
+
+def vector_pie_pdf(breakdown):
+    """Builds the reportlab drawing and renders it into a one-page PDF."""
+    from reportlab.graphics import renderPDF
+
+    output = BytesIO()
+    renderPDF.drawToFile(charts.cost_pie_chart_drawing(breakdown), output)
+    return output.getvalue()
+
+
+def png_in_pdf(breakdown):
+    """The previous PDF path: the PNG embedded as an image."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.lib.utils import ImageReader
+
+    output = BytesIO()
+    canvas = Canvas(output, pagesize=letter)
+    canvas.drawImage(ImageReader(BytesIO(pyplot_pie_png(breakdown))), 72, 400, width=360, height=240)
+    canvas.save()
+    return output.getvalue()
+
+
+def time_renders(render, renders):
+    render(SAMPLE_BREAKDOWN) # warm-up call, not timed
+    timings, size = [], 0
+    for i in range(renders):
+        start = time.perf_counter()
+        size = len(render(breakdown_variant(i)))
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings, size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--renders", type=int, default=30)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    charts.cost_pie_chart_png(SAMPLE_BREAKDOWN) # warm up imports and font caches
+    vector_pie_pdf(SAMPLE_BREAKDOWN)
+    pyplot_pie_png(SAMPLE_BREAKDOWN)
+
+    cases = [
+        ("pyplot PNG, 150 dpi (previous)", pyplot_pie_png),
+        (f"OO Agg PNG, {charts.CHART_DPI} dpi, uncached", agg_pie_png_uncached),
+        ("OO Agg PNG, memoized", lambda breakdown: charts.cost_pie_chart_png(SAMPLE_BREAKDOWN)),
+        ("PDF: pyplot PNG embedded (previous)", png_in_pdf),
+        ("PDF: reportlab vector drawing", vector_pie_pdf),
+    ]
+    print(f"{'renderer':40s} {'mean ms':>9s} {'p95 ms':>9s} {'bytes':>9s}")
+    for name, render in cases:
+        timings, size = time_renders(render, args.renders)
+        timings.sort()
+        print(f"{name:40s} {statistics.mean(timings):9.2f} {timings[int(0.95 * (len(timings) - 1))]:9.2f} {size:9d}")
+
+    charts._png_cache.clear()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        results = list(executor.map(charts.cost_pie_chart_png, [breakdown_variant(i) for i in range(args.renders)]))
+    elapsed = time.perf_counter() - start
+    valid = sum(1 for png in results if png and png.startswith(PNG_SIGNATURE))
+    print(f"\n{args.renders} distinct PNG renders on {args.threads} threads: {elapsed * 1000:.0f} ms total, "
+          f"{valid} valid PNGs")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Time and peak memory of exporting many estimates to Excel: the streaming export
+(utils.export_utils.write_estimates_excel) against the previous approach of building one pandas
+DataFrame per sheet and writing them with pd.ExcelWriter into memory. The "generation" case only
+generates the synthetic estimates, which every case includes. Each case runs in a fresh process
+so its peak RSS is its own:
+
+    python scripts/bench_excel_export.py --estimates 100000 --baseline-estimates 10000
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from multiprocessing import get_context
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.estimate import estimate_project  # noqa: E402
+
+MODES = ("organic", "semi-detached", "embedded")
+SAMPLE_INSIGHTS = "**Optimized Scenario:** reuse components and phase QA onboarding.\n" * 20
+
+
+def synthetic_estimates(count):
+    """Yields count distinct estimates with a three-role team, generated lazily."""
+    for i in range(count):
+        team = [
+            {"role_name": "Developer", "role_type": "Full Stack", "tech_stack_role": ["Python", "React"],
+             "count": 2 + i % 6, "rate_ph": 1800.0 + 10 * (i % 20)},
+            {"role_name": "QA Engineer", "role_type": "QA", "tech_stack_role": ["Selenium"], "count": 1, "rate_ph": 1400.0},
+            {"role_name": "Project Manager", "role_type": "Management", "tech_stack_role": [], "count": 1, "rate_ph": 2600.0},
+        ]
+        roles = [{key: member[key] for key in ("role_name", "count", "rate_ph")} for member in team]
+        project_inputs = {"name": f"Project {i + 1}", "description": "Synthetic benchmark project",
+                          "primary_tech_stack": ["Python"], "project_type": "Web Application", "kloc": 5 + i % 120,
+                          "cocomo_mode": MODES[i % 3], "contingency": 10, "roles_data": roles,
+                          "team_details_full": team, "workflow_complexity": "Simple (1-5 steps)",
+                          "types_of_users": ["Admin", "End User"]}
+        cocomo_results, cost_summary = estimate_project(project_inputs["kloc"], project_inputs["cocomo_mode"], roles, 10)
+        yield {"project_inputs": project_inputs, "cocomo_results": cocomo_results, "cost_summary": cost_summary,
+               "ai_insights": SAMPLE_INSIGHTS}
+
+
+def streaming_export(count, path):
+    from utils.export_utils import write_estimates_excel
+
+    write_estimates_excel(path, synthetic_estimates(count))
+
+
+def df_to_excel_bytes(df_dict):
+    """The previous Excel export: a dictionary of DataFrames written to an Excel file in memory."""
+    import pandas as pd
+
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        for sheet_name, df in df_dict.items():
+            df.to_excel(writer, sheet_name=sheet_name, index=False)
+    return output.getvalue()
+
+
+def dataframe_export(count, path):
+    """The previous approach: every sheet as a DataFrame, the team as JSON in the Inputs sheet."""
+    import json
+    import pandas as pd
+    from utils.estimate import breakdown_rows, BREAKDOWN_COLUMNS
+
+    inputs, summaries, breakdowns, insights = [], [], [], []
+    for number, estimate in enumerate(synthetic_estimates(count), start=1):
+        inputs.append({"Estimate": number, **{key: json.dumps(value) if key in ("roles_data", "team_details_full")
+                                              else ", ".join(value) if isinstance(value, list) else value
+                                              for key, value in estimate["project_inputs"].items()}})
+        summaries.append({"Estimate": number, **estimate["cocomo_results"],
+                          "subtotal": estimate["cost_summary"]["subtotal"],
+                          "total_with_contingency": estimate["cost_summary"]["total_with_contingency"]})
+        breakdowns.extend((number, *row) for row in breakdown_rows(estimate["cost_summary"]["breakdown_details"]))
+        insights.append({"Estimate": number, "Insights": estimate["ai_insights"]})
+    excel_bytes = df_to_excel_bytes({
+        "Inputs": pd.DataFrame(inputs), "COCOMO & Cost Summary": pd.DataFrame(summaries),
+        "Cost Breakdown": pd.DataFrame(breakdowns, columns=["Estimate", *BREAKDOWN_COLUMNS]),
+        "AI Insights": pd.DataFrame(insights),
+    })
+    with open(path, "wb") as output:
+        output.write(excel_bytes)
+
+
+def generation_only(count, path):
+    """Just generates the estimates: the part of every case's time that is not exporting."""
+    for _ in synthetic_estimates(count):
+        pass
+    open(path, "wb").close()
+
+
+CASES = {"generation": generation_only, "streaming": streaming_export, "dataframes": dataframe_export}
+
+
+def run_case(case, count, path):
+    start = time.perf_counter()
+    CASES[case](count, path)
+    seconds = time.perf_counter() - start
+    return seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, os.path.getsize(path) / 1024 / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--estimates", type=int, default=100_000)
+    parser.add_argument("--baseline-estimates", type=int, default=10_000,
+                        help="Estimates for the DataFrame baseline, which is much slower (0 to skip).")
+    args = parser.parse_args(argv)
+
+    runs = [("generation", args.estimates), ("streaming", args.estimates)]
+    if args.baseline_estimates:
+        runs.insert(0, ("streaming", args.baseline_estimates))
+        runs.insert(1, ("dataframes", args.baseline_estimates))
+    print(f"{'case':12s} {'estimates':>10s} {'seconds':>8s} {'est/s':>9s} {'peak RSS MB':>12s} {'file MB':>8s}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for case, count in runs:
+            # A fresh process per case, so each peak RSS is measured on its own.
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                seconds, rss_mb, size_mb = pool.submit(run_case, case, count,
+                                                       os.path.join(temp_dir, f"{case}.xlsx")).result()
+            print(f"{case:12s} {count:10,d} {seconds:8.2f} {count / seconds:9,.0f} {rss_mb:12.1f} {size_mb:8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
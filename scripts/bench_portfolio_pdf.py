@@ -0,0 +1,66 @@
+"""
+Builds a portfolio PDF report of synthetic projects (with the canned AI insights of the LLM stub)
+for several worker counts and reports the time, size and peak memory of each build:
+
+    python scripts/bench_portfolio_pdf.py --projects 1000 --workers 0 1 4
+
+Peak memory is the maximum resident set size of this process (which merges the sections) and of
+the largest worker process.
+"""
+import argparse
+import os
+import resource
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from llm_stub_server import CANNED_RESPONSE  # noqa: E402
+from utils.estimate import estimate_project  # noqa: E402
+from utils.portfolio_report import build_portfolio_pdf  # noqa: E402
+
+MODES = ("organic", "semi-detached", "embedded")
+
+
+def synthetic_estimates(count):
+    """Yields count distinct estimates, generated lazily like utils.db.iter_estimates."""
+    for i in range(count):
+        roles = [
+            {"role_name": "Developer", "count": 2 + i % 6, "rate_ph": 1800.0 + 10 * (i % 20)},
+            {"role_name": "QA Engineer", "count": 1 + i % 2, "rate_ph": 1400.0},
+            {"role_name": "Project Manager", "count": 1, "rate_ph": 2600.0},
+        ]
+        project_inputs = {"name": f"Portfolio project {i + 1}", "kloc": 5 + i % 120, "cocomo_mode": MODES[i % 3],
+                          "contingency": 10, "roles_data": roles}
+        cocomo_results, cost_summary = estimate_project(project_inputs["kloc"], project_inputs["cocomo_mode"], roles, 10)
+        yield {"project_inputs": project_inputs, "cocomo_results": cocomo_results, "cost_summary": cost_summary,
+               "ai_insights": CANNED_RESPONSE}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, os.cpu_count() or 1],
+                        help="Worker counts to compare (0 = render in-process).")
+    parser.add_argument("--keep", metavar="PATH", help="Also write the last report to this path.")
+    args = parser.parse_args(argv)
+
+    print(f"{args.projects:,} projects, {os.cpu_count()} CPUs")
+    print(f"{'workers':>7s} {'seconds':>8s} {'proj/s':>8s} {'pages':>7s} {'MB':>7s} {'main RSS MB':>12s} {'worker RSS MB':>14s}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, "portfolio.pdf")
+        for workers in args.workers:
+            stats = build_portfolio_pdf(synthetic_estimates(args.projects), output_path, workers=workers, progress=None)
+            size_mb = os.path.getsize(output_path) / 1024 / 1024
+            main_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 # KiB on Linux
+            worker_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+            print(f"{workers:7d} {stats['seconds']:8.2f} {stats['projects_per_sec']:8.1f} {stats['pages']:7d} "
+                  f"{size_mb:7.2f} {main_rss:12.1f} {worker_rss if workers else 0:14.1f}")
+        if args.keep:
+            os.replace(output_path, args.keep)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
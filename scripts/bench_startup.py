@@ -0,0 +1,127 @@
+"""
+Cold start and first render benchmark of a Streamlit page, with a time budget.
+
+Each run starts a fresh interpreter under `python -X importtime`, imports Streamlit, then renders
+the page once (logged in, empty form) with Streamlit's AppTest. It reports the wall time of the
+whole process, of the first render and of the imports the page triggers, lists the slowest
+imports and checks that the modules meant to load on first use (DEFERRED_MODULES) were not
+imported by the first render:
+
+    python scripts/bench_startup.py --runs 5 --budget-ms 2000 --render-budget-ms 1000
+
+Exits with status 1 when the median cold start or first render is over budget, or when a
+deferred module was imported.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PAGE = os.path.join("pages", "1_📈_Estimator.py")
+DEFERRED_MODULES = ("pandas", "matplotlib", "reportlab", "openpyxl", "groq")
+RENDER_MARKER = "--- first render ---"
+
+# Runs in the child interpreter; the marker splits the import log into framework and page imports.
+PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+page, deferred, marker = sys.argv[1], sys.argv[2].split(","), sys.argv[3]
+app = AppTest.from_file(page, default_timeout=60)
+app.session_state["logged_in"] = True
+app.session_state["username"] = "benchmark"
+sys.stderr.write(marker + "\\n")
+started = time.perf_counter()
+app.run()
+render_seconds = time.perf_counter() - started
+print(json.dumps({
+    "render_ms": render_seconds * 1000,
+    "errors": [str(exception.message) for exception in app.exception],
+    "deferred_loaded": [name for name in deferred if name in sys.modules],
+}))
+"""
+
+
+def parse_importtime(lines):
+    """Cumulative microseconds per top-level import, from `-X importtime` lines."""
+    totals = defaultdict(int)
+    for line in lines:
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name[1:].startswith(" "): # deeper imports are indented and already in their parent's total
+            totals[name.strip()] += int(cumulative)
+    return totals
+
+
+def run_once(page):
+    env = dict(os.environ, PYTHONPATH=ROOT, STREAMLIT_GLOBAL_DEVELOPMENT_MODE="false")
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE, page, ",".join(DEFERRED_MODULES), RENDER_MARKER],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=False
+    )
+    cold_start_ms = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark process failed:\n{completed.stderr[-2000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    log = completed.stderr.splitlines()
+    split_at = log.index(RENDER_MARKER) if RENDER_MARKER in log else len(log)
+    framework_imports = parse_importtime(log[:split_at])
+    page_imports = parse_importtime(log[split_at + 1:])
+    result.update(
+        cold_start_ms=cold_start_ms,
+        framework_import_ms=sum(framework_imports.values()) / 1000,
+        page_import_ms=sum(page_imports.values()) / 1000,
+        page_imports=page_imports,
+    )
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--page", default=DEFAULT_PAGE, help="Page script, relative to the project root.")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "2000")),
+                        help="Budget for the median cold start (interpreter start to first render done).")
+    parser.add_argument("--render-budget-ms", type=float, default=float(os.getenv("RENDER_BUDGET_MS", "1000")),
+                        help="Budget for the median first render, page imports included.")
+    parser.add_argument("--top", type=int, default=10, help="Slowest page imports to list.")
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.page) for _ in range(args.runs)]
+    cold_start_ms = statistics.median(run["cold_start_ms"] for run in runs)
+    render_ms = statistics.median(run["render_ms"] for run in runs)
+    print(f"{args.page}: {args.runs} cold runs")
+    print(f"  cold start      median {cold_start_ms:8.1f} ms  (budget {args.budget_ms:.0f} ms)")
+    print(f"  first render    median {render_ms:8.1f} ms  (budget {args.render_budget_ms:.0f} ms)")
+    print(f"  framework imports      {statistics.median(run['framework_import_ms'] for run in runs):8.1f} ms")
+    print(f"  page imports           {statistics.median(run['page_import_ms'] for run in runs):8.1f} ms")
+    print("  slowest page imports (last run):")
+    for name, micros in sorted(runs[-1]["page_imports"].items(), key=lambda item: -item[1])[:args.top]:
+        print(f"    {micros / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if cold_start_ms > args.budget_ms:
+        failures.append(f"cold start {cold_start_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    if render_ms > args.render_budget_ms:
+        failures.append(f"first render {render_ms:.0f} ms is over the {args.render_budget_ms:.0f} ms budget")
+    deferred_loaded = sorted({name for run in runs for name in run["deferred_loaded"]})
+    if deferred_loaded:
+        failures.append(f"first render imported modules that should load on first use: {', '.join(deferred_loaded)}")
+    errors = [error for run in runs for error in run["errors"]]
+    if errors:
+        failures.append(f"page raised: {errors[0]}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: within budget")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""
+Local stand-in for Groq's OpenAI-compatible chat completions endpoint.
+
+Point the app at it with GROQ_BASE_URL=http://127.0.0.1:8765 and any GROQ_API_KEY. Latency,
+token rate and injected errors are configurable, so the AI path can be measured and load-tested
+offline:
+
+    python scripts/llm_stub_server.py --port 8765 --latency-ms 300 --tokens-per-sec 400 --error-rate 0.02
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_RESPONSE = """**1. Explanation of Original Cost Drivers:**
+*   The estimated size drives effort through the COCOMO exponent, so every additional KLOC costs slightly more than the last.
+*   Team rates and the project duration multiply directly into the total cost.
+
+**2. Cost and Time Optimization Suggestions:**
+*   **Suggestion:** Phase QA onboarding
+    *   **Implementation:** Bring the QA team in one month before User Acceptance Testing.
+    *   **Team Impact:** One QA member less for the first months.
+    *   **Estimated quantitative impact (in ₹):**
+        *   **Approximate New Total Cost:** saving approx. 5%.
+        *   **Approximate New Duration:** unchanged.
+*   **Suggestion:** Reuse existing components
+    *   **Implementation:** Adopt proven libraries for authentication and reporting.
+    *   **Team Impact:** Less custom development work.
+    *   **Estimated quantitative impact (in ₹):**
+        *   **Approximate New Total Cost:** saving approx. 8%.
+        *   **Approximate New Duration:** 1 month shorter.
+
+**3. Overall Optimized Scenario (Hypothetical):**
+Approximate Overall Optimized Cost: ₹4,500,000
+Approximate Overall Optimized Duration: 15 Months
+
+**4. Potential Risks & Mitigation (Brief):**
+*   **Scope creep:** freeze requirements per release.
+*   **Key-person dependency:** pair on critical modules.
+"""
+
+# Returned when the request asks for response_format {"type": "json_object"} (structured insights).
+CANNED_JSON_RESPONSE = json.dumps({
+    "drivers": ["The estimated size drives effort through the COCOMO exponent.",
+                "Team rates and the project duration multiply directly into the total cost."],
+    "suggestions": [
+        {"title": "Phase QA onboarding", "implementation": "Bring the QA team in one month before User Acceptance Testing.",
+         "team_impact": "One QA member less for the first months.", "cost_delta": -250000, "duration_delta_months": 0,
+         "assumptions": "QA is idle during early development."},
+        {"title": "Reuse existing components", "implementation": "Adopt proven libraries for authentication and reporting.",
+         "team_impact": "Less custom development work.", "cost_delta": -400000, "duration_delta_months": -1,
+         "assumptions": "Libraries fit the requirements without major changes."},
+    ],
+    "optimized_scenario": {"total_cost": 4500000, "duration_months": 15,
+                           "justification": "Both suggestions combined, with some overlap in savings."},
+    "risks": [{"risk": "Scope creep", "mitigation": "Freeze requirements per release."},
+              {"risk": "Key-person dependency", "mitigation": "Pair on critical modules."}],
+}, indent=1)
+
+
+class StubConfig:
+    def __init__(self, latency_ms=200.0, tokens_per_sec=500.0, error_rate=0.0, rate_limit_rate=0.0,
+                 response_text=CANNED_RESPONSE, json_response_text=CANNED_JSON_RESPONSE):
+        self.latency_ms = latency_ms
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.response_text = response_text
+        self.json_response_text = json_response_text
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+
+def _tokens(text, max_tokens):
+    # Whitespace-preserving word pieces stand in for model tokens.
+    pieces = text.replace("\n", "\n ").split(" ")
+    tokens = [piece + " " for piece in pieces]
+    return tokens[:max_tokens] if max_tokens else tokens
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = None # set by make_stub_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "stub-model", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+        config = self.config
+        config.count_request()
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+        roll = random.random()
+        if roll < config.rate_limit_rate:
+            self._send_json(429, {"error": {"message": "Rate limit reached (stub)", "type": "tokens"}},
+                            headers={"retry-after": "1"})
+            return
+        if roll < config.rate_limit_rate + config.error_rate:
+            self._send_json(500, {"error": {"message": "Injected upstream failure (stub)"}})
+            return
+
+        time.sleep(config.latency_ms / 1000)
+        model = request.get("model", "stub-model")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        json_mode = (request.get("response_format") or {}).get("type") == "json_object"
+        tokens = _tokens(config.json_response_text if json_mode else config.response_text, request.get("max_tokens"))
+        prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in request.get("messages", []))
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(tokens),
+                 "total_tokens": prompt_tokens + len(tokens)}
+        token_delay = 1 / config.tokens_per_sec if config.tokens_per_sec > 0 else 0
+
+        if not request.get("stream"):
+            time.sleep(token_delay * len(tokens))
+            self._send_json(200, {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens).rstrip(" ")},
+                             "finish_reason": "stop", "logprobs": None}],
+                "usage": usage,
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        try:
+            for i, token in enumerate(tokens):
+                chunk = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                         "choices": [{"index": 0, "delta": {"role": "assistant", "content": token} if i == 0 else {"content": token},
+                                      "finish_reason": None, "logprobs": None}]}
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                time.sleep(token_delay)
+            final = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": "stop", "logprobs": None}],
+                     "x_groq": {"usage": usage}}
+            self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+            self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def make_stub_server(host="127.0.0.1", port=0, config=None):
+    """
+    Builds (but does not start) a stub server; port 0 picks a free port.
+
+    Returns:
+        ThreadingHTTPServer: Call serve_forever() (e.g. on a daemon thread) and shutdown() when done.
+                             The base URL is f"http://{host}:{server.server_port}".
+    """
+    handler = type("StubHandler", (_Handler,), {"config": config or StubConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    server.config = handler.config
+    return server
+
+
+def start_stub_server(host="127.0.0.1", port=0, config=None):
+    """Starts a stub server on a daemon thread and returns (server, base_url)."""
+    server = make_stub_server(host, port, config)
+    threading.Thread(target=server.serve_forever, daemon=True, name="llm-stub-server").start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local Groq-compatible chat completions stub.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Delay before the first token.")
+    parser.add_argument("--tokens-per-sec", type=float, default=500.0, help="Token generation rate (0 = instant).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 429.")
+    args = parser.parse_args(argv)
+
+    config = StubConfig(args.latency_ms, args.tokens_per_sec, args.error_rate, args.rate_limit_rate)
+    server = make_stub_server(args.host, args.port, config)
+    print(f"LLM stub listening on http://{args.host}:{server.server_port} (set GROQ_BASE_URL to this URL)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+from urllib.parse import unquote
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import app
+
+client = TestClient(app)
+
+
+def _project(name):
+    return {"name": name, "kloc": 10, "roles": [{"role_name": "Developer", "count": 2, "rate_ph": 1500}],
+            "ai_insights": "**Optimized Scenario:** none."}
+
+
+def _file_names(response):
+    """(filename, filename*) of a Content-Disposition attachment header."""
+    disposition = response.headers["content-disposition"]
+    assert disposition.isascii()
+    parts = dict(part.strip().split("=", 1) for part in disposition.split(";")[1:])
+    assert parts["filename*"].startswith("UTF-8''")
+    return parts["filename"], unquote(parts["filename*"][len("UTF-8''"):])
+
+
+@pytest.mark.parametrize("path, suffix", [("/export/excel", "Cost_Estimation_INR.xlsx"),
+                                          ("/export/pdf", "Cost_Estimation_Report_INR.pdf")])
+@pytest.mark.parametrize("name, fallback", [("项目", "__"), ('Say "hi"', "Say__hi_")])
+def test_export_file_name_is_encoded(path, suffix, name, fallback):
+    response = client.post(path, json=_project(name))
+
+    assert response.status_code == 200
+    assert _file_names(response) == (f'"{fallback}_{suffix}"', f"{name.replace(' ', '_')}_{suffix}")
@@ -0,0 +1,47 @@
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+
+from utils.pdf_stream import PdfStreamWriter
+
+
+def _write_pdf(path, label, pages):
+    pdf = canvas.Canvas(str(path), pageCompression=1) # compressed content streams are copied as is
+    for page in range(1, pages + 1):
+        pdf.drawString(72, 720, f"{label} page {page}")
+        pdf.showPage()
+    pdf.save()
+
+
+def test_merge_round_trip(tmp_path):
+    sections = [("Cover", 1), ("1. Alpha", 3), ("2. Beta", 2)]
+    paths = []
+    for i, (label, pages) in enumerate(sections):
+        paths.append(tmp_path / f"section-{i}.pdf")
+        _write_pdf(paths[-1], label, pages)
+
+    output = tmp_path / "merged.pdf"
+    with PdfStreamWriter(str(output), title="Portfolio") as writer:
+        appended = [writer.append(str(path), title=label) for path, (label, _) in zip(paths, sections)]
+
+    assert appended == [1, 3, 2]
+    reader = PdfReader(str(output), strict=True)
+    assert len(reader.pages) == 6
+    assert reader.metadata.title == "Portfolio"
+    assert [(item.title, reader.get_destination_page_number(item)) for item in reader.outline] == [
+        ("Cover", 0), ("1. Alpha", 1), ("2. Beta", 4)]
+    assert [page.extract_text().strip() for page in reader.pages] == [
+        "Cover page 1", "1. Alpha page 1", "1. Alpha page 2", "1. Alpha page 3", "2. Beta page 1", "2. Beta page 2"]
+
+
+def test_merge_without_bookmarks(tmp_path):
+    path = tmp_path / "section.pdf"
+    _write_pdf(path, "Only", 2)
+
+    output = tmp_path / "merged.pdf"
+    with PdfStreamWriter(str(output)) as writer:
+        writer.append(str(path))
+        writer.append(str(path))
+
+    reader = PdfReader(str(output), strict=True)
+    assert len(reader.pages) == 4
+    assert reader.outline == []
@@ -0,0 +1,197 @@
+import asyncio
+import os
+import random
+import time
+
+from utils.ai_helper import GROQ_MAX_TOKENS, build_insights_messages, get_cached_ai_insights, request_ai_insights
+from utils.llm_providers import LLMProviderError, RateLimitedError, get_provider
+
+# Groq's published per-model limits; set them to the quota of your account.
+GROQ_RPM_LIMIT = float(os.getenv("GROQ_RPM_LIMIT", "30"))
+GROQ_TPM_LIMIT = float(os.getenv("GROQ_TPM_LIMIT", "30000"))
+DEFAULT_BATCH_CONCURRENCY = int(os.getenv("AI_BATCH_CONCURRENCY", "8"))
+DEFAULT_MAX_RETRIES = 5
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+INSIGHT_REQUEST_FIELDS = ("project_name", "kloc", "cocomo_mode", "effort_pm", "duration_m", "total_cost", "roles_data_str")
+
+
+class TokenBucket:
+    """
+    Async token bucket refilled continuously at per_minute / 60 per second, holding at most
+    capacity tokens (default: one minute's worth). Waiters are served in FIFO order.
+    """
+
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount=1):
+        amount = min(amount, self.capacity) # a single oversized request must still get through eventually
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets plus a shared pause after a 429."""
+
+    def __init__(self, rpm=GROQ_RPM_LIMIT, tpm=GROQ_TPM_LIMIT):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._resume_at = 0.0
+
+    def pause(self, seconds):
+        """Holds back every request for seconds, e.g. the retry-after of a 429."""
+        self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    async def acquire(self, tokens):
+        while (wait := self._resume_at - time.monotonic()) > 0:
+            await asyncio.sleep(wait)
+        await self.requests.acquire(1)
+        await self.tokens.acquire(tokens)
+
+
+def estimate_request_tokens(messages):
+    """Upper-bound token cost of a request for the TPM bucket: ~4 characters per prompt token plus max_tokens."""
+    return sum(len(message["content"]) for message in messages) / 4 + GROQ_MAX_TOKENS
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff; a server retry-after is honoured and jittered upwards."""
+    if retry_after:
+        return retry_after + random.uniform(0, BACKOFF_BASE_SECONDS)
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+async def _run_request(index, request, limiter, output_mode, use_cache, max_retries):
+    started = time.monotonic()
+    result = {"index": index, "request": request, "text": None, "structured": None, "attempts": 0, "error": None}
+    args = [request[field] for field in INSIGHT_REQUEST_FIELDS]
+
+    # Cache hits cost no quota, so they bypass the limiter entirely.
+    cached = get_cached_ai_insights(*args, output_mode=output_mode) if use_cache else None
+    if cached is not None:
+        result["text"], result["structured"] = cached
+        result["seconds"] = time.monotonic() - started
+        return result
+
+    messages, _, _ = build_insights_messages(*args, output_mode=output_mode)
+    token_cost = estimate_request_tokens(messages)
+    for attempt in range(max_retries + 1):
+        result["attempts"] = attempt + 1
+        await limiter.acquire(token_cost)
+        try:
+            result["text"], result["structured"] = await asyncio.to_thread(
+                request_ai_insights, *args, use_cache=use_cache, output_mode=output_mode, max_retries=0
+            )
+            result["error"] = None
+            break
+        except RateLimitedError as e:
+            result["error"] = str(e)
+            delay = backoff_delay(attempt, e.retry_after)
+            limiter.pause(delay)
+        except (LLMProviderError, ValueError) as e: # upstream errors and invalid structured output
+            result["error"] = str(e)
+            delay = backoff_delay(attempt)
+        if attempt < max_retries:
+            await asyncio.sleep(delay)
+    result["seconds"] = time.monotonic() - started
+    return result
+
+
+async def iter_batch_insights(requests, rpm=GROQ_RPM_LIMIT, tpm=GROQ_TPM_LIMIT, concurrency=DEFAULT_BATCH_CONCURRENCY,
+                              max_retries=DEFAULT_MAX_RETRIES, output_mode=None, use_cache=True):
+    """
+    Generates AI insights for many projects concurrently, within the provider's rate limits.
+
+    Requests are admitted by a requests-per-minute and a tokens-per-minute token bucket, and 429s
+    (plus other upstream errors) are retried with jittered exponential backoff; a 429 also pauses
+    all other requests for its retry-after. concurrency workers take the requests from the iterable
+    one at a time, so it is consumed lazily and only concurrency requests (and as many finished
+    results not yet consumed) are held at once.
+
+    Args:
+        requests (iterable): Dicts with the get_ai_insights arguments (INSIGHT_REQUEST_FIELDS).
+        rpm, tpm (float): Rate limits to stay under.
+        concurrency (int): Maximum requests in flight.
+        max_retries (int): Retries per request after the first attempt.
+        output_mode (str): "structured" or "markdown"; default AI_OUTPUT_MODE.
+
+    Yields:
+        dict: One result per request as it finishes (not in input order): index, request, text,
+              structured, attempts, seconds and error (None on success).
+    """
+    pending = enumerate(requests)
+    if not get_provider().is_available():
+        for index, request in pending:
+            yield {"index": index, "request": request, "text": None, "structured": None, "attempts": 0,
+                   "seconds": 0.0, "error": "AI provider unavailable (GROQ_API_KEY not set)"}
+        return
+
+    limiter = RateLimiter(rpm, tpm)
+    finished = asyncio.Queue(maxsize=concurrency)
+    worker_done = object()
+
+    async def _worker():
+        # Workers share the pending iterator; next() never awaits, so each request goes to one worker.
+        error = None
+        try:
+            for index, request in pending:
+                await finished.put(await _run_request(index, request, limiter, output_mode, use_cache, max_retries))
+        except Exception as e: # e.g. the requests iterable failed on a row
+            error = e
+        await finished.put(error or worker_done)
+
+    workers = [asyncio.create_task(_worker()) for _ in range(max(1, concurrency))]
+    try:
+        running = len(workers)
+        while running:
+            item = await finished.get()
+            if item is worker_done:
+                running -= 1
+            elif isinstance(item, Exception):
+                raise item
+            else:
+                yield item
+    finally:
+        for worker in workers:
+            worker.cancel()
+
+
+def run_batch_insights(requests, on_result=None, collect=True, **options):
+    """
+    Synchronous wrapper of iter_batch_insights for scripts.
+
+    Args:
+        on_result (callable): Called with each result as it finishes.
+        collect (bool): Keep the results and return them; False only passes them to on_result,
+                        so memory stays flat for large batches.
+        **options: Passed to iter_batch_insights.
+
+    Returns:
+        list: Results in input order (empty if collect is False).
+    """
+    async def _collect():
+        results = []
+        async for result in iter_batch_insights(requests, **options):
+            if on_result:
+                on_result(result)
+            if collect:
+                results.append(result)
+        return sorted(results, key=lambda result: result["index"])
+
+    return asyncio.run(_collect())
@@ -0,0 +1,156 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "ai_insights.sqlite3")
+DEFAULT_MEMORY_ENTRIES = 128
+DEFAULT_DISK_ENTRIES = 5000
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+
+class InsightCache:
+    """
+    Two-tier cache for AI responses: an in-memory LRU in front of a SQLite table.
+
+    Entries expire after ttl_seconds in both tiers. The memory tier evicts least recently used
+    entries beyond memory_entries; the disk tier evicts least recently accessed rows beyond
+    disk_entries. Safe to share between Streamlit sessions (threads) of one process; several
+    processes may share the same SQLite file.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, memory_entries=DEFAULT_MEMORY_ENTRIES,
+                 disk_entries=DEFAULT_DISK_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict() # key -> (created_at, value)
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self._conn = None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS insights ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL, last_access REAL NOT NULL)"
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS insights_last_access ON insights (last_access)")
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"AI cache: disk tier disabled ({e}).")
+                self._conn = None
+
+    def _expired(self, created_at, now):
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key):
+        """Returns the cached value for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[0], now):
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+                self._counters["evictions"] += 1
+
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute("SELECT value, created_at FROM insights WHERE key = ?", (key,)).fetchone()
+                    if row is not None:
+                        value, created_at = row
+                        if not self._expired(created_at, now):
+                            self._conn.execute("UPDATE insights SET last_access = ? WHERE key = ?", (now, key))
+                            self._conn.commit()
+                            self._remember(key, created_at, value)
+                            self._counters["disk_hits"] += 1
+                            return value
+                        self._conn.execute("DELETE FROM insights WHERE key = ?", (key,))
+                        self._conn.commit()
+                        self._counters["evictions"] += 1
+                except sqlite3.Error as e:
+                    print(f"AI cache: disk read failed ({e}).")
+
+            self._counters["misses"] += 1
+            return None
+
+    def set(self, key, value):
+        """Stores value under key in both tiers."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO insights (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now)
+                )
+                if self.ttl_seconds is not None:
+                    self._counters["evictions"] += self._conn.execute(
+                        "DELETE FROM insights WHERE created_at < ?", (now - self.ttl_seconds,)
+                    ).rowcount
+                self._counters["evictions"] += self._conn.execute(
+                    "DELETE FROM insights WHERE key IN ("
+                    "SELECT key FROM insights ORDER BY last_access DESC LIMIT -1 OFFSET ?)", (self.disk_entries,)
+                ).rowcount
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"AI cache: disk write failed ({e}).")
+
+    def _remember(self, key, created_at, value):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM insights")
+                self._conn.commit()
+
+    def stats(self):
+        """Hit/miss/eviction counters plus current tier sizes."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"] = (self._conn.execute("SELECT COUNT(*) FROM insights").fetchone()[0]
+                                     if self._conn is not None else 0)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_insight_cache():
+    """
+    Process-wide InsightCache configured from the environment, or None if AI_CACHE_ENABLED is false.
+
+    Environment: AI_CACHE_ENABLED (default true), AI_CACHE_PATH (empty for memory only),
+    AI_CACHE_MEMORY_ENTRIES, AI_CACHE_DISK_ENTRIES, AI_CACHE_TTL_SECONDS.
+    """
+    global _cache
+    if os.getenv("AI_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = InsightCache(
+                path=os.getenv("AI_CACHE_PATH", DEFAULT_CACHE_PATH),
+                memory_entries=int(os.getenv("AI_CACHE_MEMORY_ENTRIES", DEFAULT_MEMORY_ENTRIES)),
+                disk_entries=int(os.getenv("AI_CACHE_DISK_ENTRIES", DEFAULT_DISK_ENTRIES)),
+                ttl_seconds=float(os.getenv("AI_CACHE_TTL_SECONDS", DEFAULT_TTL_SECONDS)),
+            )
+        return _cache
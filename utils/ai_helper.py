@@ -1,26 +1,77 @@
+import json
 import os
 from dotenv import load_dotenv
-from groq import Groq
+from utils.ai_cache import get_insight_cache
+from utils.hashing import stable_hash
+from utils.llm_providers import LLMProviderError, get_provider
 
 load_dotenv()
 
-GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama3-8b-8192")
+GROQ_TEMPERATURE = float(os.getenv("GROQ_TEMPERATURE", "0.5"))
+GROQ_MAX_TOKENS = int(os.getenv("GROQ_MAX_TOKENS", "1500"))
+AI_CLIENT_UNAVAILABLE_MESSAGE = "AI client not initialized. Please ensure your GROQ_API_KEY is correctly set in the .env file."
+AI_STRUCTURED_ERROR_MESSAGE = "Error generating AI insights: the AI response was missing or did not match the expected format. Please check the console for more details."
+# "markdown" (default) streams the free-text response as it is generated; "structured" asks the model for JSON
+# matching INSIGHTS_JSON_SCHEMA, which is only shown once complete and validated.
+AI_OUTPUT_MODE = os.getenv("AI_OUTPUT_MODE", "markdown").lower()
 
-if not GROQ_API_KEY:
-    print("Warning: GROQ_API_KEY not found in .env file. AI features will be disabled.")
-    client = None
-else:
-    try:
-        client = Groq(api_key=GROQ_API_KEY)
-    except Exception as e:
-        print(f"Error initializing Groq client: {e}")
-        client = None
+INSIGHTS_JSON_SCHEMA = {
+    "type": "object",
+    "required": ["drivers", "suggestions", "optimized_scenario", "risks"],
+    "properties": {
+        "drivers": {"type": "array", "items": {"type": "string"}, "minItems": 1},
+        "suggestions": {
+            "type": "array", "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["title", "implementation", "team_impact", "cost_delta", "duration_delta_months"],
+                "properties": {
+                    "title": {"type": "string"},
+                    "implementation": {"type": "string"},
+                    "team_impact": {"type": "string"},
+                    "cost_delta": {"type": "number", "description": "Change of the total cost in INR, negative for a saving"},
+                    "duration_delta_months": {"type": "number", "description": "Change of the duration in months, negative if shorter"},
+                    "assumptions": {"type": "string"},
+                },
+            },
+        },
+        "optimized_scenario": {
+            "type": "object",
+            "required": ["total_cost", "duration_months"],
+            "properties": {
+                "total_cost": {"type": "number", "description": "INR"},
+                "duration_months": {"type": "number"},
+                "justification": {"type": "string"},
+            },
+        },
+        "risks": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["risk", "mitigation"],
+                "properties": {"risk": {"type": "string"}, "mitigation": {"type": "string"}},
+            },
+        },
+    },
+}
 
-def get_ai_insights(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str):
-    if not client:
-        return "AI client not initialized. Please ensure your GROQ_API_KEY is correctly set in the .env file." 
+# Static instructions sent as the system message of every structured request, so only the short
+# project facts in the user message vary between calls.
+INSIGHTS_SYSTEM_PROMPT = (
+    "You are an expert Software Project Management consultant and Cost Estimator. All amounts are in "
+    "Indian Rupees (INR). Given a project's COCOMO estimate, team and cost, reply with a single JSON object "
+    "matching this JSON schema and nothing else:\n"
+    + json.dumps(INSIGHTS_JSON_SCHEMA, separators=(",", ":")) + "\n"
+    "drivers: 2-4 short explanations of what drives the original cost (KLOC, COCOMO mode, team size, rates, duration). "
+    "suggestions: 2-3 specific, actionable optimizations that keep quality; cost_delta and duration_delta_months are "
+    "your estimated changes to the original total cost and duration if that suggestion alone is applied, with the "
+    "assumptions behind them. optimized_scenario: the total cost and duration if your best suggestions are combined, "
+    "with a brief justification. risks: 1-2 key risks with a brief mitigation each. Numbers must be plain JSON numbers."
+)
 
-    prompt = f"""
+def build_insights_prompt(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str):
+    return f"""
     You are an expert Software Project Management consultant and Cost Estimator.
     Analyze the following software project details (all costs are in Indian Rupees (₹)):
 
@@ -69,21 +120,320 @@ def get_ai_insights(project_name, kloc, cocomo_mode, effort_pm, duration_m, tota
             *   **Approximate New Duration:** May slightly shift internal milestones but overall project duration of {duration_m} months could remain similar or reduce by 0.5 months if development is efficient.
     """
 
+def build_structured_insights_prompt(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str):
+    """User message of a structured request: only the project facts; the instructions live in INSIGHTS_SYSTEM_PROMPT."""
+    return (
+        f"Project Name: {project_name}\n"
+        f"KLOC: {kloc}\n"
+        f"COCOMO Mode: {cocomo_mode}\n"
+        f"Effort: {effort_pm} Person-Months\n"
+        f"Duration: {duration_m} Months\n"
+        f"Total Cost (including contingency): INR {total_cost:.2f}\n"
+        f"Team and Context:\n{roles_data_str}"
+    )
+
+def _as_number(value, field):
+    if isinstance(value, bool):
+        raise ValueError(f"{field} must be a number, got {value!r}")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.replace(",", "").replace("₹", "").strip())
+        except ValueError:
+            pass
+    raise ValueError(f"{field} must be a number, got {value!r}")
+
+def _as_text(value, field, required=True):
+    if value is None and not required:
+        return ""
+    if not isinstance(value, str) or (required and not value.strip()):
+        raise ValueError(f"{field} must be a non-empty string")
+    return value.strip()
+
+def validate_insights(data):
+    """
+    Checks a decoded structured response against INSIGHTS_JSON_SCHEMA.
+
+    Returns:
+        dict: The insights with numbers as floats, strings stripped and unknown keys dropped.
+    Raises:
+        ValueError: If a required field is missing or has the wrong type.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("response must be a JSON object")
+    for key in INSIGHTS_JSON_SCHEMA["required"]:
+        if key not in data:
+            raise ValueError(f"missing field: {key}")
+
+    if not isinstance(data["drivers"], list) or not data["drivers"]:
+        raise ValueError("drivers must be a non-empty list")
+    drivers = [_as_text(driver, f"drivers[{i}]") for i, driver in enumerate(data["drivers"])]
+
+    if not isinstance(data["suggestions"], list) or not data["suggestions"]:
+        raise ValueError("suggestions must be a non-empty list")
+    suggestions = []
+    for i, suggestion in enumerate(data["suggestions"]):
+        if not isinstance(suggestion, dict):
+            raise ValueError(f"suggestions[{i}] must be an object")
+        suggestions.append({
+            "title": _as_text(suggestion.get("title"), f"suggestions[{i}].title"),
+            "implementation": _as_text(suggestion.get("implementation"), f"suggestions[{i}].implementation"),
+            "team_impact": _as_text(suggestion.get("team_impact"), f"suggestions[{i}].team_impact"),
+            "cost_delta": _as_number(suggestion.get("cost_delta"), f"suggestions[{i}].cost_delta"),
+            "duration_delta_months": _as_number(suggestion.get("duration_delta_months"), f"suggestions[{i}].duration_delta_months"),
+            "assumptions": _as_text(suggestion.get("assumptions"), f"suggestions[{i}].assumptions", required=False),
+        })
+
+    scenario = data["optimized_scenario"]
+    if not isinstance(scenario, dict):
+        raise ValueError("optimized_scenario must be an object")
+    optimized_scenario = {
+        "total_cost": _as_number(scenario.get("total_cost"), "optimized_scenario.total_cost"),
+        "duration_months": _as_number(scenario.get("duration_months"), "optimized_scenario.duration_months"),
+        "justification": _as_text(scenario.get("justification"), "optimized_scenario.justification", required=False),
+    }
+    if optimized_scenario["total_cost"] <= 0 or optimized_scenario["duration_months"] <= 0:
+        raise ValueError("optimized_scenario total_cost and duration_months must be positive")
+
+    if not isinstance(data["risks"], list):
+        raise ValueError("risks must be a list")
+    risks = []
+    for i, risk in enumerate(data["risks"]):
+        if not isinstance(risk, dict):
+            raise ValueError(f"risks[{i}] must be an object")
+        risks.append({"risk": _as_text(risk.get("risk"), f"risks[{i}].risk"),
+                      "mitigation": _as_text(risk.get("mitigation"), f"risks[{i}].mitigation")})
+
+    return {"drivers": drivers, "suggestions": suggestions, "optimized_scenario": optimized_scenario, "risks": risks}
+
+def parse_insights_json(response_text):
+    """Decodes and validates a structured response; tolerates a surrounding ``` fence. Raises ValueError."""
+    text = (response_text or "").strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"response is not valid JSON ({e})") from e
+    return validate_insights(data)
+
+def format_insights_markdown(insights):
+    """Renders validated structured insights as the Markdown shown in the app and the reports."""
+    lines = ["**1. Explanation of Original Cost Drivers:**"]
+    lines += [f"*   {driver}" for driver in insights["drivers"]]
+    lines += ["", "**2. Cost and Time Optimization Suggestions:**"]
+    for suggestion in insights["suggestions"]:
+        lines += [
+            f"*   **Suggestion:** {suggestion['title']}",
+            f"    *   **Implementation:** {suggestion['implementation']}",
+            f"    *   **Team Impact:** {suggestion['team_impact']}",
+            f"    *   **Estimated Cost Change:** ₹{suggestion['cost_delta']:,.2f}",
+            f"    *   **Estimated Duration Change:** {suggestion['duration_delta_months']:g} Months",
+        ]
+        if suggestion["assumptions"]:
+            lines.append(f"    *   **Assumptions:** {suggestion['assumptions']}")
+    scenario = insights["optimized_scenario"]
+    lines += [
+        "", "**3. Overall Optimized Scenario (Hypothetical):**",
+        f"*   **Approximate Overall Optimized Cost:** ₹{scenario['total_cost']:,.2f}",
+        f"*   **Approximate Overall Optimized Duration:** {scenario['duration_months']:g} Months",
+    ]
+    if scenario["justification"]:
+        lines.append(f"*   {scenario['justification']}")
+    if insights["risks"]:
+        lines += ["", "**4. Potential Risks & Mitigation (Brief):**"]
+        lines += [f"*   **{risk['risk']}:** {risk['mitigation']}" for risk in insights["risks"]]
+    return "\n".join(lines)
+
+def insights_cache_key(prompt, model=GROQ_MODEL, temperature=GROQ_TEMPERATURE):
+    """Cache key of a prompt: whitespace-normalized text plus the sampling settings that change the answer."""
+    return stable_hash(" ".join(prompt.split()), model, temperature, GROQ_MAX_TOKENS)
+
+def build_insights_messages(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str, output_mode=None):
+    """
+    Chat messages, extra completion options and cache key of one insights request.
+
+    Returns:
+        tuple: (messages, completion_kwargs, cache_key)
+    """
+    if (output_mode or AI_OUTPUT_MODE) == "structured":
+        user_prompt = build_structured_insights_prompt(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str)
+        messages = [
+            {"role": "system", "content": INSIGHTS_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt},
+        ]
+        cache_key = stable_hash("structured", INSIGHTS_SYSTEM_PROMPT, user_prompt, GROQ_MODEL, GROQ_TEMPERATURE, GROQ_MAX_TOKENS)
+        return messages, {"response_format": {"type": "json_object"}}, cache_key
+    prompt = build_insights_prompt(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str)
+    return [{"role": "user", "content": prompt}], {}, insights_cache_key(prompt)
+
+def _decode_cached_insights(cached_response, structured_mode):
+    if cached_response is None:
+        return None
+    if structured_mode:
+        structured = json.loads(cached_response)
+        return format_insights_markdown(structured), structured
+    return cached_response, None
+
+def get_cached_ai_insights(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str, output_mode=None):
+    """Cached (markdown_text, structured) of an insights request, or None on a miss or with the cache disabled."""
+    cache = get_insight_cache()
+    if not cache:
+        return None
+    _, _, cache_key = build_insights_messages(
+        project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str, output_mode=output_mode
+    )
+    return _decode_cached_insights(cache.get(cache_key), (output_mode or AI_OUTPUT_MODE) == "structured")
+
+def request_ai_insights(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str, use_cache=True, output_mode=None,
+                        max_retries=None):
+    """
+    One insights request (through the cache) that raises instead of returning an error message, for
+    callers that retry or schedule requests themselves.
+
+    Args:
+        max_retries: Overrides the provider client's own retries for this call (0 = none).
+
+    Returns:
+        tuple: (markdown_text, structured) - structured is None in markdown mode.
+    Raises:
+        LLMProviderError: The provider is unavailable or the call failed (RateLimitedError on HTTP 429).
+        ValueError: A structured response did not match INSIGHTS_JSON_SCHEMA.
+    """
+    structured_mode = (output_mode or AI_OUTPUT_MODE) == "structured"
+    provider = get_provider()
+    if not provider.is_available():
+        raise LLMProviderError(AI_CLIENT_UNAVAILABLE_MESSAGE)
+
+    messages, completion_kwargs, cache_key = build_insights_messages(
+        project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str, output_mode=output_mode
+    )
+    if max_retries is not None:
+        completion_kwargs["max_retries"] = max_retries
+    cache = get_insight_cache() if use_cache else None
+    if cache:
+        cached = _decode_cached_insights(cache.get(cache_key), structured_mode)
+        if cached is not None:
+            return cached
+
+    response_content = provider.complete(
+        messages=messages, model=GROQ_MODEL, temperature=GROQ_TEMPERATURE, max_tokens=GROQ_MAX_TOKENS, **completion_kwargs
+    )
+    if structured_mode:
+        structured = parse_insights_json(response_content)
+        if cache:
+            cache.set(cache_key, json.dumps(structured))
+        return format_insights_markdown(structured), structured
+    if cache and response_content:
+        cache.set(cache_key, response_content)
+    return response_content, None
+
+def get_ai_insights(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str, use_cache=True):
+    if not get_provider().is_available():
+        return AI_CLIENT_UNAVAILABLE_MESSAGE
+
+    try:
+        response_content, _ = request_ai_insights(
+            project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str,
+            use_cache=use_cache, output_mode="markdown"
+        )
+        return response_content
+    
+    except Exception as e:
+        print(f"Error calling LLM provider: {e}")
+        return f"Error generating AI insights due to an API issue: {str(e)}. Please check the console for more details."
+
+def stream_ai_insights(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str, use_cache=True,
+                       raise_errors=False):
+    """
+    Streaming variant of get_ai_insights: yields the response text in chunks as the model generates it.
+
+    A cached response is yielded as a single chunk. The joined chunks are cached once the stream
+    completes, so later calls to either function hit the cache. With raise_errors, failures raise
+    LLMProviderError instead of being yielded as an error message.
+    """
+    provider = get_provider()
+    if not provider.is_available():
+        if raise_errors:
+            raise LLMProviderError(AI_CLIENT_UNAVAILABLE_MESSAGE)
+        yield AI_CLIENT_UNAVAILABLE_MESSAGE
+        return
+
+    prompt = build_insights_prompt(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str)
+
+    cache = get_insight_cache() if use_cache else None
+    cache_key = insights_cache_key(prompt) if cache else None
+    if cache:
+        cached_response = cache.get(cache_key)
+        if cached_response is not None:
+            yield cached_response
+            return
+
+    response_chunks = []
     try:
-        chat_completion = client.chat.completions.create(
+        for delta in provider.stream(
             messages=[
                 {
                     "role": "user",
                     "content": prompt,
                 }
             ],
-            model="llama3-8b-8192", 
-            temperature=0.5, 
-            max_tokens=1500, 
+            model=GROQ_MODEL,
+            temperature=GROQ_TEMPERATURE,
+            max_tokens=GROQ_MAX_TOKENS,
+        ):
+            response_chunks.append(delta)
+            yield delta
+    except Exception as e:
+        print(f"Error streaming from LLM provider: {e}")
+        if raise_errors:
+            raise
+        yield f"\n\nError generating AI insights due to an API issue: {str(e)}. Please check the console for more details."
+        return
+
+    if cache and response_chunks:
+        cache.set(cache_key, "".join(response_chunks))
+
+def get_structured_ai_insights(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str, use_cache=True):
+    """
+    Requests the insights as JSON (static system message + short user message) and validates them.
+
+    Returns:
+        dict: Validated insights (see validate_insights), or None if the provider is unavailable,
+              the call failed or the response did not match INSIGHTS_JSON_SCHEMA.
+    """
+    if not get_provider().is_available():
+        print(AI_CLIENT_UNAVAILABLE_MESSAGE)
+        return None
+
+    try:
+        _, insights = request_ai_insights(
+            project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str,
+            use_cache=use_cache, output_mode="structured"
         )
-        response_content = chat_completion.choices[0].message.content
-        return response_content
-    
+        return insights
+    except ValueError as e:
+        print(f"Invalid structured AI insights: {e}")
+        return None
     except Exception as e:
-        print(f"Error calling Groq API: {e}")
-        return f"Error generating AI insights due to an API issue: {str(e)}. Please check the console for more details."
\ No newline at end of file
+        print(f"Error calling LLM provider: {e}")
+        return None
+
+def generate_ai_insights(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str, use_cache=True, output_mode=None):
+    """
+    Insights in the configured AI_OUTPUT_MODE (or output_mode).
+
+    Returns:
+        tuple: (markdown_text, structured) - structured is the validated dict in structured mode and
+               None in markdown mode or when the structured request failed (the text then explains why).
+    """
+    if (output_mode or AI_OUTPUT_MODE) != "structured":
+        return get_ai_insights(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str, use_cache=use_cache), None
+    if not get_provider().is_available():
+        return AI_CLIENT_UNAVAILABLE_MESSAGE, None
+    structured = get_structured_ai_insights(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str, use_cache=use_cache)
+    if structured is None:
+        return AI_STRUCTURED_ERROR_MESSAGE, None
+    return format_insights_markdown(structured), structured
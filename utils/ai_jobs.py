@@ -0,0 +1,333 @@
+import os
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.ai_helper import AI_OUTPUT_MODE, build_insights_messages, request_ai_insights, stream_ai_insights
+from utils.hashing import stable_hash
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("AI_JOB_WORKERS", "8")), thread_name_prefix="ai-insights")
+
+
+class InsightJob:
+    """
+    An AI insight request running on a background thread.
+
+    The worker appends streamed chunks as they arrive, so a Streamlit rerun can render whatever
+    text is available, and later reruns (or the same one) can pick up the finished result. A job
+    submitted through AIGateway may be shared by several sessions (subscribers).
+    """
+
+    def __init__(self, chunk_source):
+        self._chunk_source = chunk_source # called with the job, returns an iterable of text chunks
+        self._chunks = []
+        self._done = False
+        self._condition = threading.Condition()
+        self._cancelled = threading.Event()
+        self.error = None
+        self.structured = None # validated insights dict of a structured job, once done
+        self.fallback = None # callable(reason) -> text shown instead of the AI output if the request fails
+        self.fallback_used = False
+        self.future = None
+        self.key = None
+        self.user_id = None
+        self._gateway = None
+        self._subscribers = 1
+
+    def _run(self):
+        chunks = self._chunk_source(self)
+        try:
+            for chunk in chunks:
+                if self._cancelled.is_set():
+                    break
+                with self._condition:
+                    self._chunks.append(chunk)
+                    self._condition.notify_all()
+        except Exception as e:
+            print(f"Error in background AI insight job: {e}")
+            self.error = e
+            if self.fallback is not None and not self._cancelled.is_set():
+                with self._condition:
+                    self._chunks = [self.fallback(str(e))]
+                    self.fallback_used = True
+                    self._condition.notify_all()
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()
+            with self._condition:
+                self._done = True
+                self._condition.notify_all()
+
+    @property
+    def done(self):
+        return self._done
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    @property
+    def text(self):
+        with self._condition:
+            return "".join(self._chunks)
+
+    @property
+    def queue_position(self):
+        """1-based position in the gateway queue while waiting for a slot, 0 once running or done."""
+        return self._gateway.queue_position(self) if self._gateway is not None else 0
+
+    def iter_text(self, poll_interval=None):
+        """
+        Yields the accumulated text each time new chunks arrive, ending with the final text.
+
+        With poll_interval (seconds) the current text is also yielded whenever that long passes
+        without a new chunk, so callers can refresh e.g. the queue position.
+        """
+        seen = -1
+        while True:
+            with self._condition:
+                while len(self._chunks) == seen and not self._done:
+                    if not self._condition.wait(poll_interval):
+                        break
+                seen = len(self._chunks)
+                text, done = "".join(self._chunks), self._done
+            yield text
+            if done:
+                return
+
+    def result(self, timeout=None):
+        """Blocks until the job finishes (or timeout elapses) and returns the text so far."""
+        with self._condition:
+            self._condition.wait_for(lambda: self._done, timeout)
+            return "".join(self._chunks)
+
+    def cancel(self):
+        """
+        Stops the job; a job that has not started yet never calls the API. A job shared through
+        the gateway only stops when its last subscriber cancels.
+        """
+        if self._gateway is not None and self._gateway._release(self) > 0:
+            return
+        self._cancelled.set()
+        withdrawn = self._gateway is not None and self._gateway._withdraw(self)
+        if withdrawn or (self.future is not None and self.future.cancel()):
+            with self._condition:
+                self._done = True
+                self._condition.notify_all()
+
+
+class AIGateway:
+    """
+    Process-wide admission point for AI insight jobs, shared by all Streamlit sessions.
+
+    - Single flight: a request whose key matches a queued or running job subscribes to that job
+      instead of calling the API again.
+    - At most max_concurrency jobs run at once.
+    - Waiting jobs are queued per user and dispatched round robin across users, so one user's
+      burst of requests cannot starve the others.
+    """
+
+    def __init__(self, max_concurrency, executor):
+        self.max_concurrency = max_concurrency
+        self._executor = executor
+        self._lock = threading.RLock() # future callbacks may run inline while dispatching
+        self._in_flight = {} # key -> queued or running job
+        self._queues = OrderedDict() # user_id -> deque of waiting jobs, in round-robin order
+        self._running = 0
+        self._counters = {"submitted": 0, "coalesced": 0, "completed": 0}
+
+    def submit(self, user_id, key, chunk_source, fallback=None):
+        """
+        Returns the in-flight job for key (subscribing to it), or queues a new InsightJob whose
+        chunks come from chunk_source(job) and which shows fallback(reason) if it fails.
+        """
+        with self._lock:
+            self._counters["submitted"] += 1
+            job = self._in_flight.get(key) if key is not None else None
+            if job is not None:
+                job._subscribers += 1
+                self._counters["coalesced"] += 1
+                return job
+
+            job = InsightJob(chunk_source)
+            job.key, job.user_id, job._gateway, job.fallback = key, user_id, self, fallback
+            if key is not None:
+                self._in_flight[key] = job
+            self._queues.setdefault(user_id, deque()).append(job)
+            self._dispatch()
+            return job
+
+    def _dispatch(self):
+        while self._running < self.max_concurrency and self._queues:
+            user_id, queue = self._queues.popitem(last=False)
+            job = queue.popleft()
+            if queue:
+                self._queues[user_id] = queue # back of the round robin
+            self._running += 1
+            job.future = self._executor.submit(job._run)
+            job.future.add_done_callback(lambda future, job=job: self._finished(job))
+
+    def _finished(self, job):
+        with self._lock:
+            self._running -= 1
+            self._counters["completed"] += 1
+            if self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+            self._dispatch()
+
+    def _release(self, job):
+        # Drops one subscriber; once none are left, new requests must not join the job any more.
+        with self._lock:
+            job._subscribers -= 1
+            if job._subscribers <= 0 and self._in_flight.get(job.key) is job:
+                del self._in_flight[job.key]
+            return job._subscribers
+
+    def _withdraw(self, job):
+        # Removes a job that is still waiting for a slot; False if it was already dispatched.
+        with self._lock:
+            queue = self._queues.get(job.user_id)
+            if not queue or job not in queue:
+                return False
+            queue.remove(job)
+            if not queue:
+                del self._queues[job.user_id]
+            return True
+
+    def queue_position(self, job):
+        with self._lock:
+            if job.future is not None or job.done:
+                return 0
+            queues = list(self._queues.values())
+            position = 0
+            for depth in range(max((len(queue) for queue in queues), default=0)):
+                for queue in queues:
+                    if depth < len(queue):
+                        position += 1
+                        if queue[depth] is job:
+                            return position
+            return 0
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["running"] = self._running
+            stats["queued"] = sum(len(queue) for queue in self._queues.values())
+            stats["users_waiting"] = len(self._queues)
+        return stats
+
+
+_gateway = AIGateway(int(os.getenv("AI_GATEWAY_CONCURRENCY", "4")), _executor)
+
+
+def get_gateway():
+    """The process-wide AIGateway (concurrency from AI_GATEWAY_CONCURRENCY)."""
+    return _gateway
+
+
+def _structured_chunks(job, args, use_cache):
+    # A JSON response is only usable once complete, so it arrives as a single Markdown chunk.
+    text, job.structured = request_ai_insights(*args, use_cache=use_cache, output_mode="structured")
+    yield text
+
+
+def start_insight_job(project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str, use_cache=True,
+                      output_mode=None, user_id=None, fallback=None):
+    """
+    Submits the AI insight request to the process-wide gateway: stream_ai_insights in markdown
+    mode, get_structured_ai_insights in structured mode (default from AI_OUTPUT_MODE). An identical
+    request already in flight is shared instead of sent again.
+
+    Args:
+        user_id: Who is asking; waiting requests are scheduled fairly across users.
+        fallback (callable): fallback(reason) returns the text to show if the request fails
+                             (e.g. utils.estimate.build_fallback_insights); without it the job's
+                             text stays empty and job.error is set.
+
+    Returns:
+        InsightJob: Handle to read the streamed text (and job.structured) from; safe to keep in st.session_state.
+    """
+    output_mode = output_mode or AI_OUTPUT_MODE
+    args = (project_name, kloc, cocomo_mode, effort_pm, duration_m, total_cost, roles_data_str)
+    _, _, request_key = build_insights_messages(*args, output_mode=output_mode)
+    key = stable_hash(output_mode, request_key, use_cache)
+    if output_mode == "structured":
+        chunk_source = lambda job: _structured_chunks(job, args, use_cache)
+    else:
+        chunk_source = lambda job: stream_ai_insights(*args, use_cache=use_cache, raise_errors=True)
+    return get_gateway().submit(user_id or "anonymous", key, chunk_source, fallback=fallback)
+
+
+class InsightPrefetcher:
+    """
+    Speculatively starts an insight job once a form's inputs have stopped changing.
+
+    Each update() with a new input key cancels the pending timer or running job of the previous
+    key and schedules a job for the new one after debounce_seconds. take() hands the job for a key
+    over to the caller (e.g. when the user finally presses the button); the last taken key is not
+    prefetched again, since the caller already has its job. One instance per session.
+    """
+
+    def __init__(self, debounce_seconds=None):
+        self.debounce_seconds = (debounce_seconds if debounce_seconds is not None
+                                 else float(os.getenv("AI_PREFETCH_DEBOUNCE_SECONDS", "2")))
+        self.key = None
+        self.job = None
+        self._taken_key = None
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def update(self, key, start_job):
+        """Schedules start_job() for key unless key is already scheduled, running, done or taken."""
+        with self._lock:
+            if key == self.key:
+                return
+            self._cancel_locked()
+            if key == self._taken_key: # e.g. a rerun from a results widget after the button was pressed
+                return
+            self.key = key
+            self._timer = threading.Timer(self.debounce_seconds, self._start, args=(key, start_job))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _start(self, key, start_job):
+        with self._lock:
+            if key != self.key or self.job is not None:
+                return
+            self._timer = None
+            self.job = start_job()
+
+    def status(self, key):
+        """'waiting', 'running' or 'ready' for the current key, None for any other key."""
+        with self._lock:
+            if key != self.key:
+                return None
+            if self.job is None:
+                return "waiting"
+            return "ready" if self.job.done else "running"
+
+    def take(self, key):
+        """
+        Returns the prefetched job for key (running or done), or None; the prefetcher is reset either
+        way and key is not prefetched again, as the caller now has (or starts) its job.
+        """
+        with self._lock:
+            job = self.job if key == self.key else None
+            if job is not None:
+                self.job = None
+            self._cancel_locked()
+            self._taken_key = key
+            return job
+
+    def cancel(self):
+        with self._lock:
+            self._cancel_locked()
+
+    def _cancel_locked(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self.job is not None:
+            self.job.cancel()
+            self.job = None
+        self.key = None
@@ -30,11 +30,14 @@ def login_page():
         submitted = st.form_submit_button("Login")
 
         if submitted:
-            if check_user(username, password):
+            login_ok = check_user(username, password)
+            if login_ok:
                 st.session_state["logged_in"] = True
                 st.session_state["username"] = username
                 st.success(f"Welcome back, {username}!")
                 st.rerun()
+            elif login_ok is None:
+                st.warning("The server is busy, please try again in a moment.")
             else:
                 st.error("Invalid username or password.")
 
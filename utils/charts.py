@@ -0,0 +1,171 @@
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from utils.hashing import stable_hash
+
+CURRENCY_SYMBOL = "₹"
+CHART_DPI = 110
+PNG_CACHE_ENTRIES = 256
+# matplotlib's tab10, so the PNG and the PDF vector charts use the same colours.
+PALETTE = ("#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf")
+
+# Figures are built with the object-oriented API on their own Agg canvas, so no pyplot global state
+# is shared between sessions. matplotlib's text and font caches are still not thread-safe, hence
+# the lock around drawing; with the PNG memo below, contention is rare.
+_render_lock = threading.Lock()
+_png_cache = OrderedDict() # content hash -> PNG bytes
+_png_cache_lock = threading.Lock()
+
+
+def cost_slices(cost_breakdown_details):
+    """(labels, sizes) of the breakdown items with a positive total cost."""
+    labels, sizes = [], []
+    for role, details in (cost_breakdown_details or {}).items():
+        if details.get("total_role_cost", 0) > 0:
+            labels.append(role)
+            sizes.append(details["total_role_cost"])
+    return labels, sizes
+
+
+def render_png(draw, figsize, dpi=CHART_DPI):
+    """
+    Renders a chart to PNG bytes without pyplot.
+
+    Args:
+        draw (callable): Called with (figure, axes) to draw the chart.
+        figsize (tuple): Figure size in inches.
+        dpi (int): Output resolution.
+
+    Returns:
+        bytes: The PNG image.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    with _render_lock:
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        draw(fig, fig.add_subplot())
+        output = BytesIO()
+        fig.savefig(output, format="png", bbox_inches="tight", dpi=dpi)
+    return output.getvalue()
+
+
+def _memoized_png(key, render):
+    with _png_cache_lock:
+        png = _png_cache.get(key)
+        if png is not None:
+            _png_cache.move_to_end(key)
+            return png
+    png = render()
+    with _png_cache_lock:
+        _png_cache[key] = png
+        while len(_png_cache) > PNG_CACHE_ENTRIES:
+            _png_cache.popitem(last=False)
+    return png
+
+
+def cost_pie_chart_png(cost_breakdown_details):
+    """
+    Pie chart of the cost per role/item as PNG bytes, memoized by the chart's content.
+
+    Returns:
+        bytes: The PNG image, or None if no item has a cost.
+    """
+    labels, sizes = cost_slices(cost_breakdown_details)
+    if not labels:
+        return None
+
+    def _draw(fig, ax):
+        ax.pie(sizes, labels=labels, colors=[PALETTE[i % len(PALETTE)] for i in range(len(sizes))],
+               autopct='%1.1f%%', startangle=90, counterclock=False, textprops={'fontsize': 8})
+        ax.axis('equal')
+        ax.set_title("Cost Distribution by Role/Item", fontsize=10)
+
+    return _memoized_png(stable_hash("pie", labels, sizes, CHART_DPI), lambda: render_png(_draw, (6, 4)))
+
+
+def tornado_chart_png(baseline_cost, tornado_rows):
+    """Tornado chart of the sensitivity rows (utils.sensitivity.tornado_rows) as PNG bytes, or None."""
+    if not tornado_rows:
+        return None
+    rows = list(reversed(tornado_rows)) # Largest swing on top
+
+    def _draw(fig, ax):
+        for i, row in enumerate(rows):
+            ax.barh(i, row["low_cost"] - baseline_cost, left=baseline_cost, color="#4c9f70")
+            ax.barh(i, row["high_cost"] - baseline_cost, left=baseline_cost, color="#d1495b")
+            ax.text(row["low_cost"], i, f"{row['low_label']} ", va='center', ha='right', fontsize=7)
+            ax.text(row["high_cost"], i, f" {row['high_label']}", va='center', ha='left', fontsize=7)
+        ax.axvline(baseline_cost, color='black', linewidth=0.8)
+        ax.set_yticks(range(len(rows)))
+        ax.set_yticklabels([row["factor"] for row in rows], fontsize=8)
+        ax.set_xlabel(f"Total Cost ({CURRENCY_SYMBOL})", fontsize=8)
+        ax.tick_params(axis='x', labelsize=7)
+        ax.margins(x=0.15)
+        ax.set_title("Sensitivity of Total Cost (Tornado)", fontsize=10)
+
+    return render_png(_draw, (7, 0.45 * len(rows) + 1.2))
+
+
+def heatmap_chart_png(values, row_labels, col_labels, title, row_title, col_title):
+    """Heatmap of a 2-D array as PNG bytes."""
+    def _draw(fig, ax):
+        im = ax.imshow(values, cmap='YlOrRd', aspect='auto', origin='lower')
+        ax.set_xticks(range(len(col_labels)))
+        ax.set_xticklabels(col_labels, fontsize=7)
+        ax.set_yticks(range(len(row_labels)))
+        ax.set_yticklabels(row_labels, fontsize=7)
+        ax.set_xlabel(col_title, fontsize=8)
+        ax.set_ylabel(row_title, fontsize=8)
+        cbar = fig.colorbar(im, ax=ax)
+        cbar.ax.tick_params(labelsize=7)
+        ax.set_title(title, fontsize=10)
+
+    return render_png(_draw, (7, 4))
+
+
+def cost_pie_chart_drawing(cost_breakdown_details, width=360, height=240):
+    """
+    Vector pie chart of the cost per role/item as a reportlab Drawing (a flowable) for PDFs.
+
+    A new Drawing is built per call (well under a millisecond), so documents built on different
+    threads never share one.
+
+    Args:
+        width, height (float): Size in points.
+
+    Returns:
+        reportlab.graphics.shapes.Drawing: The chart, or None if no item has a cost.
+    """
+    from reportlab.graphics.charts.piecharts import Pie
+    from reportlab.graphics.shapes import Drawing, String
+    from reportlab.lib import colors
+
+    labels, sizes = cost_slices(cost_breakdown_details)
+    if not labels:
+        return None
+    total = sum(sizes)
+    drawing = Drawing(width, height)
+    drawing.add(String(width / 2, height - 12, "Cost Distribution by Role/Item", fontName="Helvetica", fontSize=10,
+                       textAnchor="middle"))
+    pie = Pie()
+    pie_size = min(width * 0.5, height - 60)
+    pie.x = (width - pie_size) / 2
+    pie.y = (height - 24 - pie_size) / 2
+    pie.width = pie.height = pie_size
+    pie.data = sizes
+    pie.labels = [f"{label} ({size / total:.1%})" for label, size in zip(labels, sizes)]
+    pie.startAngle = 90
+    pie.direction = "clockwise"
+    pie.sideLabels = True
+    pie.simpleLabels = False
+    pie.slices.strokeColor = colors.white
+    pie.slices.strokeWidth = 0.5
+    pie.slices.fontName = "Helvetica"
+    pie.slices.fontSize = 7
+    for i in range(len(sizes)):
+        pie.slices[i].fillColor = colors.HexColor(PALETTE[i % len(PALETTE)])
+    drawing.add(pie)
+    return drawing
@@ -1,3 +1,5 @@
+import numpy as np
+
 # Basic COCOMO Constants
 # (Mode, a, b, c, d)
 COCOMO_PARAMS = {
@@ -6,6 +8,15 @@ COCOMO_PARAMS = {
     "embedded": (3.6, 1.20, 2.5, 0.32),
 }
 
+# Row i of the matrix holds the (a, b, c, d) of COCOMO_MODES[i]; the trailing
+# NaN row is where unknown modes land, so they propagate NaN instead of raising.
+COCOMO_MODES = tuple(COCOMO_PARAMS)
+_MODE_INDEX = {mode: i for i, mode in enumerate(COCOMO_MODES)}
+_INVALID_MODE_INDEX = len(COCOMO_MODES)
+_COCOMO_PARAM_MATRIX = np.array(list(COCOMO_PARAMS.values()) + [(np.nan,) * 4])
+
+HOURS_PER_MONTH_PERSON = 160
+
 def calculate_cocomo(kloc, mode="semi-detached"):
     """
     Calculates effort (Person-Months) and development time (Months) using Basic COCOMO.
@@ -24,12 +35,64 @@ def calculate_cocomo(kloc, mode="semi-detached"):
         print(f"Invalid COCOMO mode: {mode}")
         return None, None 
 
-    a, b, c, d = COCOMO_PARAMS[mode]
+    effort_pm, duration_m, _ = calculate_cocomo_batch([kloc], [mode])
+    return float(effort_pm[0]), float(duration_m[0])
+
+def mode_indices(mode_array):
+    """
+    Maps project modes to row indices of the COCOMO parameter matrix.
+
+    Args:
+        mode_array (array-like or str): Mode names from COCOMO_PARAMS, or integer
+                                        indices into COCOMO_MODES.
+
+    Returns:
+        np.ndarray: Integer indices with the same shape as the input. Unknown modes
+                    map to len(COCOMO_MODES).
+    """
+    modes = np.asarray(mode_array)
+    if modes.dtype.kind in "iu":
+        return np.where((modes >= 0) & (modes < _INVALID_MODE_INDEX), modes, _INVALID_MODE_INDEX)
+    if modes.ndim == 0:
+        return np.asarray(_MODE_INDEX.get(str(modes), _INVALID_MODE_INDEX), dtype=np.intp)
+    # One vectorized comparison per known mode beats sorting or a per-row dict lookup.
+    indices = np.full(modes.shape, _INVALID_MODE_INDEX, dtype=np.intp)
+    for i, mode in enumerate(COCOMO_MODES):
+        indices[modes == mode] = i
+    return indices
+
+def calculate_cocomo_batch(kloc_array, mode_array="semi-detached", decimals=2):
+    """
+    Vectorized Basic COCOMO for many projects at once.
+
+    Args:
+        kloc_array (array-like): Kilo Lines of Code per project.
+        mode_array (array-like or str): Mode per project, as names or integer indices
+                                        into COCOMO_MODES. Broadcast against kloc_array.
+        decimals (int or None): Rounding applied to the results, None for full precision.
+
+    Returns:
+        tuple: (effort_pm, duration_m, valid) arrays of the broadcast shape. Rows with an
+               unknown mode or a non-finite KLOC are NaN and False in valid; rows with
+               KLOC <= 0 are 0, as in calculate_cocomo.
+    """
+    kloc, mode_idx = np.broadcast_arrays(np.asarray(kloc_array, dtype=float), mode_indices(mode_array))
+    params = _COCOMO_PARAM_MATRIX[mode_idx]
+    a, b, c, d = params[..., 0], params[..., 1], params[..., 2], params[..., 3]
+
+    valid = (mode_idx != _INVALID_MODE_INDEX) & np.isfinite(kloc)
+    positive = valid & (kloc > 0)
+    safe_kloc = np.where(positive, kloc, 1.0)
 
-    effort_pm = a * (kloc ** b)
+    effort_pm = a * (safe_kloc ** b)
     duration_m = c * (effort_pm ** d)
+    effort_pm = np.where(positive, effort_pm, np.where(valid, 0.0, np.nan))
+    duration_m = np.where(positive, duration_m, np.where(valid, 0.0, np.nan))
 
-    return round(effort_pm, 2), round(duration_m, 2)
+    if decimals is not None:
+        effort_pm = np.round(effort_pm, decimals)
+        duration_m = np.round(duration_m, decimals)
+    return effort_pm, duration_m, valid
 
 def calculate_cost(roles_info, duration_months, contingency_percentage=10):
     """
@@ -50,7 +113,7 @@ def calculate_cost(roles_info, duration_months, contingency_percentage=10):
     total_cost_sub = 0 
     cost_breakdown = {}
     
-    hours_per_month_person = 160 
+    hours_per_month_person = HOURS_PER_MONTH_PERSON
 
     for role_item in roles_info:
         role_name = role_item.get("role_name", "Unknown Role") 
@@ -87,4 +150,41 @@ def calculate_cost(roles_info, duration_months, contingency_percentage=10):
             "total_role_cost": round(contingency_amount, 2)
         }
     
-    return round(total_cost_sub, 2), round(total_with_contingency, 2), cost_breakdown
\ No newline at end of file
+    return round(total_cost_sub, 2), round(total_with_contingency, 2), cost_breakdown
+
+def team_monthly_cost(roles_info):
+    """
+    Monthly cost of the whole team, i.e. the per-month rate calculate_cost multiplies by duration.
+
+    Args:
+        roles_info (list of dicts): Same shape as for calculate_cost.
+
+    Returns:
+        float: Sum of count * rate_ph * HOURS_PER_MONTH_PERSON over roles with positive count and rate.
+    """
+    total = 0.0
+    for role_item in roles_info:
+        count = int(role_item.get("count", 0))
+        rate_per_hour = float(role_item.get("rate_ph", 0.0))
+        if count > 0 and rate_per_hour > 0:
+            total += rate_per_hour * HOURS_PER_MONTH_PERSON * count
+    return total
+
+def calculate_cost_batch(monthly_cost_array, duration_array, contingency_array=10):
+    """
+    Vectorized totals of calculate_cost, without the per-role breakdown.
+
+    Args:
+        monthly_cost_array (array-like): Team cost per month (see team_monthly_cost).
+        duration_array (array-like): Project duration in months.
+        contingency_array (array-like): Contingency percentage.
+
+    Returns:
+        tuple: (subtotal, total_with_contingency) unrounded arrays of the broadcast shape.
+               Rows with a non-positive duration cost 0.
+    """
+    monthly_cost = np.asarray(monthly_cost_array, dtype=float)
+    duration = np.asarray(duration_array, dtype=float)
+    subtotal = np.where(duration <= 0, 0.0, monthly_cost * duration)
+    total = subtotal * (1 + np.asarray(contingency_array, dtype=float) / 100)
+    return subtotal, total
\ No newline at end of file
@@ -0,0 +1,285 @@
+from collections.abc import Mapping
+
+import numpy as np
+from utils.cocomo import COCOMO_MODES, mode_indices
+
+# Rating levels shared by every table below; None marks a rating the model does not define.
+RATING_LEVELS = ("very_low", "low", "nominal", "high", "very_high", "extra_high")
+RATING_ALIASES = {"vl": "very_low", "l": "low", "n": "nominal", "h": "high", "vh": "very_high", "xh": "extra_high"}
+NOMINAL = RATING_LEVELS.index("nominal")
+
+# Intermediate COCOMO (Boehm, 1981)
+# (Mode, a, b, c, d) - same order as COCOMO_PARAMS
+INTERMEDIATE_PARAMS = {
+    "organic": (3.2, 1.05, 2.5, 0.38),
+    "semi-detached": (3.0, 1.12, 2.5, 0.35),
+    "embedded": (2.8, 1.20, 2.5, 0.32),
+}
+
+INTERMEDIATE_COST_DRIVERS = {
+    "RELY": (0.75, 0.88, 1.00, 1.15, 1.40, None),   # Required software reliability
+    "DATA": (None, 0.94, 1.00, 1.08, 1.16, None),   # Database size
+    "CPLX": (0.70, 0.85, 1.00, 1.15, 1.30, 1.65),   # Product complexity
+    "TIME": (None, None, 1.00, 1.11, 1.30, 1.66),   # Execution time constraint
+    "STOR": (None, None, 1.00, 1.06, 1.21, 1.56),   # Main storage constraint
+    "VIRT": (None, 0.87, 1.00, 1.15, 1.30, None),   # Virtual machine volatility
+    "TURN": (None, 0.87, 1.00, 1.07, 1.15, None),   # Computer turnaround time
+    "ACAP": (1.46, 1.19, 1.00, 0.86, 0.71, None),   # Analyst capability
+    "AEXP": (1.29, 1.13, 1.00, 0.91, 0.82, None),   # Applications experience
+    "PCAP": (1.42, 1.17, 1.00, 0.86, 0.70, None),   # Programmer capability
+    "VEXP": (1.21, 1.10, 1.00, 0.90, None, None),   # Virtual machine experience
+    "LEXP": (1.14, 1.07, 1.00, 0.95, None, None),   # Programming language experience
+    "MODP": (1.24, 1.10, 1.00, 0.91, 0.82, None),   # Modern programming practices
+    "TOOL": (1.24, 1.10, 1.00, 0.91, 0.83, None),   # Use of software tools
+    "SCED": (1.23, 1.08, 1.00, 1.04, 1.10, None),   # Required development schedule
+}
+
+# COCOMO II.2000 Post-Architecture
+COCOMO2_CONSTANTS = {"A": 2.94, "B": 0.91, "C": 3.67, "D": 0.28}
+
+COCOMO2_SCALE_FACTORS = {
+    "PREC": (6.20, 4.96, 3.72, 2.48, 1.24, 0.00),   # Precedentedness
+    "FLEX": (5.07, 4.05, 3.04, 2.03, 1.01, 0.00),   # Development flexibility
+    "RESL": (7.07, 5.65, 4.24, 2.83, 1.41, 0.00),   # Architecture / risk resolution
+    "TEAM": (5.48, 4.38, 3.29, 2.19, 1.10, 0.00),   # Team cohesion
+    "PMAT": (7.80, 6.24, 4.68, 3.12, 1.56, 0.00),   # Process maturity
+}
+
+COCOMO2_EFFORT_MULTIPLIERS = {
+    "RELY": (0.82, 0.92, 1.00, 1.10, 1.26, None),
+    "DATA": (None, 0.90, 1.00, 1.14, 1.28, None),
+    "CPLX": (0.73, 0.87, 1.00, 1.17, 1.34, 1.74),
+    "RUSE": (None, 0.95, 1.00, 1.07, 1.15, 1.24),
+    "DOCU": (0.81, 0.91, 1.00, 1.11, 1.23, None),
+    "TIME": (None, None, 1.00, 1.11, 1.29, 1.63),
+    "STOR": (None, None, 1.00, 1.05, 1.17, 1.46),
+    "PVOL": (None, 0.87, 1.00, 1.15, 1.30, None),
+    "ACAP": (1.42, 1.19, 1.00, 0.85, 0.71, None),
+    "PCAP": (1.34, 1.15, 1.00, 0.88, 0.76, None),
+    "PCON": (1.29, 1.12, 1.00, 0.90, 0.81, None),
+    "APEX": (1.22, 1.10, 1.00, 0.88, 0.81, None),
+    "PLEX": (1.19, 1.09, 1.00, 0.91, 0.85, None),
+    "LTEX": (1.20, 1.09, 1.00, 0.91, 0.84, None),
+    "TOOL": (1.17, 1.09, 1.00, 0.90, 0.78, None),
+    "SITE": (1.22, 1.09, 1.00, 0.93, 0.86, 0.80),
+    "SCED": (1.43, 1.14, 1.00, 1.00, 1.00, None),
+}
+
+# Schedule compression/stretch (% of nominal TDEV) for each SCED rating
+COCOMO2_SCED_SCHEDULE_PCT = (75, 85, 100, 130, 160, None)
+
+
+def compile_rating_table(table):
+    """
+    Compiles a {driver: ratings tuple} table into a dense array.
+
+    Args:
+        table (dict): Driver name -> one value per RATING_LEVELS entry (None if undefined).
+
+    Returns:
+        tuple: (driver_names, values) where values has shape (n_drivers, len(RATING_LEVELS) + 1).
+               Undefined ratings and the extra trailing column are NaN, so an out-of-range
+               rating index yields NaN instead of raising.
+    """
+    names = tuple(table)
+    values = np.full((len(names), len(RATING_LEVELS) + 1), np.nan)
+    for i, name in enumerate(names):
+        values[i, :len(RATING_LEVELS)] = [np.nan if v is None else v for v in table[name]]
+    return names, values
+
+
+_INVALID_RATING = len(RATING_LEVELS)
+_INTERMEDIATE_PARAM_MATRIX = np.array([INTERMEDIATE_PARAMS[mode] for mode in COCOMO_MODES] + [(np.nan,) * 4])
+_INTERMEDIATE_DRIVERS, _INTERMEDIATE_TABLE = compile_rating_table(INTERMEDIATE_COST_DRIVERS)
+_SCALE_FACTORS, _SCALE_FACTOR_TABLE = compile_rating_table(COCOMO2_SCALE_FACTORS)
+_EFFORT_MULTIPLIERS, _EFFORT_MULTIPLIER_TABLE = compile_rating_table(COCOMO2_EFFORT_MULTIPLIERS)
+_SCED_COLUMN = _EFFORT_MULTIPLIERS.index("SCED")
+_SCED_SCHEDULE_FACTOR = np.array([np.nan if v is None else v / 100 for v in COCOMO2_SCED_SCHEDULE_PCT] + [np.nan])
+
+
+def _rating_index(value):
+    if isinstance(value, (int, np.integer)):
+        return int(value) if 0 <= value < _INVALID_RATING else _INVALID_RATING
+    level = str(value).strip().lower().replace(" ", "_").replace("-", "_")
+    level = RATING_ALIASES.get(level, level)
+    return RATING_LEVELS.index(level) if level in RATING_LEVELS else _INVALID_RATING
+
+
+def _rating_column(values, size):
+    """Vectorized rating-name -> index mapping for one driver column."""
+    values = np.asarray(values)
+    if values.ndim == 0:
+        return np.full(size, _rating_index(values.item()), dtype=np.intp)
+    if values.dtype.kind in "iu":
+        return np.where((values >= 0) & (values < _INVALID_RATING), values, _INVALID_RATING).astype(np.intp)
+    values = values.astype(str)
+    indices = np.full(values.shape, _INVALID_RATING, dtype=np.intp)
+    for distinct in np.unique(values):
+        indices[values == distinct] = _rating_index(distinct)
+    return indices
+
+
+def encode_ratings(ratings, driver_names, size):
+    """
+    Converts driver ratings to an integer array of RATING_LEVELS indices.
+
+    Args:
+        ratings: One of
+            - None: every driver nominal;
+            - an integer array of shape (size, n_drivers), used as-is;
+            - a mapping {driver: rating or array of ratings}, column-oriented (fast path);
+            - a sequence of per-project mappings {driver: rating}.
+            Ratings are level names ('high', 'VH', ...) or indices; unlisted drivers are nominal.
+        driver_names (tuple): Drivers of the model, in table order.
+        size (int): Number of projects.
+
+    Returns:
+        np.ndarray: Shape (size, n_drivers). Unknown drivers raise ValueError; unknown levels
+                    become an out-of-range index that scores as NaN.
+    """
+    encoded = np.full((size, len(driver_names)), NOMINAL, dtype=np.intp)
+    if ratings is None:
+        return encoded
+    if isinstance(ratings, np.ndarray) and ratings.dtype.kind in "iu":
+        return np.where((ratings >= 0) & (ratings < _INVALID_RATING), ratings, _INVALID_RATING).reshape(size, len(driver_names))
+
+    if isinstance(ratings, Mapping):
+        columns = ratings
+    else:
+        columns = {}
+        for row, project_ratings in enumerate(ratings):
+            for driver, level in (project_ratings or {}).items():
+                columns.setdefault(driver, [NOMINAL] * size)[row] = _rating_index(level)
+
+    for driver, values in columns.items():
+        if driver.upper() not in driver_names:
+            raise ValueError(f"Unknown cost driver: {driver}")
+        encoded[:, driver_names.index(driver.upper())] = _rating_column(values, size)
+    return encoded
+
+
+def _score(table, encoded):
+    """Gathers the multiplier of each (project, driver) rating: an indexed lookup, no dicts."""
+    return table.ravel().take(encoded + np.arange(0, table.size, table.shape[1]))
+
+
+def _finish(effort_pm, duration_m, valid, decimals):
+    effort_pm = np.where(valid, effort_pm, np.nan)
+    duration_m = np.where(valid, duration_m, np.nan)
+    if decimals is not None:
+        effort_pm = np.round(effort_pm, decimals)
+        duration_m = np.round(duration_m, decimals)
+    return effort_pm, duration_m, valid
+
+
+def calculate_intermediate_cocomo_batch(kloc_array, mode_array="semi-detached", ratings=None, decimals=2):
+    """
+    Vectorized Intermediate COCOMO: Basic COCOMO scaled by the product of 15 cost drivers (EAF).
+
+    Args:
+        kloc_array (array-like): Kilo Lines of Code, one per project (1-D).
+        mode_array (array-like or str): Project mode per project, as for calculate_cocomo_batch.
+        ratings: Cost driver ratings, any form accepted by encode_ratings
+                 (drivers: INTERMEDIATE_COST_DRIVERS).
+        decimals (int or None): Rounding applied to the results, None for full precision.
+
+    Returns:
+        tuple: (effort_pm, duration_m, valid) 1-D arrays. Rows with an unknown mode, an undefined
+               rating or a non-positive/non-finite KLOC are NaN and False in valid.
+    """
+    kloc = np.atleast_1d(np.asarray(kloc_array, dtype=float))
+    mode_idx = np.broadcast_to(mode_indices(mode_array), kloc.shape)
+    encoded = encode_ratings(ratings, _INTERMEDIATE_DRIVERS, kloc.shape[0])
+
+    eaf = _score(_INTERMEDIATE_TABLE, encoded).prod(axis=1)
+    params = _INTERMEDIATE_PARAM_MATRIX[mode_idx]
+    valid = np.isfinite(eaf) & np.isfinite(params[:, 0]) & np.isfinite(kloc) & (kloc > 0)
+    safe_kloc = np.where(valid, kloc, 1.0)
+
+    effort_pm = params[:, 0] * safe_kloc ** params[:, 1] * eaf
+    duration_m = params[:, 2] * np.where(valid, effort_pm, 1.0) ** params[:, 3]
+    return _finish(effort_pm, duration_m, valid, decimals)
+
+
+def calculate_cocomo2_batch(ksloc_array, scale_factors=None, effort_multipliers=None, decimals=2):
+    """
+    Vectorized COCOMO II.2000 Post-Architecture model.
+
+    Effort is A * Size^E * prod(EM) with E = B + 0.01 * sum(SF); duration is
+    C * PM_ns^(D + 0.2 * (E - B)) * SCED%, where PM_ns excludes the SCED multiplier.
+
+    Args:
+        ksloc_array (array-like): Size in KSLOC, one per project (1-D).
+        scale_factors: Ratings for COCOMO2_SCALE_FACTORS, any form accepted by encode_ratings.
+        effort_multipliers: Ratings for COCOMO2_EFFORT_MULTIPLIERS, same forms.
+        decimals (int or None): Rounding applied to the results, None for full precision.
+
+    Returns:
+        tuple: (effort_pm, duration_m, valid) 1-D arrays, NaN and False in valid for rows with an
+               undefined rating or a non-positive/non-finite size.
+    """
+    size = np.atleast_1d(np.asarray(ksloc_array, dtype=float))
+    n = size.shape[0]
+    sf = _score(_SCALE_FACTOR_TABLE, encode_ratings(scale_factors, _SCALE_FACTORS, n))
+    em_encoded = encode_ratings(effort_multipliers, _EFFORT_MULTIPLIERS, n)
+    em = _score(_EFFORT_MULTIPLIER_TABLE, em_encoded)
+
+    a, b, c, d = (COCOMO2_CONSTANTS[k] for k in ("A", "B", "C", "D"))
+    exponent = b + 0.01 * sf.sum(axis=1)
+    sced = em[:, _SCED_COLUMN]
+    em_without_sced = np.delete(em, _SCED_COLUMN, axis=1).prod(axis=1)
+    schedule_factor = _SCED_SCHEDULE_FACTOR[em_encoded[:, _SCED_COLUMN]]
+
+    valid = (np.isfinite(exponent) & np.isfinite(em_without_sced) & np.isfinite(sced)
+             & np.isfinite(size) & (size > 0))
+    safe_size = np.where(valid, size, 1.0)
+    safe_exponent = np.where(valid, exponent, b)
+
+    effort_nominal_schedule = a * safe_size ** safe_exponent * np.where(valid, em_without_sced, 1.0)
+    effort_pm = effort_nominal_schedule * sced
+    duration_m = c * effort_nominal_schedule ** (d + 0.2 * (safe_exponent - b)) * schedule_factor
+    return _finish(effort_pm, duration_m, valid, decimals)
+
+
+def calculate_intermediate_cocomo(kloc, mode="semi-detached", ratings=None):
+    """
+    Scalar Intermediate COCOMO.
+
+    Args:
+        kloc (float): Kilo Lines of Code.
+        mode (str): Project mode ('organic', 'semi-detached', 'embedded').
+        ratings (dict, optional): {driver: rating}, e.g. {"RELY": "high", "TOOL": "VH"}.
+
+    Returns:
+        tuple: (effort_pm, duration_m) or (None, None) if the mode or a rating is invalid.
+    """
+    if kloc <= 0:
+        return 0, 0
+    effort_pm, duration_m, valid = calculate_intermediate_cocomo_batch([kloc], [mode], [ratings] if ratings else None)
+    if not valid[0]:
+        print(f"Invalid Intermediate COCOMO inputs: mode={mode}, ratings={ratings}")
+        return None, None
+    return float(effort_pm[0]), float(duration_m[0])
+
+
+def calculate_cocomo2(ksloc, scale_factors=None, effort_multipliers=None):
+    """
+    Scalar COCOMO II Post-Architecture.
+
+    Args:
+        ksloc (float): Size in KSLOC.
+        scale_factors (dict, optional): {factor: rating}, e.g. {"PREC": "high"}.
+        effort_multipliers (dict, optional): {multiplier: rating}, e.g. {"CPLX": "VH"}.
+
+    Returns:
+        tuple: (effort_pm, duration_m) or (None, None) if a rating is invalid.
+    """
+    if ksloc <= 0:
+        return 0, 0
+    effort_pm, duration_m, valid = calculate_cocomo2_batch(
+        [ksloc], [scale_factors] if scale_factors else None, [effort_multipliers] if effort_multipliers else None
+    )
+    if not valid[0]:
+        print(f"Invalid COCOMO II ratings: scale_factors={scale_factors}, effort_multipliers={effort_multipliers}")
+        return None, None
+    return float(effort_pm[0]), float(duration_m[0])
@@ -1,61 +1,573 @@
+import math
 import pymongo
+from pymongo import monitoring
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from bson import ObjectId
+from bson.errors import InvalidId
 from dotenv import load_dotenv
 import bcrypt
 
 load_dotenv()
 
 MONGO_URL = os.getenv("MONGO_URL")
-client = None
-db = None
-users_collection = None
+MONGO_DB_NAME = os.getenv("MONGO_DB_NAME", "project_cost_estimator_db")
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "50")),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+    "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+    "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "20000")),
+    "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000")),
+}
+HEALTH_CHECK_INTERVAL_SECONDS = float(os.getenv("MONGO_HEALTH_CHECK_INTERVAL_SECONDS", "30"))
+INDEX_RETRY_MIN_SECONDS = 5
+INDEX_RETRY_MAX_SECONDS = 300
+HISTORY_PAGE_SIZE = 20
+ESTIMATE_SUMMARY_FIELDS = ("name", "project_type", "kloc", "cocomo_mode", "effort_pm", "duration_m", "total_cost")
+
+BCRYPT_TARGET_MS = float(os.getenv("BCRYPT_TARGET_MS", "250"))
+BCRYPT_MIN_ROUNDS = int(os.getenv("BCRYPT_MIN_ROUNDS", "10"))
+BCRYPT_MAX_ROUNDS = 16
+BCRYPT_CALIBRATION_PROBE_ROUNDS = 8
+BCRYPT_WORKERS = int(os.getenv("BCRYPT_WORKERS", str(min(4, os.cpu_count() or 1))))
+BCRYPT_MAX_QUEUE = int(os.getenv("BCRYPT_MAX_QUEUE", "16"))
+
+_client = None
+_client_lock = threading.Lock()
+_health = {"ok": None, "latency_ms": None, "checked_at": None, "error": None}
+_indexes_ready = False
+_indexes_lock = threading.Lock()
+_index_retry = {"at": 0.0, "delay": INDEX_RETRY_MIN_SECONDS}
+
+# bcrypt releases the GIL, so hashing here runs in parallel without tying up the Streamlit script
+# threads; at most BCRYPT_WORKERS hash at once and BCRYPT_MAX_QUEUE more may wait.
+_hash_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix="bcrypt")
+_hash_slots = threading.BoundedSemaphore(BCRYPT_WORKERS + BCRYPT_MAX_QUEUE)
+_calibration = None
+_calibration_lock = threading.Lock()
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """Connection pool counters of the shared MongoClient (registered as a pymongo event listener)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {"connections_created": 0, "connections_closed": 0, "checked_out": 0,
+                         "checked_in": 0, "checkout_failures": 0, "pools_cleared": 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+    def connection_check_out_started(self, event): pass
+
+    def pool_cleared(self, event): self._count("pools_cleared")
+    def connection_created(self, event): self._count("connections_created")
+    def connection_closed(self, event): self._count("connections_closed")
+    def connection_checked_out(self, event): self._count("checked_out")
+    def connection_checked_in(self, event): self._count("checked_in")
+    def connection_check_out_failed(self, event): self._count("checkout_failures")
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats["open_connections"] = stats["connections_created"] - stats["connections_closed"]
+        stats["in_use"] = stats["checked_out"] - stats["checked_in"]
+        stats["max_pool_size"] = MONGO_CLIENT_OPTIONS["maxPoolSize"]
+        return stats
+
+
+pool_metrics = PoolMetrics()
+
+
+def _health_check_loop(client):
+    while True:
+        started = time.perf_counter()
+        try:
+            client.admin.command("ping")
+            _health.update(ok=True, latency_ms=(time.perf_counter() - started) * 1000, error=None)
+        except Exception as e:
+            if _health["ok"] is not False:
+                print(f"MongoDB health check failed: {e}")
+            _health.update(ok=False, latency_ms=None, error=str(e))
+        _health["checked_at"] = time.time()
+        time.sleep(HEALTH_CHECK_INTERVAL_SECONDS)
+
+
+def get_client():
+    """
+    Process-wide MongoClient, created on first use.
+
+    pymongo connects lazily and pools connections, so creating the client does no network round
+    trip; reachability is checked by a background thread every MONGO_HEALTH_CHECK_INTERVAL_SECONDS.
+    Pool size and timeouts come from the MONGO_* environment variables (MONGO_CLIENT_OPTIONS).
+
+    Returns:
+        pymongo.MongoClient: The shared client, or None if MONGO_URL is missing or invalid.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                try:
+                    if MONGO_URL is None:
+                        raise ValueError("MONGO_URL not found in environment variables.")
+                    client = pymongo.MongoClient(MONGO_URL, event_listeners=[pool_metrics], **MONGO_CLIENT_OPTIONS)
+                except pymongo.errors.ConfigurationError as e:
+                    print(f"MongoDB Configuration Error: {e}")
+                    print("Please ensure MONGO_URL is correct and your IP is whitelisted if necessary.")
+                    return None
+                except Exception as e:
+                    print(f"Error connecting to MongoDB: {e}")
+                    return None
+                threading.Thread(target=_health_check_loop, args=(client,), daemon=True, name="mongo-health").start()
+                _client = client
+    return _client
+
+
+def get_db():
+    client = get_client()
+    return client[MONGO_DB_NAME] if client is not None else None
+
 
 def connect_db():
-    global client, db, users_collection
-    try:
-        if MONGO_URL is None:
-            raise ValueError("MONGO_URL not found in environment variables.")
-        client = pymongo.MongoClient(MONGO_URL)
-        db = client.project_cost_estimator_db 
-        users_collection = db.users
-        # Test connection
-        client.admin.command('ping')
-        print("Successfully connected to MongoDB!")
-        return users_collection
-    except pymongo.errors.ConfigurationError as e:
-        print(f"MongoDB Configuration Error: {e}")
-        print("Please ensure MONGO_URL is correct and your IP is whitelisted if necessary.")
-        return None
+    """Users collection of the shared client (kept for callers of the old API; no longer pings)."""
+    return get_users_collection()
+
+def ensure_indexes(db):
+    """
+    Creates the indexes the queries rely on (idempotent). The unique index on users.username keeps
+    registration a single insert and login a single index lookup however large the collection grows.
+
+    Returns:
+        bool: True if the indexes exist.
+    """
+    try:
+        db.users.create_index("username", unique=True, name="username_unique")
+        # Serves the history list (a user's estimates, newest first) and its cursor pagination;
+        # _id breaks ties between estimates saved in the same millisecond.
+        db.estimates.create_index(
+            [("username", pymongo.ASCENDING), ("created_at", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)],
+            name="username_created_at"
+        )
+        return True
     except Exception as e:
-        print(f"Error connecting to MongoDB: {e}")
+        print(f"Error creating MongoDB indexes: {e}")
+        return False
+
+
+def _get_indexed_db():
+    """The database, creating the indexes on first use; failed attempts are retried with exponential backoff."""
+    global _indexes_ready
+    db = get_db()
+    if db is None:
         return None
+    if not _indexes_ready and time.monotonic() >= _index_retry["at"]:
+        with _indexes_lock:
+            if not _indexes_ready and time.monotonic() >= _index_retry["at"]:
+                _indexes_ready = ensure_indexes(db)
+                if not _indexes_ready:
+                    # Each attempt can block for the server selection timeout, so not on every request.
+                    _index_retry["at"] = time.monotonic() + _index_retry["delay"]
+                    _index_retry["delay"] = min(_index_retry["delay"] * 2, INDEX_RETRY_MAX_SECONDS)
+    return db
+
 
 def get_users_collection():
-    global users_collection
-    if users_collection is None:
-        return connect_db()
-    return users_collection
+    db = _get_indexed_db()
+    return db.users if db is not None else None
+
+
+def get_estimates_collection():
+    db = _get_indexed_db()
+    return db.estimates if db is not None else None
+
+
+def db_status():
+    """
+    Configuration, last background health check and pool metrics, cheap enough for every rerun.
+
+    Returns:
+        dict: configured (bool), ok (True/False, None before the first check), latency_ms,
+              checked_at, error and pool (PoolMetrics.snapshot()).
+    """
+    return {"configured": MONGO_URL is not None, **_health, "pool": pool_metrics.snapshot()}
+
+
+class HashingBusyError(RuntimeError):
+    """The password hashing queue is full."""
+
+
+def _submit_hashing(fn, *args):
+    """Runs fn(*args) on the bcrypt pool, or raises HashingBusyError when the queue is full."""
+    if not _hash_slots.acquire(blocking=False):
+        raise HashingBusyError("Too many password operations in progress.")
+    try:
+        future = _hash_executor.submit(fn, *args)
+    except Exception:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return future
+
+
+def calibrate_bcrypt_rounds(target_ms=BCRYPT_TARGET_MS):
+    """
+    Picks the bcrypt work factor for a target hashing latency on this machine.
+
+    Every extra round doubles the cost, so one hash at a cheap probe cost is timed and extrapolated.
+
+    Args:
+        target_ms (float): Hashing time to stay under.
+
+    Returns:
+        int: The highest cost whose estimated time is within target_ms, but at least BCRYPT_MIN_ROUNDS.
+    """
+    started = time.perf_counter()
+    bcrypt.hashpw(b"calibration", bcrypt.gensalt(BCRYPT_CALIBRATION_PROBE_ROUNDS))
+    probe_ms = (time.perf_counter() - started) * 1000
+    rounds = BCRYPT_CALIBRATION_PROBE_ROUNDS
+    while rounds < BCRYPT_MAX_ROUNDS and probe_ms * 2 ** (rounds + 1 - BCRYPT_CALIBRATION_PROBE_ROUNDS) <= target_ms:
+        rounds += 1
+    return max(BCRYPT_MIN_ROUNDS, rounds)
+
+
+def start_bcrypt_calibration():
+    """Starts the work factor calibration in the background (once per process; BCRYPT_ROUNDS skips it)."""
+    global _calibration
+    with _calibration_lock:
+        if _calibration is None:
+            fixed_rounds = os.getenv("BCRYPT_ROUNDS")
+            if fixed_rounds:
+                _calibration = _hash_executor.submit(int, fixed_rounds)
+            else:
+                _calibration = _hash_executor.submit(calibrate_bcrypt_rounds)
+    return _calibration
+
+
+def bcrypt_rounds():
+    """The calibrated work factor for new hashes (waits for the calibration on first use)."""
+    try:
+        return start_bcrypt_calibration().result()
+    except Exception as e:
+        print(f"bcrypt calibration failed, using {BCRYPT_MIN_ROUNDS} rounds: {e}")
+        return BCRYPT_MIN_ROUNDS
+
+
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds))
+
+
+def _hash_rounds(hashed_password):
+    return int(bytes(hashed_password).split(b"$")[2])
+
+
+def _rehash_password(collection, username, password, old_hash, rounds):
+    new_hash = _hash_password(password, rounds)
+    try:
+        # Matching the old hash too keeps a concurrent password change from being overwritten.
+        collection.update_one({"username": username, "password": old_hash}, {"$set": {"password": new_hash}})
+    except pymongo.errors.PyMongoError as e:
+        print(f"Error rehashing password for {username}: {e}")
+
 
 def create_user(username, password):
     collection = get_users_collection()
     if collection is None:
         return False, "Database connection failed."
-    if collection.find_one({"username": username}):
+    try:
+        hashed_password = _submit_hashing(_hash_password, password, bcrypt_rounds()).result()
+    except HashingBusyError:
+        return False, "The server is busy, please try again in a moment."
+    try:
+        if not _indexes_ready:
+            # Without the unique index (not created yet, or existing duplicates prevent it) the insert
+            # alone would accept a taken username, so check first as before.
+            if collection.find_one({"username": username}, projection={"_id": 1}):
+                return False, "Username already exists."
+        # One round trip: the unique username index rejects duplicates atomically.
+        collection.insert_one({"username": username, "password": hashed_password})
+    except pymongo.errors.DuplicateKeyError:
         return False, "Username already exists."
-    
-    hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
-    collection.insert_one({"username": username, "password": hashed_password})
+    except pymongo.errors.PyMongoError as e:
+        print(f"Error creating user: {e}")
+        return False, "Database connection failed."
     return True, "User created successfully."
 
 def check_user(username, password):
+    """
+    Verifies a login on the bcrypt pool and, on success, rehashes a password stored with a work
+    factor lower than the calibrated one in the background.
+
+    Returns:
+        bool: True if the credentials match, False if not; None if the server is too busy to check.
+    """
     collection = get_users_collection()
     if collection is None:
         return False
-    user = collection.find_one({"username": username})
-    if user and bcrypt.checkpw(password.encode('utf-8'), user["password"]):
-        return True
-    return False
+    try:
+        user = collection.find_one({"username": username}, projection={"password": 1, "_id": 0})
+    except pymongo.errors.PyMongoError as e:
+        print(f"Error looking up user: {e}")
+        return False
+    if not user:
+        return False
+    try:
+        matches = _submit_hashing(bcrypt.checkpw, password.encode('utf-8'), user["password"]).result()
+    except HashingBusyError:
+        return None
+    if matches:
+        rounds = bcrypt_rounds()
+        if _hash_rounds(user["password"]) < rounds: # never down: a slower host must not weaken stronger hashes
+            try:
+                _submit_hashing(_rehash_password, collection, username, password, user["password"], rounds)
+            except HashingBusyError:
+                pass # retried on the next login
+    return matches
+
+
+def _estimate_document(username, project_inputs, cocomo_results, cost_summary, ai_insights=None,
+                       ai_insights_structured=None, created_at=None):
+    # Role names are user input, so the breakdown is stored as a list rather than keyed by them.
+    stored_cost_summary = {**cost_summary, "breakdown_details": [
+        {"item": item, **details} for item, details in cost_summary["breakdown_details"].items()
+    ]}
+    return {
+        "username": username,
+        "created_at": created_at or datetime.now(timezone.utc),
+        "summary": {
+            "name": project_inputs.get("name"),
+            "project_type": project_inputs.get("project_type"),
+            "kloc": project_inputs.get("kloc"),
+            "cocomo_mode": project_inputs.get("cocomo_mode"),
+            "effort_pm": cocomo_results["effort_pm"],
+            "duration_m": cocomo_results["duration_m"],
+            "total_cost": cost_summary["total_with_contingency"],
+        },
+        "project_inputs": project_inputs,
+        "cocomo_results": cocomo_results,
+        "cost_summary": stored_cost_summary,
+        "ai_insights": ai_insights,
+        "ai_insights_structured": ai_insights_structured,
+    }
+
+
+def save_estimate(username, project_inputs, cocomo_results, cost_summary, ai_insights=None, ai_insights_structured=None):
+    """
+    Stores a finished estimate in the user's history.
+
+    Returns:
+        str: The id of the saved estimate, or None if it could not be saved.
+    """
+    collection = get_estimates_collection()
+    if collection is None:
+        return None
+    try:
+        document = _estimate_document(username, project_inputs, cocomo_results, cost_summary,
+                                      ai_insights, ai_insights_structured)
+        return str(collection.insert_one(document).inserted_id)
+    except (pymongo.errors.PyMongoError, KeyError, TypeError) as e:
+        print(f"Error saving estimate: {e}")
+        return None
+
+
+def update_estimate_insights(username, estimate_id, ai_insights, ai_insights_structured=None):
+    """Attaches the AI insights, which finish after the estimate was saved. Returns True on success."""
+    collection = get_estimates_collection()
+    if collection is None or not estimate_id:
+        return False
+    try:
+        result = collection.update_one(
+            {"_id": ObjectId(estimate_id), "username": username},
+            {"$set": {"ai_insights": ai_insights, "ai_insights_structured": ai_insights_structured}}
+        )
+        return result.matched_count == 1
+    except (pymongo.errors.PyMongoError, InvalidId) as e:
+        print(f"Error updating estimate {estimate_id}: {e}")
+        return False
+
+
+def _encode_history_cursor(document):
+    return f"{document['created_at'].isoformat()}|{document['_id']}"
+
+
+def _decode_history_cursor(cursor):
+    created_at, estimate_id = cursor.split("|")
+    return datetime.fromisoformat(created_at), ObjectId(estimate_id)
+
+
+def list_estimates(username, limit=HISTORY_PAGE_SIZE, cursor=None):
+    """
+    One page of a user's estimates, newest first, with only the summary fields.
+
+    Pagination is keyset-based: the cursor holds the (created_at, _id) of the last row shown and
+    the next page starts right after it on the username_created_at index, so every page costs the
+    same regardless of how far back it is.
 
-# Initialize connection when module is loaded
-if users_collection is None:
-    connect_db()
\ No newline at end of file
+    Args:
+        username (str): Owner of the estimates.
+        limit (int): Page size.
+        cursor (str): next_cursor of the previous page; None for the first page.
+
+    Returns:
+        tuple: (rows, next_cursor). Each row has id, created_at and ESTIMATE_SUMMARY_FIELDS;
+               next_cursor is None on the last page. ([], None) if the database is unavailable.
+    """
+    collection = get_estimates_collection()
+    if collection is None:
+        return [], None
+    query = {"username": username}
+    try:
+        if cursor:
+            created_at, last_id = _decode_history_cursor(cursor)
+            query["$or"] = [{"created_at": {"$lt": created_at}},
+                            {"created_at": created_at, "_id": {"$lt": last_id}}]
+        documents = list(
+            collection.find(query, projection={"created_at": 1, "summary": 1})
+            .sort([("created_at", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)])
+            .limit(limit + 1)
+        )
+    except (pymongo.errors.PyMongoError, ValueError, InvalidId) as e:
+        print(f"Error listing estimates: {e}")
+        return [], None
+    next_cursor = _encode_history_cursor(documents[limit - 1]) if len(documents) > limit else None
+    rows = [{"id": str(document["_id"]), "created_at": document["created_at"],
+             **{field: document.get("summary", {}).get(field) for field in ESTIMATE_SUMMARY_FIELDS}}
+            for document in documents[:limit]]
+    return rows, next_cursor
+
+
+def get_estimate(username, estimate_id):
+    """
+    A saved estimate in the shape the Estimator page keeps in session state.
+
+    Returns:
+        dict: project_inputs, cocomo_results, cost_summary, ai_insights, ai_insights_structured and
+              created_at; None if it does not exist or belongs to another user.
+    """
+    collection = get_estimates_collection()
+    if collection is None:
+        return None
+    try:
+        document = collection.find_one({"_id": ObjectId(estimate_id), "username": username})
+    except (pymongo.errors.PyMongoError, InvalidId) as e:
+        print(f"Error loading estimate {estimate_id}: {e}")
+        return None
+    return _decode_estimate(document) if document is not None else None
+
+
+def iter_estimates(username):
+    """All of a user's estimates, newest first, decoded like get_estimate (for exports)."""
+    collection = get_estimates_collection()
+    if collection is None:
+        return
+    try:
+        for document in collection.find({"username": username}).sort(
+                [("created_at", pymongo.DESCENDING), ("_id", pymongo.DESCENDING)]):
+            yield _decode_estimate(document)
+    except pymongo.errors.PyMongoError as e:
+        print(f"Error exporting estimates: {e}")
+
+
+def _decode_estimate(document):
+    cost_summary = dict(document["cost_summary"])
+    cost_summary["breakdown_details"] = {
+        row["item"]: {key: value for key, value in row.items() if key != "item"}
+        for row in cost_summary["breakdown_details"]
+    }
+    return {
+        "id": str(document["_id"]),
+        "created_at": document["created_at"],
+        "project_inputs": document["project_inputs"],
+        "cocomo_results": document["cocomo_results"],
+        "cost_summary": cost_summary,
+        "ai_insights": document.get("ai_insights"),
+        "ai_insights_structured": document.get("ai_insights_structured"),
+    }
+
+
+def _import_number(section, key):
+    value = section.get(key)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise ValueError(f"{key} must be a number, got {value!r}")
+    return value
+
+
+def _import_created_at(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    raise ValueError(f"created_at must be a date and time (ISO format), got {value!r}")
+
+
+def _import_document(username, estimate):
+    """The stored document of one imported estimate; raises ValueError if a field the history relies on is invalid."""
+    if not isinstance(estimate, dict):
+        raise ValueError("an estimate must be an object")
+    sections = {}
+    for name in ("project_inputs", "cocomo_results", "cost_summary"):
+        if not isinstance(estimate.get(name), dict):
+            raise ValueError(f"{name} must be an object")
+        sections[name] = estimate[name]
+    cocomo_results = {**sections["cocomo_results"], "effort_pm": _import_number(sections["cocomo_results"], "effort_pm"),
+                      "duration_m": _import_number(sections["cocomo_results"], "duration_m")}
+    cost_summary = sections["cost_summary"]
+    _import_number(cost_summary, "total_with_contingency")
+    breakdown_details = cost_summary.get("breakdown_details")
+    if not isinstance(breakdown_details, dict) or not all(isinstance(details, dict) for details in breakdown_details.values()):
+        raise ValueError("breakdown_details must be an object of objects")
+    return _estimate_document(username, sections["project_inputs"], cocomo_results, cost_summary,
+                              estimate.get("ai_insights"), estimate.get("ai_insights_structured"),
+                              _import_created_at(estimate.get("created_at")))
+
+
+def import_estimates(username, estimates):
+    """
+    Adds many estimates to a user's history in one unordered bulk write.
+
+    Every estimate is checked first: effort_pm, duration_m and total_with_contingency must be
+    numbers, breakdown_details an object and created_at a datetime or ISO string, since the history
+    page and the exports format them. One invalid estimate rejects the whole import.
+
+    Args:
+        estimates (iterable): Dicts with project_inputs, cocomo_results and cost_summary, and
+                              optionally ai_insights, ai_insights_structured and created_at
+                              (datetime or ISO string) - e.g. the rows of a history export.
+
+    Returns:
+        tuple: (inserted_count, error_message or None).
+    """
+    collection = get_estimates_collection()
+    if collection is None:
+        return 0, "Database connection failed."
+    if isinstance(estimates, (dict, str, bytes)):
+        return 0, "Invalid import: expected a list of estimates."
+    operations = []
+    for number, estimate in enumerate(estimates, start=1):
+        try:
+            operations.append(pymongo.InsertOne(_import_document(username, estimate)))
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            return 0, f"Invalid estimate #{number} in import: {e}"
+    if not operations:
+        return 0, None
+    try:
+        result = collection.bulk_write(operations, ordered=False)
+    except pymongo.errors.BulkWriteError as e:
+        return e.details.get("nInserted", 0), "Some estimates could not be imported."
+    except pymongo.errors.PyMongoError as e:
+        print(f"Error importing estimates: {e}")
+        return 0, "Database connection failed."
+    return result.inserted_count, None
@@ -0,0 +1,176 @@
+from utils.cocomo import COCOMO_PARAMS, calculate_cocomo, calculate_cost
+
+CURRENCY_SYMBOL = "₹"
+BREAKDOWN_COLUMNS = ("Item/Role", "Count/Multiplier", f"Rate/hr or Factor ({CURRENCY_SYMBOL})",
+                     f"Monthly Cost ({CURRENCY_SYMBOL})", f"Total Cost ({CURRENCY_SYMBOL})")
+BREAKDOWN_SHEET = f"Cost Breakdown ({CURRENCY_SYMBOL})"
+EXCEL_INPUT_FIELDS = ("name", "description", "project_type", "primary_tech_stack", "kloc", "cocomo_mode",
+                      "contingency", "workflow_complexity", "types_of_users")
+# Sheet name -> header of the Excel export (see excel_rows).
+EXCEL_SHEETS = {
+    "Inputs": ("Estimate", "Estimate ID", "Created At", *EXCEL_INPUT_FIELDS),
+    "Team": ("Estimate", "Role Name", "Role Type", "Tech Stack", "Count", f"Rate/hr ({CURRENCY_SYMBOL})"),
+    "COCOMO & Cost Summary": ("Estimate", "effort_pm", "duration_m", f"Subtotal Cost ({CURRENCY_SYMBOL})",
+                              f"Total Cost with Contingency ({CURRENCY_SYMBOL})", "Contingency Percentage"),
+    BREAKDOWN_SHEET: ("Estimate", *BREAKDOWN_COLUMNS),
+    "AI Insights": ("Estimate", "Insights"),
+}
+
+
+def estimate_project(kloc, cocomo_mode, roles_data, contingency_percentage):
+    """
+    Runs COCOMO and the cost calculation for one project, in the shapes the UI and exports use.
+
+    Args:
+        kloc (float): Kilo Lines of Code.
+        cocomo_mode (str): Project mode ('organic', 'semi-detached', 'embedded').
+        roles_data (list of dicts): [{"role_name", "count", "rate_ph"}, ...].
+        contingency_percentage (float): Contingency buffer in percent.
+
+    Returns:
+        tuple: (cocomo_results, cost_summary) dicts, or (None, None) if the mode is invalid.
+    """
+    effort_pm, duration_m = calculate_cocomo(kloc, cocomo_mode)
+    if effort_pm is None:
+        return None, None
+    subtotal_cost, total_cost_with_contingency, cost_breakdown_details = calculate_cost(
+        roles_data, duration_m, contingency_percentage
+    )
+    cocomo_results = {"effort_pm": effort_pm, "duration_m": duration_m}
+    cost_summary = {
+        "subtotal": subtotal_cost,
+        "total_with_contingency": total_cost_with_contingency,
+        "contingency_percentage": contingency_percentage,
+        "breakdown_details": cost_breakdown_details
+    }
+    return cocomo_results, cost_summary
+
+
+def breakdown_rows(breakdown_details):
+    """Rows (tuples in BREAKDOWN_COLUMNS order) of the cost breakdown table."""
+    for role, details in breakdown_details.items():
+        yield (role, details.get('count', '-'), details.get('rate_ph', '-'),
+               details.get('monthly_cost_per_person', '-'), details.get('total_role_cost', 0))
+
+
+def breakdown_dataframe(breakdown_details):
+    """Cost breakdown as the table shown in the UI and written to the exports."""
+    import pandas as pd # deferred: only needed once there are results to show
+
+    return pd.DataFrame(list(breakdown_rows(breakdown_details)), columns=list(BREAKDOWN_COLUMNS))
+
+
+def build_ai_context(project_inputs):
+    """
+    Free-text project context passed to get_ai_insights as roles_data_str.
+
+    Args:
+        project_inputs (dict): Project inputs as stored by the Estimator page; the team is read from
+                               "team_details_full" (falling back to "roles_data").
+    """
+    roles_details_for_ai = []
+    for r_item in project_inputs.get("team_details_full") or project_inputs.get("roles_data", []):
+        if r_item.get("count",0) > 0:
+            role_str = (f"- Name: {r_item.get('role_name', 'N/A')}, "
+                        f"Type: {r_item.get('role_type', 'N/A')}, "
+                        f"Tech: {', '.join(r_item.get('tech_stack_role', ['N/A'])) if r_item.get('tech_stack_role') else 'N/A'}, "
+                        f"Count: {r_item.get('count',0)}, "
+                        f"Rate: {CURRENCY_SYMBOL}{r_item.get('rate_ph',0):,}/hr")
+            roles_details_for_ai.append(role_str)
+    roles_data_str_for_ai = "\n".join(roles_details_for_ai)
+
+    primary_tech_stack = project_inputs.get("primary_tech_stack")
+    types_of_users = project_inputs.get("types_of_users")
+    return (
+        f"Project Description: {project_inputs.get('description', '')}\n"
+        f"Primary Tech Stack: {', '.join(primary_tech_stack) if primary_tech_stack else 'N/A'}\n"
+        f"Project Type: {project_inputs.get('project_type', 'N/A')}\n"
+        f"Workflow Complexity: {project_inputs.get('workflow_complexity', 'N/A')}\n"
+        f"User Types: {', '.join(types_of_users) if types_of_users else 'N/A'}\n"
+        f"Team Details:\n{roles_data_str_for_ai}"
+    )
+
+
+def _excel_text(value):
+    return ", ".join(str(item) for item in value) if isinstance(value, list) else value
+
+
+def excel_rows(number, estimate):
+    """
+    (sheet name, row) pairs of one estimate in the EXCEL_SHEETS workbook layout.
+
+    The team is written as one "Team" row per member rather than as JSON in a cell; every row
+    starts with the estimate's number in the export, so the sheets can be joined on it.
+
+    Args:
+        number (int): 1-based position of the estimate in the export.
+        estimate (dict): project_inputs, cocomo_results, cost_summary and optionally ai_insights,
+                         id and created_at (e.g. a utils.db.iter_estimates item).
+    """
+    project_inputs = estimate["project_inputs"]
+    cocomo_results = estimate["cocomo_results"]
+    cost_summary = estimate["cost_summary"]
+    yield "Inputs", (number, estimate.get("id"), estimate.get("created_at"),
+                     *(_excel_text(project_inputs.get(field)) for field in EXCEL_INPUT_FIELDS))
+    for member in project_inputs.get("team_details_full") or project_inputs.get("roles_data", []):
+        yield "Team", (number, member.get("role_name"), member.get("role_type"),
+                       _excel_text(member.get("tech_stack_role")), member.get("count"), member.get("rate_ph"))
+    yield "COCOMO & Cost Summary", (number, cocomo_results.get("effort_pm"), cocomo_results.get("duration_m"),
+                                    cost_summary.get("subtotal"), cost_summary.get("total_with_contingency"),
+                                    cost_summary.get("contingency_percentage"))
+    for row in breakdown_rows(cost_summary.get("breakdown_details", {})):
+        yield BREAKDOWN_SHEET, (number, *row)
+    yield "AI Insights", (number, estimate.get("ai_insights") or "N/A")
+
+
+def build_fallback_insights(project_inputs, cocomo_results, cost_summary, reason=None):
+    """
+    Deterministic Markdown summary of an estimate, built from the calculate_cost breakdown; shown
+    in place of the AI insights when the LLM is unavailable, failing or too slow.
+
+    Args:
+        reason (str): Why the AI insights are missing, shown in the heading note.
+    """
+    breakdown = cost_summary.get("breakdown_details", {})
+    roles = {name: details for name, details in breakdown.items() if name != "Contingency"}
+    subtotal = cost_summary.get("subtotal", 0) or 0
+    total = cost_summary.get("total_with_contingency", 0) or 0
+    effort_pm, duration_m = cocomo_results["effort_pm"], cocomo_results["duration_m"]
+    head_count = sum(int(details.get("count", 0)) for details in roles.values())
+    monthly_burn = subtotal / duration_m if duration_m else 0
+    reason = reason.strip().rstrip(".") if reason else None
+
+    lines = [
+        f"_AI insights are unavailable{f' ({reason})' if reason else ''}. "
+        "This summary is computed directly from the estimate._",
+        "",
+        "**1. Cost Drivers:**",
+        f"*   **Size and model:** {project_inputs.get('kloc')} KLOC in {project_inputs.get('cocomo_mode')} mode gives "
+        f"{effort_pm} person-months over {duration_m} months "
+        f"(about {effort_pm / duration_m if duration_m else 0:.1f} full-time people on average).",
+        f"*   **Team:** {head_count} people cost {CURRENCY_SYMBOL}{monthly_burn:,.2f} per month, "
+        f"so every month of schedule costs about {CURRENCY_SYMBOL}{monthly_burn:,.2f}.",
+    ]
+    contingency = breakdown.get("Contingency")
+    if contingency:
+        lines.append(f"*   **Contingency:** {cost_summary.get('contingency_percentage')}% adds "
+                     f"{CURRENCY_SYMBOL}{contingency.get('total_role_cost', 0):,.2f}, for a total of {CURRENCY_SYMBOL}{total:,.2f}.")
+
+    if roles:
+        lines += ["", "**2. Cost by Role:**"]
+        for name, details in sorted(roles.items(), key=lambda item: item[1].get("total_role_cost", 0), reverse=True):
+            role_cost = details.get("total_role_cost", 0)
+            share = role_cost / subtotal if subtotal else 0
+            lines.append(f"*   **{name}:** {details.get('count')} x {CURRENCY_SYMBOL}{details.get('rate_ph')}/hr = "
+                         f"{CURRENCY_SYMBOL}{role_cost:,.2f} ({share:.0%} of the team cost)")
+
+    mode_params = COCOMO_PARAMS.get(project_inputs.get("cocomo_mode"))
+    if mode_params and total:
+        # Cost scales with duration, i.e. with KLOC^(b*d).
+        scope_saving = total * (1 - 0.9 ** (mode_params[1] * mode_params[3]))
+        lines += [
+            "", "**3. Levers to Review:**",
+            f"*   Reducing the scope by 10% of the KLOC saves about {CURRENCY_SYMBOL}{scope_saving:,.2f}.",
+            f"*   Each person removed from the team for the whole project saves their monthly cost times {duration_m} months.",
+        ]
+    return "\n".join(lines)
@@ -0,0 +1,151 @@
+import os
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from utils.estimate import breakdown_dataframe
+from utils.hashing import stable_hash
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+EXPORT_FORMAT_VERSION = 3 # bump when the report layout changes, so stale artifacts are not served
+
+
+class ExportCache:
+    """
+    In-memory cache of export artifacts (PDF/Excel bytes) keyed by a hash of their content.
+
+    Least recently used artifacts are evicted once their total size exceeds max_bytes. Each key
+    is built at most once at a time: concurrent requests for an artifact that is being built wait
+    for it instead of building it again. Safe to share between Streamlit sessions (threads).
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # key -> bytes
+        self._size = 0
+        self._lock = threading.Lock()
+        self._building = {} # key -> lock held while the artifact is built
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key):
+        """Returns the cached artifact for key, or None."""
+        with self._lock:
+            artifact = self._entries.get(key)
+            if artifact is not None:
+                self._entries.move_to_end(key)
+            return artifact
+
+    def get_or_build(self, key, build):
+        """
+        Returns the artifact for key, calling build() to produce it on a miss.
+
+        Args:
+            key (str): Content hash of everything the artifact depends on.
+            build (callable): Returns the artifact as bytes.
+
+        Returns:
+            bytes: The artifact.
+        """
+        with self._lock:
+            artifact = self._entries.get(key)
+            if artifact is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return artifact
+            build_lock = self._building.setdefault(key, threading.Lock())
+        with build_lock:
+            artifact = self.get(key) # built by a concurrent request while this one waited
+            if artifact is not None:
+                with self._lock:
+                    self._counters["hits"] += 1
+                return artifact
+            with self._lock:
+                self._counters["misses"] += 1
+            try:
+                artifact = build()
+                self._store(key, artifact)
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+        return artifact
+
+    def _store(self, key, artifact):
+        with self._lock:
+            if len(artifact) > self.max_bytes:
+                return # larger than the whole cache: serve it, but do not keep it
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = artifact
+            self._size += len(artifact)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self._counters["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        """Hit/miss/eviction counters plus the number and total size of cached artifacts."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._size
+        return stats
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_export_cache():
+    """Process-wide ExportCache; its size limit comes from EXPORT_CACHE_MAX_MB (default 64)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            max_mb = os.getenv("EXPORT_CACHE_MAX_MB")
+            _cache = ExportCache(int(float(max_mb) * 1024 * 1024) if max_mb else DEFAULT_MAX_BYTES)
+        return _cache
+
+
+def export_cache_key(kind, project_inputs, cocomo_results, cost_summary, ai_insights, ai_insights_structured=None):
+    """
+    Content hash of an export: everything that ends up in the file, plus the format version.
+
+    PDF reports print the current date, so their key also includes today's date.
+    """
+    return stable_hash(
+        "export", EXPORT_FORMAT_VERSION, kind, date.today().isoformat() if kind == "pdf" else None,
+        project_inputs, cocomo_results, cost_summary, ai_insights, ai_insights_structured
+    )
+
+
+def get_excel_export(project_inputs, cocomo_results, cost_summary, ai_insights):
+    """Excel report bytes for an estimate, built on first request and then served from the cache."""
+    def _build():
+        from utils.export_utils import estimates_excel_bytes
+
+        return estimates_excel_bytes([{"project_inputs": project_inputs, "cocomo_results": cocomo_results,
+                                       "cost_summary": cost_summary, "ai_insights": ai_insights}])
+
+    key = export_cache_key("excel", project_inputs, cocomo_results, cost_summary, ai_insights)
+    return get_export_cache().get_or_build(key, _build)
+
+
+def get_pdf_export(project_inputs, cocomo_results, cost_summary, ai_insights, ai_insights_structured=None):
+    """PDF report bytes for an estimate, built on first request and then served from the cache."""
+    def _build():
+        from utils.export_utils import create_pdf_report
+
+        return create_pdf_report(
+            project_data=project_inputs, cocomo_results=cocomo_results, cost_summary=cost_summary,
+            cost_breakdown_df=breakdown_dataframe(cost_summary["breakdown_details"]),
+            ai_insights_raw=ai_insights if ai_insights else "No AI insights generated.",
+            ai_insights_structured=ai_insights_structured
+        )
+
+    key = export_cache_key("pdf", project_inputs, cocomo_results, cost_summary, ai_insights, ai_insights_structured)
+    return get_export_cache().get_or_build(key, _build)
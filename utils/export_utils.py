@@ -1,45 +1,54 @@
-import pandas as pd
 from io import BytesIO
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image, Preformatted, HRFlowable
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-import matplotlib.pyplot as plt
 import re
-from html import escape
+import tempfile
+import threading
 from datetime import datetime
+from utils.estimate import EXCEL_SHEETS, excel_rows
+from utils.markdown_pdf import markdown_styles, markdown_to_flowables
+from utils.charts import cost_pie_chart_drawing
+
+# pandas and reportlab (and matplotlib, in utils.charts) are imported inside the functions that need them: together they
+# take about a second to import, and most page renders never export or draw a chart.
 
 CURRENCY_SYMBOL = "₹" # Define currency symbol globally for this module
+EXCEL_SPOOL_MAX_BYTES = 8 * 1024 * 1024
 
-def df_to_excel_bytes(df_dict):
-    """Exports a dictionary of DataFrames to an Excel file in memory."""
-    output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        for sheet_name, df in df_dict.items():
-            df.to_excel(writer, sheet_name=sheet_name, index=False)
-    return output.getvalue()
+_report_styles = None
+_report_styles_lock = threading.Lock()
 
-def generate_cost_pie_chart_bytes(cost_breakdown_details):
-    if not cost_breakdown_details:
-        return None
-    labels = []
-    sizes = []
-    for role, details in cost_breakdown_details.items():
-        if details.get("total_role_cost", 0) > 0:
-            labels.append(role)
-            sizes.append(details["total_role_cost"])
-    if not labels or not sizes: 
-        return None
-    fig, ax = plt.subplots(figsize=(6, 4)) 
-    ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, textprops={'fontsize': 8})
-    ax.axis('equal')  
-    plt.title("Cost Distribution by Role/Item", fontsize=10)
-    img_bytes = BytesIO()
-    plt.savefig(img_bytes, format='png', bbox_inches='tight', dpi=150)
-    plt.close(fig) 
-    img_bytes.seek(0)
-    return img_bytes
+def write_estimates_excel(target, estimates):
+    """
+    Writes estimates to an Excel workbook (utils.estimate.EXCEL_SHEETS layout) row by row.
+
+    Rows go straight to a streaming writer (utils.xlsx_stream) that spills each sheet to a temporary
+    file, so memory stays flat however many estimates there are; estimates can be a generator such
+    as utils.db.iter_estimates(username).
+
+    Args:
+        target: File path or binary file object.
+        estimates (iterable): Dicts with project_inputs, cocomo_results, cost_summary and optionally
+                              ai_insights, id and created_at.
+
+    Returns:
+        int: Number of estimates written.
+    """
+    from utils.xlsx_stream import XlsxStreamWriter
+
+    count = 0
+    with XlsxStreamWriter(target) as writer:
+        for sheet_name, header in EXCEL_SHEETS.items():
+            writer.add_sheet(sheet_name, header)
+        for count, estimate in enumerate(estimates, start=1):
+            for sheet_name, row in excel_rows(count, estimate):
+                writer.append(sheet_name, row)
+    return count
+
+def estimates_excel_bytes(estimates):
+    """write_estimates_excel output as bytes, for downloads; built in a temporary file beyond 8 MB."""
+    with tempfile.SpooledTemporaryFile(max_size=EXCEL_SPOOL_MAX_BYTES) as output:
+        write_estimates_excel(output, estimates)
+        output.seek(0)
+        return output.read()
 
 def extract_optimized_scenario(ai_text):
     if not ai_text or not isinstance(ai_text, str):
@@ -75,16 +84,89 @@ def extract_optimized_scenario(ai_text):
     return None
 
 
-def create_pdf_report(project_data, cocomo_results, cost_summary, cost_breakdown_df, ai_insights_raw):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter,
-                            rightMargin=inch, leftMargin=inch,
-                            topMargin=inch, bottomMargin=inch)
-    
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name='CodeSmall', parent=styles['Code'], fontSize=8, leading=9))
-    styles.add(ParagraphStyle(name='RightAlign', parent=styles['Normal'], alignment=2)) 
+def structured_optimized_scenario(ai_insights_structured):
+    """
+    Optimized scenario of validated structured insights (utils.ai_helper.validate_insights), in the
+    same shape as extract_optimized_scenario returns, so no text has to be parsed.
+    """
+    if not ai_insights_structured:
+        return None
+    scenario = ai_insights_structured["optimized_scenario"]
+    return {
+        "cost": f"{scenario['total_cost']:,.2f}",
+        "duration": f"{scenario['duration_months']:g} Months"
+    }
+
+
+def report_styles():
+    """
+    Paragraph styles of the PDF reports: reportlab's sample styles plus the report and Markdown
+    styles. Built once per process and shared by every report; they are not modified afterwards.
+    """
+    global _report_styles
+    with _report_styles_lock:
+        if _report_styles is None:
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+            styles = getSampleStyleSheet()
+            styles.add(ParagraphStyle(name='CodeSmall', parent=styles['Code'], fontSize=8, leading=9))
+            styles.add(ParagraphStyle(name='RightAlign', parent=styles['Normal'], alignment=2))
+            _report_styles = markdown_styles(styles)
+        return _report_styles
+
+
+def report_doc_template(target):
+    """SimpleDocTemplate with the report's page size and margins, writing to a file path or file object."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate
+    from reportlab.lib.units import inch
+
+    return SimpleDocTemplate(target, pagesize=letter,
+                             rightMargin=inch, leftMargin=inch,
+                             topMargin=inch, bottomMargin=inch)
+
+
+def build_report(target, story, ai_insights_raw=None, on_page=None):
+    """
+    Lays out a report story into target (a file path or a seekable file object). If the layout
+    fails, an error page with the raw AI insights is written to target instead.
+
+    Args:
+        on_page (callable, optional): reportlab page callback (canvas, doc), e.g. for a footer.
+
+    Returns:
+        int: Number of pages written.
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Preformatted
+    from reportlab.lib.units import inch
+
+    styles = report_styles()
+    page_callbacks = {"onFirstPage": on_page, "onLaterPages": on_page} if on_page else {}
+    doc = report_doc_template(target)
+    try:
+        doc.build(story, **page_callbacks)
+    except Exception as e_build:
+        print(f"Error building PDF document: {e_build}")
+        if hasattr(target, "seek"):
+            target.seek(0)
+            target.truncate()
+        doc = SimpleDocTemplate(target, pagesize=letter)
+        story_error = [Paragraph("Error Generating PDF", styles['h1']),
+                       Paragraph(f"An error occurred while building the PDF: {str(e_build)}", styles['Normal'])]
+        if ai_insights_raw and isinstance(ai_insights_raw, str): 
+            story_error.append(Spacer(1,0.2*inch))
+            story_error.append(Paragraph("Raw AI Insights (for debugging):", styles['h3']))
+            story_error.append(Preformatted(ai_insights_raw, styles['CodeSmall']))
+        doc.build(story_error)
+    return doc.page
 
+
+def create_pdf_report(project_data, cocomo_results, cost_summary, cost_breakdown_df, ai_insights_raw, ai_insights_structured=None):
+    from reportlab.platypus import Paragraph, Spacer
+    from reportlab.lib.units import inch
+
+    styles = report_styles()
     story = []
 
     current_date = datetime.now().strftime("%B %d, %Y")
@@ -93,6 +175,30 @@ def create_pdf_report(project_data, cocomo_results, cost_summary, cost_breakdown
 
     story.append(Paragraph(f"Project Cost Estimation Report (Amounts in {CURRENCY_SYMBOL})", styles['h1']))
     story.append(Spacer(1, 0.2*inch))
+    story.extend(project_story(project_data, cocomo_results, cost_summary, cost_breakdown_df, ai_insights_raw,
+                               ai_insights_structured))
+
+    buffer = BytesIO()
+    try:
+        build_report(buffer, story, ai_insights_raw)
+        pdf_bytes = buffer.getvalue()
+    finally:
+        buffer.close()
+        
+    return pdf_bytes
+
+
+def project_story(project_data, cocomo_results, cost_summary, cost_breakdown_df, ai_insights_raw, ai_insights_structured=None):
+    """
+    Flowables of one project's report body (inputs, COCOMO, costs, AI scenario, chart, breakdown
+    and AI insights), shared by the single-project report and the portfolio report sections.
+    """
+    from reportlab.platypus import Paragraph, Spacer, Table, TableStyle, HRFlowable, KeepTogether
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+
+    styles = report_styles()
+    story = []
 
     story.append(Paragraph("Project Inputs", styles['h2']))
     project_details_list = [
@@ -155,7 +261,10 @@ def create_pdf_report(project_data, cocomo_results, cost_summary, cost_breakdown
     story.append(cost_summary_table)
     story.append(Spacer(1, 0.1*inch))
 
-    optimized_scenario = extract_optimized_scenario(ai_insights_raw if isinstance(ai_insights_raw, str) else "")
+    if ai_insights_structured:
+        optimized_scenario = structured_optimized_scenario(ai_insights_structured)
+    else:
+        optimized_scenario = extract_optimized_scenario(ai_insights_raw if isinstance(ai_insights_raw, str) else "")
     if optimized_scenario:
         story.append(HRFlowable(width="100%", thickness=1, color=colors.black))
         story.append(Paragraph(f"AI Hypothetical Optimized Scenario Summary (in {CURRENCY_SYMBOL})", styles['h2']))
@@ -187,12 +296,11 @@ def create_pdf_report(project_data, cocomo_results, cost_summary, cost_breakdown
         story.append(Spacer(1, 0.2*inch))
         story.append(HRFlowable(width="100%", thickness=1, color=colors.black)) 
 
-    chart_bytes = generate_cost_pie_chart_bytes(cost_summary.get('breakdown_details', {}))
-    if chart_bytes:
-        story.append(Paragraph("Cost Distribution (Original Estimate)", styles['h3']))
-        img = Image(chart_bytes, width=5*inch, height=3.33*inch) 
-        img.hAlign = 'CENTER'
-        story.append(img)
+    pie_chart = cost_pie_chart_drawing(cost_summary.get('breakdown_details', {}), width=5*inch, height=3.33*inch)
+    if pie_chart:
+        pie_chart.hAlign = 'CENTER'
+        # Vector graphics drawn by reportlab itself; kept on one page with its heading.
+        story.append(KeepTogether([Paragraph("Cost Distribution (Original Estimate)", styles['h3']), pie_chart]))
         story.append(Spacer(1, 0.2*inch))
 
     if not cost_breakdown_df.empty:
@@ -253,35 +361,11 @@ def create_pdf_report(project_data, cocomo_results, cost_summary, cost_breakdown
     story.append(Spacer(1, 0.2*inch))
 
     if ai_insights_raw and isinstance(ai_insights_raw, str):
-        story.append(Paragraph(f"AI-Enhanced Insights (Detailed Analysis, amounts in {CURRENCY_SYMBOL})", styles['h2']))
-        
-        processed_text = escape(ai_insights_raw) 
-        processed_text = processed_text.replace("\n", "<br/>")
-        # Ensure AI's ₹ symbols are preserved by not over-escaping them
-        # The AI prompt now asks for ₹, so we expect it in the raw text.
-        # The html.escape handles <, >, & correctly.
-        
-        # Regex for bold, headings, lists, etc. remain the same as they don't interfere with ₹
-        processed_text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', processed_text)
-        processed_text = re.sub(r'^### (.*?)<br/>', r'<b><i>\1</i></b><br/>', processed_text, flags=re.MULTILINE) 
-        processed_text = re.sub(r'^## (.*?)<br/>', r'<b>\1</b><br/>', processed_text, flags=re.MULTILINE) 
-        processed_text = re.sub(r'^(?:\*|-)\s*(.*?)<br/>', r'• \1<br/>', processed_text, flags=re.MULTILINE)
-        processed_text = re.sub(r'<br/>(?:\*|-)\s*(.*?)<br/>', r'<br/>• \1<br/>', processed_text, flags=re.MULTILINE)
-        processed_text = re.sub(r'^(\d+\.)\s*(.*?)<br/>', r'\1 \2<br/>', processed_text, flags=re.MULTILINE)
-        processed_text = re.sub(r'<br/>(\d+\.)\s*(.*?)<br/>', r'<br/>\1 \2<br/>', processed_text, flags=re.MULTILINE)
-        processed_text = re.sub(r'^\s*---\s*<br/>', '<br/>-----------------------------------<br/>', processed_text, flags=re.MULTILINE)
-        processed_text = re.sub(r'^\s*===\s*<br/>', '<br/>===================================<br/>', processed_text, flags=re.MULTILINE)
-        processed_text = re.sub(r'```(.*?)```', r'<font name="Courier">\1</font>', processed_text, flags=re.DOTALL)
-        if processed_text.endswith("<br/>"):
-            processed_text = processed_text[:-5]
-        try:
-            story.append(Paragraph(processed_text, styles['Normal']))
-        except Exception as e_para:
-            print(f"Error creating Paragraph for AI insights: {e_para}")
-            story.append(Paragraph("<b>AI-Enhanced Insights (Error in Formatting)</b>", styles['h2']))
-            story.append(Paragraph(f"Could not fully format AI insights for PDF due to: {str(e_para)}. Displaying as preformatted text:", styles['Normal']))
-            story.append(Spacer(1, 0.1*inch))
-            story.append(Preformatted(ai_insights_raw, styles['CodeSmall'])) 
+        heading = Paragraph(f"AI-Enhanced Insights (Detailed Analysis, amounts in {CURRENCY_SYMBOL})", styles['h2'])
+        heading.keepWithNext = 1
+        story.append(heading)
+        # One flowable per heading, paragraph, list and code block, so long insights flow across pages.
+        story.extend(markdown_to_flowables(ai_insights_raw, styles))
     elif ai_insights_raw: 
         story.append(Paragraph("AI-Enhanced Insights", styles['h2']))
         story.append(Paragraph(str(ai_insights_raw), styles['Normal'])) 
@@ -289,22 +373,4 @@ def create_pdf_report(project_data, cocomo_results, cost_summary, cost_breakdown
         story.append(Paragraph("AI-Enhanced Insights", styles['h2']))
         story.append(Paragraph("No AI insights were generated or provided.", styles['Normal']))
 
-    try:
-        doc.build(story)
-        pdf_bytes = buffer.getvalue()
-    except Exception as e_build:
-        print(f"Error building PDF document: {e_build}")
-        buffer = BytesIO()
-        doc_error = SimpleDocTemplate(buffer, pagesize=letter)
-        story_error = [Paragraph("Error Generating PDF", styles['h1']),
-                       Paragraph(f"An error occurred while building the PDF: {str(e_build)}", styles['Normal'])]
-        if ai_insights_raw and isinstance(ai_insights_raw, str): 
-            story_error.append(Spacer(1,0.2*inch))
-            story_error.append(Paragraph("Raw AI Insights (for debugging):", styles['h3']))
-            story_error.append(Preformatted(ai_insights_raw, styles['CodeSmall']))
-        doc_error.build(story_error)
-        pdf_bytes = buffer.getvalue()
-    finally:
-        buffer.close()
-        
-    return pdf_bytes
\ No newline at end of file
+    return story
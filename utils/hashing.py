@@ -0,0 +1,19 @@
+import hashlib
+import json
+
+
+def stable_hash(*parts):
+    """
+    Deterministic SHA-256 hex digest of JSON-like values.
+
+    Dict keys are sorted and non-JSON values (numpy scalars, datetimes, ...) fall back to str(),
+    so equal inputs give the same digest across reruns and processes.
+
+    Args:
+        *parts: Values to hash together.
+
+    Returns:
+        str: Hex digest.
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
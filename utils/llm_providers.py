@@ -0,0 +1,163 @@
+import os
+import threading
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class LLMProviderError(Exception):
+    """Any failure of an LLM provider call (network, HTTP status, malformed response)."""
+
+
+class RateLimitedError(LLMProviderError):
+    """The provider rejected the call with HTTP 429."""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class LLMProvider:
+    """
+    Chat-completion backend used by utils.ai_helper.
+
+    Subclasses implement complete() and stream(); both take OpenAI-style chat messages and raise
+    LLMProviderError (or RateLimitedError) on failure.
+    """
+
+    name = "base"
+
+    def is_available(self):
+        return True
+
+    def complete(self, messages, model, temperature, max_tokens, **kwargs):
+        """Returns the full response text."""
+        raise NotImplementedError
+
+    def stream(self, messages, model, temperature, max_tokens, **kwargs):
+        """Yields response text chunks as they are generated."""
+        yield self.complete(messages, model, temperature, max_tokens, **kwargs)
+
+
+class GroqProvider(LLMProvider):
+    """
+    Groq chat completions. The client is built on first use, not at import.
+
+    base_url points the SDK at any server speaking Groq's OpenAI-compatible protocol, such as
+    scripts/llm_stub_server.py.
+    """
+
+    name = "groq"
+
+    def __init__(self, api_key=None, base_url=None, timeout=None, max_retries=2):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    def is_available(self):
+        return bool(self.api_key)
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from groq import Groq
+                    options = {"api_key": self.api_key, "max_retries": self.max_retries}
+                    if self.base_url:
+                        options["base_url"] = self.base_url
+                    if self.timeout is not None:
+                        options["timeout"] = self.timeout
+                    self._client = Groq(**options)
+        return self._client
+
+    @staticmethod
+    def _translate_error(e):
+        import groq
+        if isinstance(e, groq.RateLimitError):
+            retry_after = e.response.headers.get("retry-after") if e.response is not None else None
+            try:
+                retry_after = float(retry_after) if retry_after is not None else None
+            except ValueError:
+                retry_after = None
+            return RateLimitedError(str(e), retry_after=retry_after)
+        return LLMProviderError(str(e))
+
+    def _client_for(self, kwargs):
+        # max_retries=0 lets callers with their own retry policy (utils.ai_batch) see every 429.
+        if "max_retries" in kwargs:
+            return self.client.with_options(max_retries=kwargs.pop("max_retries"))
+        return self.client
+
+    def complete(self, messages, model, temperature, max_tokens, **kwargs):
+        try:
+            chat_completion = self._client_for(kwargs).chat.completions.create(
+                messages=messages, model=model, temperature=temperature, max_tokens=max_tokens, **kwargs
+            )
+            return chat_completion.choices[0].message.content
+        except Exception as e:
+            raise self._translate_error(e) from e
+
+    def stream(self, messages, model, temperature, max_tokens, **kwargs):
+        try:
+            stream = self._client_for(kwargs).chat.completions.create(
+                messages=messages, model=model, temperature=temperature, max_tokens=max_tokens, stream=True, **kwargs
+            )
+            try:
+                for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        yield delta
+            finally:
+                stream.close() # also when the caller closes this generator early: releases the connection
+        except Exception as e:
+            raise self._translate_error(e) from e
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def provider_from_env():
+    """
+    Builds the provider named by LLM_PROVIDER (default 'groq'), wrapped in the deadline, retry,
+    hedging and circuit-breaker layer of utils.llm_resilience.
+
+    Environment: GROQ_API_KEY, GROQ_BASE_URL (e.g. a local stub server), GROQ_TIMEOUT_SECONDS (per
+    attempt, default 30), plus the AI_* settings of resilient_provider_from_env.
+    """
+    from utils.llm_resilience import resilient_provider_from_env
+
+    provider_name = os.getenv("LLM_PROVIDER", "groq").lower()
+    if provider_name != "groq":
+        raise ValueError(f"Unknown LLM_PROVIDER: {provider_name}")
+    inner = GroqProvider(
+        api_key=os.getenv("GROQ_API_KEY"),
+        base_url=os.getenv("GROQ_BASE_URL") or None,
+        timeout=float(os.getenv("GROQ_TIMEOUT_SECONDS", "30")),
+        max_retries=0, # retries are done by the resilience layer
+    )
+    return resilient_provider_from_env(inner)
+
+
+def get_provider():
+    """Process-wide LLM provider, created from the environment on first use."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = provider_from_env()
+                if not _provider.is_available():
+                    print("Warning: GROQ_API_KEY not found in .env file. AI features will be disabled.")
+    return _provider
+
+
+def set_provider(provider):
+    """Replaces the process-wide provider (benchmarks, local stubs, alternative backends)."""
+    global _provider
+    with _provider_lock:
+        _provider = provider
@@ -0,0 +1,304 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from utils.llm_providers import LLMProvider, LLMProviderError, RateLimitedError
+
+DEFAULT_DEADLINE_SECONDS = 30.0
+DEFAULT_MAX_RETRIES = 2
+DEFAULT_BREAKER_FAILURES = 5
+DEFAULT_BREAKER_RESET_SECONDS = 30.0
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+MIN_SAMPLES_FOR_P95 = 20
+
+# Attempts run here so a slow one can be abandoned at the deadline (the SDK timeout ends it later)
+# or raced against a hedged duplicate.
+_attempt_executor = ThreadPoolExecutor(max_workers=int(os.getenv("AI_ATTEMPT_WORKERS", "16")), thread_name_prefix="llm-attempt")
+
+
+class CircuitOpenError(LLMProviderError):
+    """The circuit breaker is open: the upstream failed repeatedly and is not called for now."""
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failed attempts and rejects calls for reset_seconds;
+    then lets a single trial call through (half-open), closing again on its success.
+    """
+
+    def __init__(self, failure_threshold=DEFAULT_BREAKER_FAILURES, reset_seconds=DEFAULT_BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half-open" if time.monotonic() - self._opened_at >= self.reset_seconds else "open"
+
+    def allow(self):
+        """True if a call may go upstream now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial_in_progress:
+                return False
+            self._trial_in_progress = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_progress or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_progress = False
+
+    def release(self):
+        """Ends a call that neither succeeded nor failed (e.g. rate limited): frees the half-open trial, counts nothing."""
+        with self._lock:
+            self._trial_in_progress = False
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies."""
+
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct):
+        """Latency at pct (0-100), or None with fewer than MIN_SAMPLES_FOR_P95 samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < MIN_SAMPLES_FOR_P95:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def _close(chunks):
+    close = getattr(chunks, "close", None)
+    if close is not None:
+        try:
+            close()
+        except Exception as e:
+            print(f"Error closing an abandoned LLM stream: {e}")
+
+
+def _discard_when_done(future, discard):
+    """Hands the result of an abandoned attempt to discard (e.g. to close its stream) once it arrives."""
+    def _callback(done_future):
+        if not done_future.cancelled() and done_future.exception() is None:
+            discard(done_future.result())
+
+    future.cancel() # not started yet: never runs
+    future.add_done_callback(_callback)
+
+
+class ResilientProvider(LLMProvider):
+    """
+    Wraps a provider with an overall deadline per call, retries with jittered backoff, optional
+    hedging and a circuit breaker. Every failure surfaces as LLMProviderError (CircuitOpenError
+    while the breaker is open), so callers can fall back quickly.
+
+    Hedging: when an attempt has not answered after hedge_after_seconds (default: the p95 of recent
+    successful calls), an identical second request is raced against it and the first answer wins.
+    Streams are retried and hedged only until their first chunk arrives; the rest of the stream is
+    still bounded by the deadline. Streams of abandoned attempts and losing hedges are closed.
+
+    A 429 (RateLimitedError) is retried but does not count towards the circuit breaker: a batch
+    hitting its rate limit says nothing about the health of the upstream.
+    """
+
+    def __init__(self, inner, deadline_seconds=DEFAULT_DEADLINE_SECONDS, max_retries=DEFAULT_MAX_RETRIES,
+                 hedge=False, hedge_after_seconds=None, breaker=None):
+        self.inner = inner
+        self.name = inner.name
+        self.deadline_seconds = deadline_seconds
+        self.max_retries = max_retries
+        self.hedge = hedge
+        self.hedge_after_seconds = hedge_after_seconds
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self._counters = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "timeouts": 0, "rejected": 0}
+        self._counters_lock = threading.Lock()
+
+    def _count(self, counter):
+        with self._counters_lock:
+            self._counters[counter] += 1
+
+    def is_available(self):
+        return self.inner.is_available()
+
+    def _hedge_after(self):
+        if not self.hedge:
+            return None
+        return self.hedge_after_seconds if self.hedge_after_seconds is not None else self.latency.percentile(95)
+
+    def _attempt(self, call, time_left, discard=None):
+        """
+        One attempt (plus at most one hedge) bounded by time_left seconds. discard(result) is called
+        with the result of every attempt that is not returned, whenever it arrives.
+        """
+        started = time.monotonic()
+        primary = _attempt_executor.submit(call)
+        pending = {primary}
+        hedge_after = self._hedge_after()
+        hedged = False
+        error = None
+        while pending:
+            elapsed = time.monotonic() - started
+            timeout = time_left - elapsed
+            if not hedged and hedge_after is not None and hedge_after < time_left:
+                timeout = min(timeout, hedge_after - elapsed)
+            done, pending = wait(pending, timeout=max(timeout, 0), return_when=FIRST_COMPLETED)
+            winner = None
+            for future in done:
+                try:
+                    future.result()
+                except LLMProviderError as e:
+                    error = e
+                    continue
+                except Exception as e:
+                    error = LLMProviderError(str(e))
+                    continue
+                if winner is None:
+                    winner = future
+                elif discard is not None:
+                    discard(future.result()) # both answered at once
+            if winner is not None:
+                self.latency.record(time.monotonic() - started)
+                if winner is not primary:
+                    self._count("hedge_wins")
+                if discard is not None:
+                    for future in pending:
+                        _discard_when_done(future, discard)
+                return winner.result()
+            elapsed = time.monotonic() - started
+            if pending and not hedged and hedge_after is not None and elapsed >= hedge_after and elapsed < time_left:
+                pending.add(_attempt_executor.submit(call))
+                hedged = True
+                self._count("hedges")
+            elif pending and elapsed >= time_left:
+                self._count("timeouts")
+                if discard is not None:
+                    for future in pending:
+                        _discard_when_done(future, discard)
+                raise LLMProviderError(f"LLM call timed out after {elapsed:.1f}s")
+        raise error
+
+    def _record_error(self, error):
+        if isinstance(error, RateLimitedError):
+            self.breaker.release()
+        else:
+            self.breaker.record_failure()
+
+    def _call(self, call, max_retries, deadline=None, discard=None):
+        self._count("calls")
+        if deadline is None:
+            deadline = time.monotonic() + self.deadline_seconds
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self._count("rejected")
+                raise CircuitOpenError("LLM circuit breaker is open after repeated failures; skipping the call.")
+            try:
+                result = self._attempt(call, deadline - time.monotonic(), discard)
+            except LLMProviderError as e:
+                self._record_error(e)
+                attempt += 1
+                retry_after = e.retry_after if isinstance(e, RateLimitedError) else None
+                delay = retry_after or random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+                if attempt > max_retries or time.monotonic() + delay >= deadline:
+                    raise
+                self._count("retries")
+                time.sleep(delay)
+                continue
+            self.breaker.record_success()
+            return result
+
+    def complete(self, messages, model, temperature, max_tokens, **kwargs):
+        max_retries = kwargs.pop("max_retries", self.max_retries)
+        return self._call(lambda: self.inner.complete(messages, model, temperature, max_tokens, max_retries=0, **kwargs),
+                          max_retries)
+
+    def stream(self, messages, model, temperature, max_tokens, **kwargs):
+        max_retries = kwargs.pop("max_retries", self.max_retries)
+        deadline = time.monotonic() + self.deadline_seconds
+
+        def _open_stream():
+            chunks = iter(self.inner.stream(messages, model, temperature, max_tokens, max_retries=0, **kwargs))
+            return chunks, next(chunks, None)
+
+        chunks, first_chunk = self._call(_open_stream, max_retries, deadline, discard=lambda opened: _close(opened[0]))
+        try:
+            if first_chunk is None:
+                return
+            yield first_chunk
+            while True:
+                # Each read runs on the attempt executor, so a stalled stream is cut off at the deadline.
+                read = _attempt_executor.submit(next, chunks, None)
+                done, _ = wait([read], timeout=max(deadline - time.monotonic(), 0))
+                if not done:
+                    self._count("timeouts")
+                    self.breaker.record_failure()
+                    # The read is still running and owns the iterator; close it once the read returns.
+                    read.add_done_callback(lambda _, stalled=chunks: _close(stalled))
+                    chunks = None
+                    raise LLMProviderError(f"LLM stream did not finish within {self.deadline_seconds:g}s")
+                try:
+                    chunk = read.result()
+                except LLMProviderError as e:
+                    self._record_error(e)
+                    raise
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            if chunks is not None:
+                _close(chunks)
+
+    def stats(self):
+        with self._counters_lock:
+            stats = dict(self._counters)
+        stats["breaker"] = self.breaker.state
+        stats["p95_seconds"] = self.latency.percentile(95)
+        return stats
+
+
+def resilient_provider_from_env(inner):
+    """
+    Wraps inner in a ResilientProvider configured from the environment: AI_DEADLINE_SECONDS,
+    AI_MAX_RETRIES, AI_HEDGE_ENABLED, AI_HEDGE_AFTER_SECONDS (default: rolling p95),
+    AI_BREAKER_FAILURES and AI_BREAKER_RESET_SECONDS.
+    """
+    hedge_after = os.getenv("AI_HEDGE_AFTER_SECONDS")
+    return ResilientProvider(
+        inner,
+        deadline_seconds=float(os.getenv("AI_DEADLINE_SECONDS", DEFAULT_DEADLINE_SECONDS)),
+        max_retries=int(os.getenv("AI_MAX_RETRIES", DEFAULT_MAX_RETRIES)),
+        hedge=os.getenv("AI_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes"),
+        hedge_after_seconds=float(hedge_after) if hedge_after else None,
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv("AI_BREAKER_FAILURES", DEFAULT_BREAKER_FAILURES)),
+            reset_seconds=float(os.getenv("AI_BREAKER_RESET_SECONDS", DEFAULT_BREAKER_RESET_SECONDS)),
+        ),
+    )
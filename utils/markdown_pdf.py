@@ -0,0 +1,202 @@
+import re
+from html import escape
+
+# One pass over the lines: each line is classified once by BLOCK_RE, and inline markup is
+# rewritten by a single INLINE_RE scan whose patterns cannot backtrack past their own delimiters,
+# so the cost is linear in the length of the text.
+BLOCK_RE = re.compile(
+    r"(?P<fence>^\s*(?:```|~~~))"
+    r"|(?P<heading>^\s{0,3}(?P<hashes>#{1,6})\s+(?P<heading_text>.*?)\s*#*\s*$)"
+    r"|(?P<rule>^\s{0,3}(?:-{3,}|\*{3,}|_{3,}|={3,})\s*$)"
+    r"|(?P<item>^(?P<indent>\s*)(?:(?P<bullet>[*+-])|(?P<number>\d{1,9})[.)])\s+(?P<item_text>.*)$)"
+    r"|(?P<blank>^\s*$)"
+)
+INLINE_RE = re.compile(
+    r"\*\*(?P<bold>[^*\n]+)\*\*"
+    r"|__(?P<bold_u>[^_\n]+)__"
+    r"|`(?P<code>[^`\n]+)`"
+    r"|(?<![\w*])\*(?P<italic>[^*\s][^*\n]*?)\*(?![\w*])"
+    r"|(?<!\w)_(?P<italic_u>[^_\s][^_\n]*?)_(?!\w)"
+)
+WHOLE_LINE_BOLD_RE = re.compile(r"^\s*(?:\*\*[^*\n]+\*\*|__[^_\n]+__)\s*$")
+HEADING_STYLES = {1: "MdHeading1", 2: "MdHeading1", 3: "MdHeading2"} # deeper levels use MdHeading3
+
+
+def inline_markup(text):
+    """
+    Markdown inline syntax (bold, italic, code) of one line as reportlab paragraph markup.
+
+    Text between the matches is HTML-escaped, so the result is always valid markup.
+    """
+    parts = []
+    position = 0
+    for match in INLINE_RE.finditer(text):
+        parts.append(escape(text[position:match.start()], quote=False))
+        kind = match.lastgroup
+        inner = escape(match.group(kind), quote=False)
+        if kind in ("bold", "bold_u"):
+            parts.append(f"<b>{inner}</b>")
+        elif kind == "code":
+            parts.append(f'<font name="Courier">{inner}</font>')
+        else:
+            parts.append(f"<i>{inner}</i>")
+        position = match.end()
+    parts.append(escape(text[position:], quote=False))
+    return "".join(parts)
+
+
+def markdown_styles(stylesheet):
+    """
+    Adds the paragraph styles markdown_to_flowables uses to a reportlab stylesheet (once).
+
+    Args:
+        stylesheet: A getSampleStyleSheet() result.
+
+    Returns:
+        The same stylesheet.
+    """
+    from reportlab.lib.styles import ParagraphStyle
+
+    if "MdBody" in stylesheet:
+        return stylesheet
+    stylesheet.add(ParagraphStyle(name="MdBody", parent=stylesheet["Normal"], spaceAfter=4))
+    stylesheet.add(ParagraphStyle(name="MdListItem", parent=stylesheet["Normal"], spaceAfter=2))
+    # Headings stay on the page of the text that follows them.
+    stylesheet.add(ParagraphStyle(name="MdHeading1", parent=stylesheet["h2"], keepWithNext=1))
+    stylesheet.add(ParagraphStyle(name="MdHeading2", parent=stylesheet["h3"], keepWithNext=1))
+    stylesheet.add(ParagraphStyle(name="MdHeading3", parent=stylesheet["h4"], keepWithNext=1))
+    stylesheet.add(ParagraphStyle(name="MdSubheading", parent=stylesheet["Normal"], spaceBefore=8, spaceAfter=4,
+                                  keepWithNext=1))
+    stylesheet.add(ParagraphStyle(name="MdCode", parent=stylesheet["Code"], fontSize=8, leading=9.5,
+                                  spaceBefore=4, spaceAfter=6))
+    return stylesheet
+
+
+class _Converter:
+    """State of one markdown_to_flowables pass."""
+
+    def __init__(self, stylesheet):
+        from reportlab.platypus import HRFlowable, ListFlowable, ListItem, Paragraph, Preformatted
+
+        self.HRFlowable, self.ListFlowable, self.ListItem = HRFlowable, ListFlowable, ListItem
+        self.Paragraph, self.Preformatted = Paragraph, Preformatted
+        self.styles = stylesheet
+        self.flowables = []
+        self.paragraph_lines = []
+        self.code_lines = None # list while inside a fenced code block
+        self.lists = [] # open lists, outermost first: [indent, ordered, start, items]; items are flowable lists
+
+    def paragraph(self, markup, style_name, source_text):
+        try:
+            return self.Paragraph(markup, self.styles[style_name])
+        except ValueError as e: # malformed markup: keep the text, lose the formatting of this block only
+            print(f"Markdown PDF: falling back to plain text for a block ({e}).")
+            return self.Preformatted(source_text, self.styles["MdCode"])
+
+    def flush_paragraph(self):
+        if not self.paragraph_lines:
+            return
+        lines, self.paragraph_lines = self.paragraph_lines, []
+        if len(lines) == 1 and WHOLE_LINE_BOLD_RE.match(lines[0]):
+            style_name = "MdSubheading"
+        else:
+            style_name = "MdBody"
+        markup = "<br/>".join(inline_markup(line.strip()) for line in lines)
+        self.emit(self.paragraph(markup, style_name, "\n".join(lines)))
+
+    def emit(self, flowable):
+        if self.lists:
+            self.lists[-1][3][-1].append(flowable) # belongs to the current list item
+        else:
+            self.flowables.append(flowable)
+
+    def close_lists(self, indent=-1):
+        """Closes the open lists nested deeper than indent, attaching each to its parent item."""
+        while self.lists and self.lists[-1][0] > indent:
+            list_indent, ordered, start, items = self.lists.pop()
+            if ordered:
+                list_flowable = self.ListFlowable([self.ListItem(item, value=start + i) for i, item in enumerate(items)],
+                                                  bulletType="1", start=start, bulletFormat="%s.", leftIndent=16,
+                                                  bulletFontSize=self.styles["MdListItem"].fontSize)
+            else:
+                list_flowable = self.ListFlowable([self.ListItem(item) for item in items],
+                                                  bulletType="bullet", start="•", leftIndent=14, bulletFontSize=8)
+            self.emit(list_flowable)
+
+    def list_item(self, indent, ordered, number, text):
+        self.flush_paragraph()
+        self.close_lists(indent)
+        if self.lists and self.lists[-1][0] == indent and self.lists[-1][1] != ordered:
+            self.close_lists(indent - 1) # a bullet list directly followed by a numbered one, or vice versa
+        if not self.lists or self.lists[-1][0] < indent:
+            self.lists.append([indent, ordered, int(number) if ordered else 1, []])
+        self.lists[-1][3].append([self.paragraph(inline_markup(text), "MdListItem", text)])
+
+    def feed(self, line):
+        if self.code_lines is not None:
+            if line.lstrip().startswith(("```", "~~~")):
+                self.emit(self.Preformatted("\n".join(self.code_lines), self.styles["MdCode"]))
+                self.code_lines = None
+            else:
+                self.code_lines.append(line)
+            return
+
+        match = BLOCK_RE.match(line.expandtabs(4))
+        kind = match.lastgroup if match else None
+        if kind in ("hashes", "heading_text"):
+            kind = "heading"
+        elif kind in ("indent", "bullet", "number", "item_text"):
+            kind = "item"
+
+        if kind == "item":
+            self.list_item(len(match.group("indent")), match.group("number") is not None,
+                           match.group("number"), match.group("item_text"))
+        elif kind == "blank":
+            self.flush_paragraph()
+        elif self.lists and line[:1].isspace() and not self.paragraph_lines and kind is None:
+            # Indented continuation of the current list item.
+            item = self.lists[-1][3][-1]
+            item.append(self.paragraph(inline_markup(line.strip()), "MdListItem", line.strip()))
+        else:
+            self.flush_paragraph()
+            self.close_lists()
+            if kind == "fence":
+                self.code_lines = []
+            elif kind == "heading":
+                style_name = HEADING_STYLES.get(len(match.group("hashes")), "MdHeading3")
+                text = match.group("heading_text")
+                self.flowables.append(self.paragraph(inline_markup(text), style_name, text))
+            elif kind == "rule":
+                self.flowables.append(self.HRFlowable(width="100%", thickness=0.5, spaceBefore=4, spaceAfter=4))
+            else:
+                self.paragraph_lines.append(line)
+
+    def finish(self):
+        if self.code_lines is not None: # unterminated fence
+            self.emit(self.Preformatted("\n".join(self.code_lines), self.styles["MdCode"]))
+            self.code_lines = None
+        self.flush_paragraph()
+        self.close_lists()
+        return self.flowables
+
+
+def markdown_to_flowables(text, stylesheet):
+    """
+    Converts Markdown (as written by the LLM) into reportlab flowables in a single pass.
+
+    Supports ATX headings, paragraphs (line breaks kept), whole-line bold sub-headings, nested
+    bullet and numbered lists, fenced code blocks, horizontal rules, and inline bold, italic and
+    code. Every block becomes its own flowable, so long texts flow across pages, and headings are
+    kept with the text that follows them.
+
+    Args:
+        text (str): Markdown text.
+        stylesheet: A getSampleStyleSheet() result; the Md* styles are added to it if missing.
+
+    Returns:
+        list: Flowables to append to a story.
+    """
+    converter = _Converter(markdown_styles(stylesheet))
+    for line in (text or "").splitlines():
+        converter.feed(line)
+    return converter.finish()
@@ -0,0 +1,188 @@
+import hashlib
+from io import BytesIO
+
+
+class PdfStreamWriter:
+    """
+    Concatenates PDF files into one, writing the pages of each file to disk as it is appended.
+
+    pypdf's PdfWriter keeps every copied object in memory until the document is written; this
+    writer renumbers and writes each object immediately and only keeps object offsets, page
+    numbers and bookmarks, so memory stays flat however many files are merged. Objects without
+    references that repeat across files (fonts, encodings) are written once. Only the pages and
+    what they reference are copied; document-level features of the inputs (outlines, named
+    destinations, forms) are not.
+
+    Usage:
+        with PdfStreamWriter(path) as writer:
+            writer.append(section_path, title="1. Project")
+    """
+
+    def __init__(self, path, title=None):
+        self.path = path
+        self.title = title
+        self._file = open(path, "wb")
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._offsets = [None] # object number -> byte offset; object 0 is the free list head
+        self._pages_number = self._reserve()
+        self._page_numbers = []
+        self._bookmarks = [] # (title, object number of the first page)
+        self._shared = {} # digest of a serialized reference-free object -> object number
+
+    def _reserve(self):
+        self._offsets.append(None)
+        return len(self._offsets) - 1
+
+    def _write_object(self, number, obj):
+        self._offsets[number] = self._file.tell()
+        self._file.write(f"{number} 0 obj\n".encode())
+        obj.write_to_stream(self._file)
+        self._file.write(b"\nendobj\n")
+
+    def _copy(self, obj, mapping):
+        """Copy of a direct object with its references renumbered; referenced objects are written first."""
+        from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, IndirectObject, StreamObject
+
+        if isinstance(obj, IndirectObject):
+            return IndirectObject(self._copy_indirect(obj, mapping), 0, None)
+        if isinstance(obj, StreamObject):
+            copy = DecodedStreamObject()
+            # The raw (still encoded) bytes, so nothing is decoded and re-encoded; /Filter is copied with the
+            # dictionary. pypdf has no public accessor for them, hence the version range in requirements.txt.
+            copy.set_data(obj._data)
+        elif isinstance(obj, DictionaryObject):
+            copy = DictionaryObject()
+        elif isinstance(obj, ArrayObject):
+            return ArrayObject(self._copy(item, mapping) for item in obj)
+        else:
+            return obj # names, numbers, strings, booleans and null are immutable
+        for key, value in obj.items():
+            copy[key] = self._copy(value, mapping)
+        return copy
+
+    def _copy_indirect(self, reference, mapping):
+        from pypdf.generic import StreamObject
+
+        if reference.idnum in mapping:
+            return mapping[reference.idnum]
+        target = reference.get_object()
+        if not isinstance(target, StreamObject) and not _has_references(target):
+            serialized = BytesIO()
+            target.write_to_stream(serialized)
+            key = hashlib.sha256(serialized.getvalue()).digest()
+            number = self._shared.get(key)
+            if number is None:
+                number = self._shared[key] = self._reserve()
+                self._write_object(number, target)
+            mapping[reference.idnum] = number
+            return number
+        number = mapping[reference.idnum] = self._reserve() # before copying, so cycles resolve to it
+        self._write_object(number, self._copy(target, mapping))
+        return number
+
+    def append(self, path, title=None):
+        """
+        Appends all pages of a PDF file.
+
+        Args:
+            path (str): PDF file.
+            title (str, optional): Bookmark pointing to the first appended page.
+
+        Returns:
+            int: Number of pages appended.
+        """
+        from pypdf import PdfReader
+        from pypdf.generic import DictionaryObject, IndirectObject, NameObject
+
+        reader = PdfReader(path)
+        pages = reader.pages
+        mapping = {} # object number in this file -> object number in the output
+        # Pages get their numbers first, so links between pages resolve to the copied pages.
+        for page in pages:
+            mapping[page.indirect_reference.idnum] = self._reserve()
+        for page in pages:
+            number = mapping[page.indirect_reference.idnum]
+            copy = DictionaryObject()
+            for key, value in page.items():
+                if key != "/Parent":
+                    copy[key] = self._copy(value, mapping)
+            copy[NameObject("/Parent")] = IndirectObject(self._pages_number, 0, None)
+            self._write_object(number, copy)
+            self._page_numbers.append(number)
+        if title and len(pages):
+            self._bookmarks.append((title, mapping[pages[0].indirect_reference.idnum]))
+        return len(pages)
+
+    def close(self):
+        """Writes the page tree, bookmarks, catalog and cross-reference table, and closes the file."""
+        from pypdf.generic import (ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject,
+                                   create_string_object)
+
+        if self._file.closed:
+            return
+
+        def _ref(number):
+            return IndirectObject(number, 0, None)
+
+        self._write_object(self._pages_number, DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(_ref(number) for number in self._page_numbers),
+            NameObject("/Count"): NumberObject(len(self._page_numbers)),
+        }))
+        catalog = DictionaryObject({NameObject("/Type"): NameObject("/Catalog"),
+                                    NameObject("/Pages"): _ref(self._pages_number)})
+        if self._bookmarks:
+            outlines_number = self._reserve()
+            item_numbers = [self._reserve() for _ in self._bookmarks]
+            for i, (title, page_number) in enumerate(self._bookmarks):
+                item = DictionaryObject({
+                    NameObject("/Title"): create_string_object(title),
+                    NameObject("/Parent"): _ref(outlines_number),
+                    NameObject("/Dest"): ArrayObject([_ref(page_number), NameObject("/Fit")]),
+                })
+                if i > 0:
+                    item[NameObject("/Prev")] = _ref(item_numbers[i - 1])
+                if i < len(item_numbers) - 1:
+                    item[NameObject("/Next")] = _ref(item_numbers[i + 1])
+                self._write_object(item_numbers[i], item)
+            self._write_object(outlines_number, DictionaryObject({
+                NameObject("/Type"): NameObject("/Outlines"),
+                NameObject("/First"): _ref(item_numbers[0]),
+                NameObject("/Last"): _ref(item_numbers[-1]),
+                NameObject("/Count"): NumberObject(len(item_numbers)),
+            }))
+            catalog[NameObject("/Outlines")] = _ref(outlines_number)
+            catalog[NameObject("/PageMode")] = NameObject("/UseOutlines")
+        catalog_number = self._reserve()
+        self._write_object(catalog_number, catalog)
+        info = DictionaryObject({NameObject("/Producer"): create_string_object("Project Cost Estimator")})
+        if self.title:
+            info[NameObject("/Title")] = create_string_object(self.title)
+        info_number = self._reserve()
+        self._write_object(info_number, info)
+
+        xref_offset = self._file.tell()
+        lines = [f"xref\n0 {len(self._offsets)}\n", "0000000000 65535 f \n"]
+        lines.extend(f"{offset:010d} 00000 n \n" for offset in self._offsets[1:])
+        lines.append(f"trailer\n<< /Size {len(self._offsets)} /Root {catalog_number} 0 R /Info {info_number} 0 R >>\n")
+        lines.append(f"startxref\n{xref_offset}\n%%EOF\n")
+        self._file.write("".join(lines).encode())
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _has_references(obj):
+    from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject
+
+    if isinstance(obj, IndirectObject):
+        return True
+    if isinstance(obj, DictionaryObject):
+        return any(_has_references(value) for value in obj.values())
+    if isinstance(obj, ArrayObject):
+        return any(_has_references(item) for item in obj)
+    return False
@@ -0,0 +1,285 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from utils.cocomo import calculate_cocomo_batch, calculate_cost_batch, team_monthly_cost
+from utils.cocomo_models import (COCOMO2_EFFORT_MULTIPLIERS, COCOMO2_SCALE_FACTORS, INTERMEDIATE_COST_DRIVERS,
+                                 calculate_cocomo2_batch, calculate_intermediate_cocomo_batch)
+
+DEFAULT_CHUNK_SIZE = 5_000
+DEFAULT_MODE = "semi-detached"
+DEFAULT_CONTINGENCY = 10
+# Estimation models for price_chunk; the richer ones read their ratings from columns named after the drivers.
+MODELS = ("basic", "intermediate", "cocomo2")
+DEFAULT_MODEL = "basic"
+RESULT_COLUMNS = ["effort_pm", "duration_m", "subtotal", "total_with_contingency", "valid"]
+# Parquet output types of the columns whose type read_csv infers per chunk (an all-empty chunk reads as
+# float, whole numbers as int); other columns keep the type of the first chunk.
+TEXT_COLUMNS = ("name", "mode", "roles")
+NUMBER_COLUMNS = ("kloc", "contingency", "monthly_team_cost", "effort_pm", "duration_m", "subtotal",
+                  "total_with_contingency")
+
+
+def _file_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".parquet", ".pq"):
+        return "parquet"
+    if extension == ".xlsx":
+        return "xlsx"
+    raise ValueError(f"Unsupported file type '{extension}'. Use .csv, .parquet or (output only) .xlsx.")
+
+
+def read_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields the rows of a CSV or Parquet file as DataFrames of at most chunk_size rows.
+    """
+    file_format = _file_format(path)
+    if file_format == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    elif file_format == "xlsx":
+        raise ValueError("Excel files are only supported as output. Use .csv or .parquet input.")
+    else:
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+
+@lru_cache(maxsize=1024)
+def _parse_roles(roles_json):
+    try:
+        roles = json.loads(roles_json)
+    except ValueError:
+        return ()
+    return tuple(role for role in roles if isinstance(role, dict)) if isinstance(roles, list) else ()
+
+
+class ChunkWriter:
+    """
+    Appends result chunks to a CSV, Parquet or Excel file as they arrive.
+
+    Excel output is streamed (utils.xlsx_stream): results go to a "Portfolio" sheet and, when the
+    input has a 'roles' column, the team goes to a "Team" sheet with one row per role instead of
+    as JSON in a cell; both start with the 1-based row number of the project.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = _file_format(path)
+        self._csv_file = None
+        self._parquet_writer = None
+        self._xlsx_writer = None
+        self._rows_written = 0
+
+    def _write_xlsx(self, df):
+        from utils.xlsx_stream import XlsxStreamWriter
+
+        has_roles = "roles" in df.columns
+        columns = [column for column in df.columns if column != "roles"]
+        if self._xlsx_writer is None:
+            self._xlsx_writer = XlsxStreamWriter(self.path)
+            self._xlsx_writer.add_sheet("Portfolio", ["row", *columns])
+            if has_roles:
+                self._xlsx_writer.add_sheet("Team", ["row", "role_name", "count", "rate_ph"])
+        roles = df["roles"].tolist() if has_roles else None
+        for offset, values in enumerate(df[columns].itertuples(index=False, name=None)):
+            row_number = self._rows_written + offset + 1
+            self._xlsx_writer.append("Portfolio", (row_number, *values))
+            if has_roles and isinstance(roles[offset], str):
+                for role in _parse_roles(roles[offset]):
+                    self._xlsx_writer.append("Team", (row_number, role.get("role_name"), role.get("count"),
+                                                      role.get("rate_ph")))
+        self._rows_written += len(df)
+
+    def write(self, df):
+        if self.format == "xlsx":
+            self._write_xlsx(df)
+        elif self.format == "csv":
+            if self._csv_file is None:
+                self._csv_file = open(self.path, "w", newline="", encoding="utf-8")
+                df.to_csv(self._csv_file, index=False)
+            else:
+                df.to_csv(self._csv_file, index=False, header=False)
+        else:
+            import pyarrow.parquet as pq
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, _parquet_schema(df))
+            self._parquet_writer.write_table(_parquet_table(df, self._parquet_writer.schema))
+
+    def close(self):
+        if self._csv_file is not None:
+            self._csv_file.close()
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+        if self._xlsx_writer is not None:
+            self._xlsx_writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _parquet_schema(df):
+    """
+    The Parquet schema of a run, from its first chunk. TEXT_COLUMNS and columns that are empty in the
+    first chunk are strings, NUMBER_COLUMNS are doubles, so later chunks fit whatever read_csv
+    infers for them.
+    """
+    import pyarrow as pa
+
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    fields = []
+    for field in schema:
+        if field.name in NUMBER_COLUMNS:
+            field = field.with_type(pa.float64())
+        elif field.name in TEXT_COLUMNS or pa.types.is_null(field.type) or df[field.name].isna().all():
+            field = field.with_type(pa.string())
+        fields.append(field)
+    return pa.schema(fields)
+
+
+def _parquet_table(df, schema):
+    import pyarrow as pa
+
+    columns = {}
+    for field in schema:
+        values = df[field.name]
+        if pa.types.is_string(field.type):
+            values = values.astype(object).where(values.notna(), None)
+            values = values.map(lambda value: value if value is None or isinstance(value, str) else str(value))
+        elif pa.types.is_floating(field.type):
+            values = pd.to_numeric(values, errors="coerce").astype(float)
+        columns[field.name] = values
+    return pa.Table.from_pandas(pd.DataFrame(columns), schema=schema, preserve_index=False)
+
+
+def _monthly_team_costs(df):
+    if "monthly_team_cost" in df.columns:
+        return pd.to_numeric(df["monthly_team_cost"], errors="coerce").to_numpy(dtype=float)
+    if "roles" not in df.columns:
+        raise ValueError("Input needs a 'roles' column (JSON list of {role_name, count, rate_ph}) or a 'monthly_team_cost' column.")
+    # Portfolios reuse a few team templates, so parse each distinct JSON string once.
+    roles = df["roles"].fillna("[]").astype(str)
+    costs = {}
+    for roles_json in roles.unique():
+        try:
+            costs[roles_json] = team_monthly_cost(json.loads(roles_json))
+        except (ValueError, TypeError, AttributeError):
+            costs[roles_json] = np.nan
+    return roles.map(costs).to_numpy(dtype=float)
+
+
+def _rating_columns(df, drivers):
+    """{driver: ratings} for the driver columns present in df; empty cells are nominal."""
+    columns = {}
+    for driver in drivers:
+        if driver in df.columns:
+            columns[driver] = df[driver].where(df[driver].notna(), "nominal").astype(str).to_numpy()
+    return columns or None
+
+
+def price_chunk(df, model=DEFAULT_MODEL):
+    """
+    Prices one chunk of portfolio rows; the batch equivalent of calculate_cocomo + calculate_cost.
+
+    Args:
+        df (pd.DataFrame): Rows with 'kloc', optional 'mode' and 'contingency', and the team as either
+                           'roles' (JSON list of role dicts) or 'monthly_team_cost'. For the
+                           "intermediate" model, optional columns named after INTERMEDIATE_COST_DRIVERS
+                           ('RELY', 'CPLX', ...); for "cocomo2", after COCOMO2_SCALE_FACTORS and
+                           COCOMO2_EFFORT_MULTIPLIERS. Ratings are level names ('high', 'VH', ...);
+                           missing columns and empty cells are nominal.
+        model (str): One of MODELS.
+
+    Returns:
+        pd.DataFrame: The input columns plus RESULT_COLUMNS. Rows with an invalid mode, KLOC, rating
+                      or team have valid=False and NaN results.
+    """
+    kloc = pd.to_numeric(df["kloc"], errors="coerce").to_numpy(dtype=float)
+    modes = df["mode"].fillna(DEFAULT_MODE).to_numpy(dtype=str) if "mode" in df.columns else DEFAULT_MODE
+    contingency = (pd.to_numeric(df["contingency"], errors="coerce").fillna(DEFAULT_CONTINGENCY).to_numpy(dtype=float)
+                   if "contingency" in df.columns else DEFAULT_CONTINGENCY)
+    monthly_cost = _monthly_team_costs(df)
+
+    if model == "basic":
+        effort_pm, duration_m, valid = calculate_cocomo_batch(kloc, modes)
+    elif model == "intermediate":
+        effort_pm, duration_m, valid = calculate_intermediate_cocomo_batch(
+            kloc, modes, _rating_columns(df, INTERMEDIATE_COST_DRIVERS))
+    elif model == "cocomo2":
+        effort_pm, duration_m, valid = calculate_cocomo2_batch(
+            kloc, _rating_columns(df, COCOMO2_SCALE_FACTORS), _rating_columns(df, COCOMO2_EFFORT_MULTIPLIERS))
+    else:
+        raise ValueError(f"Unknown model '{model}'. Use one of: {', '.join(MODELS)}.")
+    subtotal, total = calculate_cost_batch(monthly_cost, duration_m, contingency)
+    valid = valid & np.isfinite(monthly_cost)
+
+    result = df.copy()
+    result["effort_pm"] = effort_pm
+    result["duration_m"] = duration_m
+    result["subtotal"] = np.where(valid, np.round(subtotal, 2), np.nan)
+    result["total_with_contingency"] = np.where(valid, np.round(total, 2), np.nan)
+    result["valid"] = valid
+    return result
+
+
+def run_portfolio(input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, workers=None, progress=print,
+                  model=DEFAULT_MODEL):
+    """
+    Streams a portfolio file through price_chunk and writes the results incrementally.
+
+    At most two chunks per worker are in flight, so memory stays flat whatever the input size.
+    Output rows keep the input order.
+
+    Args:
+        input_path (str): .csv or .parquet input.
+        output_path (str): .csv, .parquet or .xlsx output (format may differ from the input).
+        chunk_size (int): Rows per chunk.
+        workers (int, optional): Worker processes; defaults to os.cpu_count(). 0 prices in-process.
+        progress (callable, optional): Called with a status line after each chunk.
+        model (str): Estimation model, one of MODELS (see price_chunk).
+
+    Returns:
+        dict: {"rows", "invalid_rows", "chunks", "seconds", "rows_per_sec"}.
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model '{model}'. Use one of: {', '.join(MODELS)}.")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    stats = {"rows": 0, "invalid_rows": 0, "chunks": 0}
+    start = time.perf_counter()
+
+    def _record(result_df, writer):
+        writer.write(result_df)
+        stats["rows"] += len(result_df)
+        stats["invalid_rows"] += int((~result_df["valid"]).sum())
+        stats["chunks"] += 1
+        if progress:
+            elapsed = time.perf_counter() - start
+            progress(f"{stats['rows']:,} rows priced ({stats['rows'] / elapsed:,.0f} rows/sec)")
+
+    with ChunkWriter(output_path) as writer:
+        if workers == 0:
+            for chunk in read_chunks(input_path, chunk_size):
+                _record(price_chunk(chunk, model), writer)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                in_flight = deque()
+                for chunk in read_chunks(input_path, chunk_size):
+                    in_flight.append(pool.submit(price_chunk, chunk, model))
+                    if len(in_flight) >= workers * 2:
+                        _record(in_flight.popleft().result(), writer)
+                while in_flight:
+                    _record(in_flight.popleft().result(), writer)
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["rows_per_sec"] = stats["rows"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    return stats
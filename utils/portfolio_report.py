@@ -0,0 +1,222 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from html import escape
+
+from utils.estimate import breakdown_dataframe
+from utils.export_utils import CURRENCY_SYMBOL, build_report, project_story, report_styles
+from utils.pdf_stream import PdfStreamWriter
+
+DEFAULT_TITLE = "Project Portfolio Report"
+SHARED_POOL_WORKERS = int(os.getenv("PORTFOLIO_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    # Import reportlab and build the shared styles once per worker, not once per section.
+    report_styles()
+
+
+def shared_render_pool():
+    """
+    Process pool for servers (api.py), created on first use and shared by every report request, so
+    concurrent requests queue for PORTFOLIO_PDF_WORKERS processes instead of each starting its own.
+    Workers are started by a forkserver (spawn where that is unavailable), not forked from the
+    multi-threaded server process.
+
+    Returns:
+        ProcessPoolExecutor: The shared pool; its size is SHARED_POOL_WORKERS.
+    """
+    global _shared_pool
+    if _shared_pool is None:
+        with _shared_pool_lock:
+            if _shared_pool is None:
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                _shared_pool = ProcessPoolExecutor(max_workers=SHARED_POOL_WORKERS, initializer=_init_worker,
+                                                   mp_context=multiprocessing.get_context(method))
+    return _shared_pool
+
+
+def render_section(index, estimate, path, report_title=DEFAULT_TITLE):
+    """
+    Renders one project of a portfolio report into its own PDF file.
+
+    Args:
+        index (int): Position of the project in the portfolio (0-based).
+        estimate (dict): project_inputs, cocomo_results, cost_summary and optionally ai_insights and
+                         ai_insights_structured, e.g. a utils.db.iter_estimates item.
+        path (str): PDF file to write.
+        report_title (str): Printed in the page footer.
+
+    Returns:
+        dict: The project's row of the portfolio summary, with the section's path and page count.
+    """
+    from reportlab.platypus import Paragraph, Spacer
+    from reportlab.lib.units import inch
+
+    styles = report_styles()
+    project_inputs = estimate["project_inputs"]
+    cocomo_results = estimate["cocomo_results"]
+    cost_summary = estimate["cost_summary"]
+    ai_insights = estimate.get("ai_insights") or "No AI insights generated."
+    name = project_inputs.get("name") or f"Project {index + 1}"
+
+    story = [Paragraph(f"{index + 1}. {escape(name)}", styles['h1']), Spacer(1, 0.2*inch)]
+    story.extend(project_story(project_inputs, cocomo_results, cost_summary,
+                               breakdown_dataframe(cost_summary.get("breakdown_details", {})),
+                               ai_insights, estimate.get("ai_insights_structured")))
+    footer = f"{report_title} - {index + 1}. {name}"
+
+    def _draw_footer(canvas, doc):
+        canvas.saveState()
+        canvas.setFont("Helvetica", 8)
+        canvas.drawCentredString(doc.pagesize[0] / 2, 0.5*inch, footer)
+        canvas.restoreState()
+
+    pages = build_report(path, story, ai_insights, on_page=_draw_footer)
+    return {
+        "index": index, "name": name, "path": path, "pages": pages,
+        "kloc": project_inputs.get("kloc"), "cocomo_mode": project_inputs.get("cocomo_mode"),
+        "duration_m": cocomo_results.get("duration_m"), "total_cost": cost_summary.get("total_with_contingency", 0),
+    }
+
+
+def _render_cover(path, title, sections, first_section_page):
+    from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+
+    styles = report_styles()
+    total_cost = sum(section["total_cost"] or 0 for section in sections)
+    story = [
+        Paragraph(datetime.now().strftime("%B %d, %Y"), styles['RightAlign']),
+        Spacer(1, 0.1*inch),
+        Paragraph(f"{escape(title)} (Amounts in {CURRENCY_SYMBOL})", styles['h1']),
+        Paragraph(f"{len(sections):,} projects, total cost (with contingency) {CURRENCY_SYMBOL}{total_cost:,.2f}",
+                  styles['Normal']),
+        Spacer(1, 0.2*inch),
+    ]
+    rows = [["#", "Project", "KLOC", "Mode", "Months", f"Total Cost ({CURRENCY_SYMBOL})", "Page"]]
+    page = first_section_page
+    for section in sections:
+        rows.append([str(section["index"] + 1), Paragraph(escape(section["name"]), styles['Normal']),
+                     str(section["kloc"]), str(section["cocomo_mode"] or "").capitalize(), str(section["duration_m"]),
+                     f"{CURRENCY_SYMBOL}{section['total_cost'] or 0:,.2f}", str(page)])
+        page += section["pages"]
+    table = Table(rows, colWidths=[0.4*inch, 2.2*inch, 0.6*inch, 0.9*inch, 0.6*inch, 1.3*inch, 0.5*inch],
+                  repeatRows=1, hAlign='LEFT')
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.grey),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,-1), 8),
+        ('GRID', (0,0), (-1,-1), 0.5, colors.grey),
+        ('ALIGN', (5,1), (-1,-1), 'RIGHT'),
+        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+    ]))
+    story.append(table)
+    return build_report(path, story)
+
+
+def _write_cover(path, title, sections):
+    # The table of contents needs the cover's own page count; it only changes with the number of rows.
+    cover_pages = 1
+    while True:
+        pages = _render_cover(path, title, sections, cover_pages + 1)
+        if pages == cover_pages:
+            return pages
+        cover_pages = pages
+
+
+def _merge(cover_path, sections, output_path, title):
+    partial_path = output_path + ".part"
+    try:
+        with PdfStreamWriter(partial_path, title=title) as writer:
+            writer.append(cover_path, title="Portfolio summary")
+            for section in sections:
+                writer.append(section["path"], title=f"{section['index'] + 1}. {section['name']}")
+    except Exception:
+        os.remove(partial_path)
+        raise
+    os.replace(partial_path, output_path)
+
+
+def _render_in_pool(pool, jobs, workers, record):
+    in_flight = deque()
+    try:
+        for job in jobs:
+            in_flight.append(pool.submit(render_section, *job))
+            if len(in_flight) >= workers * 2:
+                record(in_flight.popleft().result())
+        while in_flight:
+            record(in_flight.popleft().result())
+    finally:
+        for future in in_flight: # a failed section stops the report; a shared pool need not render the rest
+            future.cancel()
+
+
+def build_portfolio_pdf(estimates, output_path, title=DEFAULT_TITLE, workers=None, progress=print, pool=None):
+    """
+    Writes one PDF report for many projects: a cover with the portfolio summary and a table of
+    contents, then one section per project (the single-project report body), with a bookmark each.
+
+    Sections are rendered in a process pool, at most two per worker in flight, each into its own
+    temporary file next to output_path; the parent only keeps one summary row per project and
+    finally streams the files into output_path one by one (utils.pdf_stream.PdfStreamWriter).
+    estimates is consumed lazily, so it can be a generator such as utils.db.iter_estimates(username).
+
+    Args:
+        estimates (iterable): Dicts with project_inputs, cocomo_results, cost_summary and optionally
+                              ai_insights and ai_insights_structured.
+        output_path (str): PDF file to write.
+        title (str): Report title.
+        workers (int, optional): Worker processes; defaults to os.cpu_count(). 0 renders in-process.
+        progress (callable, optional): Called with a status line after each section.
+        pool (ProcessPoolExecutor, optional): Existing pool to render in (e.g. shared_render_pool());
+                                              workers then only sets how many sections are in flight.
+
+    Returns:
+        dict: {"projects", "pages", "seconds", "projects_per_sec"}.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    start = time.perf_counter()
+    sections = []
+
+    def _record(section):
+        sections.append(section)
+        if progress:
+            elapsed = time.perf_counter() - start
+            progress(f"{len(sections):,} sections rendered ({len(sections) / elapsed:,.1f} projects/sec)")
+
+    work_dir = os.path.dirname(os.path.abspath(output_path))
+    with tempfile.TemporaryDirectory(prefix="portfolio-report-", dir=work_dir) as temp_dir:
+        jobs = ((index, estimate, os.path.join(temp_dir, f"section-{index:06d}.pdf"), title)
+                for index, estimate in enumerate(estimates))
+        if pool is not None:
+            _render_in_pool(pool, jobs, max(workers, 1), _record)
+        elif workers == 0:
+            for job in jobs:
+                _record(render_section(*job))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as own_pool:
+                _render_in_pool(own_pool, jobs, workers, _record)
+
+        cover_path = os.path.join(temp_dir, "cover.pdf")
+        cover_pages = _write_cover(cover_path, title, sections)
+        _merge(cover_path, sections, output_path, title)
+
+    seconds = time.perf_counter() - start
+    return {
+        "projects": len(sections),
+        "pages": cover_pages + sum(section["pages"] for section in sections),
+        "seconds": seconds,
+        "projects_per_sec": len(sections) / seconds if seconds > 0 else 0.0,
+    }
@@ -0,0 +1,178 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from utils.cocomo import COCOMO_MODES, HOURS_PER_MONTH_PERSON, calculate_cocomo_batch
+from utils.hashing import stable_hash
+
+DEFAULT_KLOC_DELTAS_PCT = (-20, -10, 0, 10, 20)
+DEFAULT_CONTINGENCY_LEVELS = (0, 5, 10, 15, 20, 25, 30)
+DEFAULT_COUNT_DELTAS = (-1, 1)
+DEFAULT_RATE_DELTAS_PCT = (-20, 20)
+BASELINE_VARIANT = "Baseline"
+
+_GRID_CACHE_SIZE = 32
+_grid_cache = OrderedDict()
+_grid_cache_lock = threading.Lock()
+
+
+def _team_variants(roles_info, count_deltas, rate_deltas_pct):
+    """
+    Builds the team axis of the grid: the baseline team plus one variant per role and delta.
+
+    Returns:
+        tuple: (labels, monthly_costs) where monthly_costs[v] is the team cost per month of variant v.
+    """
+    names = [role.get("role_name", "Unknown Role") for role in roles_info]
+    if len(set(names)) < len(names):
+        names = [f"{name} #{i + 1}" for i, name in enumerate(names)]
+    counts = np.array([max(int(role.get("count", 0)), 0) for role in roles_info], dtype=float)
+    rates = np.array([max(float(role.get("rate_ph", 0.0)), 0.0) for role in roles_info], dtype=float)
+
+    labels = [BASELINE_VARIANT]
+    count_rows = [counts]
+    rate_rows = [rates]
+    for i, name in enumerate(names):
+        for delta in count_deltas:
+            row = counts.copy()
+            row[i] = max(row[i] + delta, 0)
+            labels.append(f"{name} count {delta:+d}")
+            count_rows.append(row)
+            rate_rows.append(rates)
+        for delta in rate_deltas_pct:
+            row = rates.copy()
+            row[i] *= 1 + delta / 100
+            labels.append(f"{name} rate {delta:+g}%")
+            count_rows.append(counts)
+            rate_rows.append(row)
+
+    monthly_costs = (np.array(count_rows) * np.array(rate_rows)).sum(axis=1) * HOURS_PER_MONTH_PERSON
+    return labels, monthly_costs
+
+
+def _compute_grid(kloc, roles_info, kloc_deltas_pct, contingency_levels, count_deltas, rate_deltas_pct):
+    kloc_values = kloc * (1 + np.asarray(kloc_deltas_pct, dtype=float) / 100)
+    # Durations are rounded like calculate_cocomo so grid cells match what the page shows.
+    effort_pm, duration_m, _ = calculate_cocomo_batch(kloc_values[:, None], np.arange(len(COCOMO_MODES))[None, :])
+    variant_labels, monthly_costs = _team_variants(roles_info, count_deltas, rate_deltas_pct)
+    contingency_factor = 1 + np.asarray(contingency_levels, dtype=float) / 100
+
+    # (kloc, mode, contingency, team variant), one broadcast multiply for the whole grid.
+    subtotal = duration_m[:, :, None, None] * monthly_costs[None, None, None, :]
+    total_cost = subtotal * contingency_factor[None, None, :, None]
+
+    return {
+        "kloc_deltas_pct": tuple(kloc_deltas_pct),
+        "kloc_values": kloc_values,
+        "modes": COCOMO_MODES,
+        "contingency_levels": tuple(contingency_levels),
+        "variants": tuple(variant_labels),
+        "effort_pm": effort_pm,
+        "duration_m": duration_m,
+        "total_cost": total_cost,
+    }
+
+
+def compute_sensitivity_grid(kloc, roles_info, contingency_percentage=10,
+                             kloc_deltas_pct=DEFAULT_KLOC_DELTAS_PCT,
+                             contingency_levels=DEFAULT_CONTINGENCY_LEVELS,
+                             count_deltas=DEFAULT_COUNT_DELTAS,
+                             rate_deltas_pct=DEFAULT_RATE_DELTAS_PCT):
+    """
+    Evaluates total cost over KLOC deltas x COCOMO modes x contingency levels x team variants.
+
+    Grids are memoized by a hash of the inputs, so repeated calls with the same project (e.g. on
+    every Streamlit rerun while a slider moves) return the cached arrays.
+
+    Args:
+        kloc (float): Baseline KLOC.
+        roles_info (list of dicts): Baseline team, as for calculate_cost.
+        contingency_percentage (float): Baseline contingency; always included in the contingency axis.
+        kloc_deltas_pct (tuple): Percentage changes applied to kloc; 0 is always included.
+        contingency_levels (tuple): Contingency percentages to evaluate.
+        count_deltas (tuple): Head-count changes applied to one role at a time.
+        rate_deltas_pct (tuple): Percentage rate changes applied to one role at a time.
+
+    Returns:
+        dict: Axis values ("kloc_deltas_pct", "kloc_values", "modes", "contingency_levels",
+              "variants"), "effort_pm" and "duration_m" of shape (kloc, mode) and "total_cost"
+              of shape (kloc, mode, contingency, variant). Treat the arrays as read-only.
+    """
+    kloc_deltas_pct = tuple(sorted(set(kloc_deltas_pct) | {0}))
+    contingency_levels = tuple(sorted(set(contingency_levels) | {contingency_percentage}))
+    roles_key = [(r.get("role_name"), r.get("count", 0), r.get("rate_ph", 0.0)) for r in roles_info]
+    key = stable_hash(kloc, roles_key, kloc_deltas_pct, contingency_levels, tuple(count_deltas), tuple(rate_deltas_pct))
+
+    with _grid_cache_lock:
+        grid = _grid_cache.get(key)
+        if grid is not None:
+            _grid_cache.move_to_end(key)
+            return grid
+
+    grid = _compute_grid(kloc, roles_info, kloc_deltas_pct, contingency_levels, count_deltas, rate_deltas_pct)
+    grid["key"] = key
+    for array_name in ("kloc_values", "effort_pm", "duration_m", "total_cost"):
+        grid[array_name].flags.writeable = False
+
+    with _grid_cache_lock:
+        _grid_cache[key] = grid
+        while len(_grid_cache) > _GRID_CACHE_SIZE:
+            _grid_cache.popitem(last=False)
+    return grid
+
+
+def grid_lookup(grid, kloc_delta_pct=0, mode="semi-detached", contingency=None, variant=BASELINE_VARIANT):
+    """
+    Reads one cell of a sensitivity grid; every argument must be a value on the grid's axes.
+
+    Returns:
+        dict: {"effort_pm", "duration_m", "total_cost"} for that combination.
+    """
+    k = grid["kloc_deltas_pct"].index(kloc_delta_pct)
+    m = grid["modes"].index(mode)
+    c = grid["contingency_levels"].index(contingency if contingency is not None else grid["contingency_levels"][0])
+    v = grid["variants"].index(variant)
+    return {
+        "effort_pm": float(grid["effort_pm"][k, m]),
+        "duration_m": float(grid["duration_m"][k, m]),
+        "total_cost": float(grid["total_cost"][k, m, c, v]),
+    }
+
+
+def tornado_rows(grid, mode, contingency_percentage):
+    """
+    One-at-a-time swings around the baseline (KLOC delta 0, given mode and contingency, baseline team).
+
+    Returns:
+        tuple: (baseline_cost, rows) where rows are dicts {"factor", "low_label", "high_label",
+               "low_cost", "high_cost"} sorted by descending swing.
+    """
+    costs = grid["total_cost"]
+    k0 = grid["kloc_deltas_pct"].index(0)
+    m0 = grid["modes"].index(mode)
+    c0 = grid["contingency_levels"].index(contingency_percentage)
+    baseline = float(costs[k0, m0, c0, 0])
+
+    def _row(factor, labels, values):
+        low, high = int(np.argmin(values)), int(np.argmax(values))
+        return {"factor": factor, "low_label": labels[low], "high_label": labels[high],
+                "low_cost": float(values[low]), "high_cost": float(values[high])}
+
+    rows = [
+        _row("KLOC", [f"{d:+g}%" for d in grid["kloc_deltas_pct"]], costs[:, m0, c0, 0]),
+        _row("COCOMO mode", list(grid["modes"]), costs[k0, :, c0, 0]),
+        _row("Contingency", [f"{c}%" for c in grid["contingency_levels"]], costs[k0, m0, :, 0]),
+    ]
+
+    # Variants are laid out per role as (count deltas..., rate deltas...); group them back per role/kind.
+    by_factor = {}
+    for v, label in enumerate(grid["variants"][1:], start=1):
+        factor, _, delta = label.rpartition(" ")
+        by_factor.setdefault(factor, []).append((delta, v))
+    for factor, entries in by_factor.items():
+        labels = ["base"] + [delta for delta, _ in entries]
+        values = costs[k0, m0, c0, [0] + [v for _, v in entries]]
+        rows.append(_row(factor, labels, values))
+
+    rows.sort(key=lambda row: row["high_cost"] - row["low_cost"], reverse=True)
+    return baseline, rows
@@ -0,0 +1,112 @@
+import numpy as np
+from utils.cocomo import calculate_cocomo_batch, calculate_cost_batch, team_monthly_cost
+
+KLOC_DISTRIBUTIONS = ("pert", "triangular", "lognormal")
+DEFAULT_PERCENTILES = (50, 80, 90)
+DEFAULT_SAMPLES = 200_000
+MAX_SAMPLES = 1_000_000
+
+# z-score of the 90th percentile: a lognormal's (low, high) span P10..P90.
+_Z_P90 = 1.2815515655446004
+
+
+def sample_distribution(rng, distribution, low, most_likely, high, size):
+    """
+    Draws samples of a three-point estimate in one vectorized call.
+
+    Args:
+        rng (np.random.Generator): Random generator to draw from.
+        distribution (str): 'pert', 'triangular' or 'lognormal'.
+        low, most_likely, high (float): Three-point estimate. For 'lognormal', most_likely
+                                        is the median and low/high are the P10/P90 values.
+        size (int): Number of samples.
+
+    Returns:
+        np.ndarray: Samples as float64.
+    """
+    if not low <= most_likely <= high:
+        raise ValueError(f"Expected low <= most_likely <= high, got {low}, {most_likely}, {high}.")
+    if high == low:
+        return np.full(size, float(most_likely))
+
+    if distribution == "triangular":
+        return rng.triangular(low, most_likely, high, size)
+    if distribution == "pert":
+        span = high - low
+        alpha = 1 + 4 * (most_likely - low) / span
+        beta = 1 + 4 * (high - most_likely) / span
+        return low + rng.beta(alpha, beta, size) * span
+    if distribution == "lognormal":
+        if low <= 0:
+            raise ValueError("Lognormal estimates need a positive low value.")
+        sigma = np.log(high / low) / (2 * _Z_P90)
+        return rng.lognormal(np.log(most_likely), sigma, size)
+    raise ValueError(f"Unknown distribution: {distribution}")
+
+
+def _summarize(values, percentiles):
+    summary = {f"P{p}": float(v) for p, v in zip(percentiles, np.percentile(values, percentiles))}
+    summary["mean"] = float(values.mean())
+    return summary
+
+
+def run_monte_carlo(kloc_range, mode, roles_info, contingency_percentage=10,
+                    distribution="pert", rate_range_pct=None, contingency_range=None,
+                    n_samples=DEFAULT_SAMPLES, percentiles=DEFAULT_PERCENTILES, bins=40, seed=None):
+    """
+    Monte Carlo estimate of cost and schedule under uncertain size, rates and contingency.
+
+    Every input is sampled as a whole array and pushed through the batch COCOMO and cost
+    functions, so one run is a handful of NumPy passes regardless of n_samples.
+
+    Args:
+        kloc_range (tuple): (low, most_likely, high) KLOC.
+        mode (str): COCOMO mode, as for calculate_cocomo.
+        roles_info (list of dicts): Team, as for calculate_cost.
+        contingency_percentage (float): Nominal contingency percentage.
+        distribution (str): Distribution of KLOC, one of KLOC_DISTRIBUTIONS.
+        rate_range_pct (tuple, optional): (low, high) percentage change applied to all rates,
+                                          e.g. (-10, 20). Sampled triangular around 0.
+        contingency_range (tuple, optional): (low, high) contingency percentage. Sampled
+                                             triangular around contingency_percentage.
+        n_samples (int): Number of draws, capped at MAX_SAMPLES.
+        percentiles (tuple): Percentiles reported for cost, duration and effort.
+        bins (int): Number of histogram bins.
+        seed (int, optional): Seed for reproducible runs.
+
+    Returns:
+        dict: {"n_samples", "cost", "duration", "effort", "cost_histogram", "duration_histogram"}.
+              The metric entries map "P<n>" and "mean" to floats; histograms are
+              (counts, bin_edges) array pairs. None if the mode is invalid.
+    """
+    n_samples = int(min(max(n_samples, 1), MAX_SAMPLES))
+    rng = np.random.default_rng(seed)
+
+    kloc_low, kloc_likely, kloc_high = kloc_range
+    kloc = sample_distribution(rng, distribution, kloc_low, kloc_likely, kloc_high, n_samples)
+    effort_pm, duration_m, valid = calculate_cocomo_batch(kloc, mode, decimals=None)
+    if not valid.all():
+        print(f"Invalid COCOMO mode for simulation: {mode}")
+        return None
+
+    monthly_cost = team_monthly_cost(roles_info)
+    if rate_range_pct:
+        rate_low, rate_high = rate_range_pct
+        monthly_cost = monthly_cost * (1 + sample_distribution(rng, "triangular", min(rate_low, 0), 0, max(rate_high, 0), n_samples) / 100)
+
+    contingency = contingency_percentage
+    if contingency_range:
+        cont_low, cont_high = contingency_range
+        contingency = sample_distribution(rng, "triangular", min(cont_low, contingency_percentage),
+                                          contingency_percentage, max(cont_high, contingency_percentage), n_samples)
+
+    _, total_cost = calculate_cost_batch(monthly_cost, duration_m, contingency)
+
+    return {
+        "n_samples": n_samples,
+        "cost": _summarize(total_cost, percentiles),
+        "duration": _summarize(duration_m, percentiles),
+        "effort": _summarize(effort_pm, percentiles),
+        "cost_histogram": np.histogram(total_cost, bins=bins),
+        "duration_histogram": np.histogram(duration_m, bins=bins),
+    }
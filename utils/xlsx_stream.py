@@ -0,0 +1,231 @@
+import math
+import numbers
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape, quoteattr
+
+MAX_CELL_CHARS = 32_767 # Excel's limit for the text of one cell
+MAX_SHEET_NAME_CHARS = 31
+MAX_SHEET_ROWS = 1_048_576 # Excel's row limit, header included
+# Characters XML 1.0 does not allow, even escaped.
+ILLEGAL_XML_CHARS_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+HEADER_STYLE = ' s="1"' # bold, see _STYLES
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '{sheets}</Types>'
+)
+_SHEET_CONTENT_TYPE = ('<Override PartName="/xl/worksheets/sheet{number}.xml" '
+                       'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>')
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>{sheets}</sheets></workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{sheets}'
+    '<Relationship Id="rIdStyles" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/></Relationships>'
+)
+_SHEET_REL = ('<Relationship Id="rId{number}" '
+              'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+              'Target="worksheets/sheet{number}.xml"/>')
+# Style 0 is the default; style 1 (bold) is used for header rows.
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+_SHEET_START = ('<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>')
+_SHEET_END = '</sheetData></worksheet>'
+
+
+def _text_cell(text, style):
+    if len(text) > MAX_CELL_CHARS:
+        text = text[:MAX_CELL_CHARS]
+    if not text.isprintable(): # only then can it contain characters XML does not allow
+        text = ILLEGAL_XML_CHARS_RE.sub("", text)
+    text = escape(text)
+    return f'<c t="inlineStr"{style}><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _cell(value, style=""):
+    """One <c> element; cells carry no reference, so their position is their order in the row."""
+    kind = type(value)
+    # Exact-type checks first: the abstract numbers.* checks below cost more than the formatting.
+    if kind is str:
+        return _text_cell(value, style)
+    if kind is float:
+        return f"<c{style}><v>{value!r}</v></c>" if math.isfinite(value) else "<c/>"
+    if kind is int:
+        return f"<c{style}><v>{value}</v></c>"
+    if value is None:
+        return "<c/>"
+    if isinstance(value, str):
+        return _text_cell(value, style)
+    if isinstance(value, bool) or getattr(getattr(value, "dtype", None), "kind", None) == "b": # numpy booleans are not bool subclasses
+        return f'<c t="b"{style}><v>{int(value)}</v></c>'
+    if isinstance(value, numbers.Number):
+        if isinstance(value, numbers.Integral):
+            return f"<c{style}><v>{int(value)}</v></c>"
+        value = float(value)
+        return f"<c{style}><v>{value!r}</v></c>" if math.isfinite(value) else "<c/>"
+    if isinstance(value, (datetime, date)):
+        return _text_cell(value.isoformat(), style)
+    return _text_cell(str(value), style)
+
+
+class _Sheet:
+    """One logical sheet: its header and the worksheet parts ("Team", "Team (2)", ...) written so far."""
+
+    def __init__(self, order, header):
+        self.order = order
+        self.header = header
+        self.parts = [] # (worksheet name, worksheet number)
+        self.file = None # the open part
+        self.rows = 0 # rows in the open part, header included
+
+
+class XlsxStreamWriter:
+    """
+    Writes an .xlsx workbook row by row in constant memory.
+
+    Each sheet's XML is appended to its own temporary file as rows arrive (rows of different
+    sheets can be interleaved); close() zips them into the target. Strings are written inline,
+    numbers and booleans as such, dates as ISO text, None/NaN as empty cells, and text longer than
+    Excel's cell limit is truncated. A sheet that reaches Excel's row limit continues on a new
+    worksheet with the same header, named "<name> (2)", "<name> (3)", ... and placed after it.
+
+    Usage:
+        with XlsxStreamWriter(path) as writer:
+            writer.add_sheet("Projects", ["Name", "Cost"])
+            writer.write_rows("Projects", rows)
+    """
+
+    def __init__(self, target, max_rows=MAX_SHEET_ROWS):
+        """
+        Args:
+            target: File path or binary file object to write the workbook to.
+            max_rows (int): Rows per worksheet (header included) before continuing on a new one.
+        """
+        if max_rows < 2:
+            raise ValueError("max_rows must leave room for a header and a row.")
+        self.target = target
+        self.max_rows = max_rows
+        self._temp_dir = tempfile.TemporaryDirectory(prefix="xlsx-")
+        self._sheets = {} # name -> _Sheet
+        self._names = set() # worksheet names in use
+        self._worksheets = 0
+        self.rows_written = 0
+
+    def _open_part(self, sheet, name):
+        if name in self._names:
+            raise ValueError(f"Duplicate sheet name '{name}'.")
+        self._names.add(name)
+        self._worksheets += 1
+        sheet.parts.append((name, self._worksheets))
+        sheet.file = open(os.path.join(self._temp_dir.name, f"sheet{self._worksheets}.xml"), "w", encoding="utf-8")
+        sheet.file.write(_SHEET_START)
+        sheet.rows = 0
+        if sheet.header:
+            sheet.file.write(f"<row>{''.join(_cell(value, HEADER_STYLE) for value in sheet.header)}</row>")
+            sheet.rows = 1
+
+    def add_sheet(self, name, header=None):
+        """Adds a sheet (in order); header, if given, is written as a bold first row. Returns the sheet's name."""
+        name = re.sub(r"[\[\]:*?/\\]", "_", name)[:MAX_SHEET_NAME_CHARS]
+        if name in self._sheets:
+            raise ValueError(f"Duplicate sheet name '{name}'.")
+        sheet = _Sheet(len(self._sheets), list(header) if header else None)
+        self._open_part(sheet, name)
+        self._sheets[name] = sheet
+        return name
+
+    def _continue(self, name, sheet):
+        sheet.file.write(_SHEET_END)
+        sheet.file.close()
+        suffix = f" ({len(sheet.parts) + 1})"
+        self._open_part(sheet, name[:MAX_SHEET_NAME_CHARS - len(suffix)] + suffix)
+
+    def append(self, sheet_name, row):
+        """Appends one row (a sequence of cell values) to a sheet."""
+        sheet = self._sheets[sheet_name]
+        if sheet.rows >= self.max_rows:
+            self._continue(sheet_name, sheet)
+        sheet.file.write(f"<row>{''.join(map(_cell, row))}</row>")
+        sheet.rows += 1
+        self.rows_written += 1
+
+    def write_rows(self, sheet_name, rows):
+        """Appends every row of an iterable to a sheet."""
+        for row in rows:
+            self.append(sheet_name, row)
+
+    def close(self):
+        """Finishes the sheets and writes the workbook to the target."""
+        if not self._sheets and self._temp_dir is None:
+            return
+        if not self._sheets:
+            self.add_sheet("Sheet1") # a workbook needs at least one sheet
+        for sheet in self._sheets.values():
+            sheet.file.write(_SHEET_END)
+            sheet.file.close()
+        # Continuation worksheets follow the sheet they continue.
+        sheets = [part for sheet in sorted(self._sheets.values(), key=lambda sheet: sheet.order) for part in sheet.parts]
+        with zipfile.ZipFile(self.target, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+            archive.writestr("[Content_Types].xml", _CONTENT_TYPES.format(
+                sheets="".join(_SHEET_CONTENT_TYPE.format(number=number) for _, number in sheets)))
+            archive.writestr("_rels/.rels", _ROOT_RELS)
+            archive.writestr("xl/workbook.xml", _WORKBOOK.format(sheets="".join(
+                f'<sheet name={quoteattr(name)} sheetId="{number}" r:id="rId{number}"/>' for name, number in sheets)))
+            archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS.format(
+                sheets="".join(_SHEET_REL.format(number=number) for _, number in sheets)))
+            archive.writestr("xl/styles.xml", _STYLES)
+            for _, number in sheets:
+                with open(os.path.join(self._temp_dir.name, f"sheet{number}.xml"), "rb") as sheet_file, \
+                        archive.open(f"xl/worksheets/sheet{number}.xml", "w", force_zip64=True) as member:
+                    shutil.copyfileobj(sheet_file, member, 1024 * 1024)
+        self._discard()
+
+    def _discard(self):
+        for sheet in self._sheets.values():
+            if sheet.file is not None:
+                sheet.file.close()
+        self._sheets = {}
+        if self._temp_dir is not None:
+            self._temp_dir.cleanup()
+            self._temp_dir = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard() # nothing is written to the target